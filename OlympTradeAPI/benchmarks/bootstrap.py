@@ -0,0 +1,55 @@
+"""
+Session bootstrap benchmark: connect-to-ready time of start() + initialize_session().
+
+A fake OlympTrade server answers every request after --latency seconds. Three starts are
+timed: cold (account discovered with e:1068), warm (account from the on-disk cache of a
+previous run) and known (account_id already set, as after a reconnect).
+
+    python benchmarks/bootstrap.py --latency 0.08
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from olymptrade_ws.core.client import OlympTradeClient
+from olymptrade_ws.fakeserver import FakeOlympTradeServer, FakeServerConfig
+
+
+async def bench(args):
+    config = FakeServerConfig(latency=args.latency, tick_interval=3600)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache_path = str(Path(cache_dir) / "accounts.json")
+        async with FakeOlympTradeServer(config) as server:
+            print(f"latency {args.latency * 1000:.0f} ms")
+            print(f"{'start':>6} {'ready s':>8} {'connect':>8} {'subscribe':>10} {'discovery':>10} {'resync':>8}")
+            account_id = None
+            for label in ("cold", "warm", "known"):
+                client = OlympTradeClient(access_token="bench", uri=server.uri, auto_reconnect=False,
+                                          account_cache=cache_path, account_id=account_id if label == "known" else None)
+                await client.start()
+                await client.initialize_session()
+                await client.stop()
+                account_id = client.account_id
+                s = client.bootstrap_stats
+                print(f"{label:>6} {s.connect_to_ready:>8.3f} {s.connect:>8.3f} {s.subscribe:>10.3f} "
+                      f"{s.discovery:>10.3f} {s.resync:>8.3f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="OlympTradeClient.initialize_session connect-to-ready")
+    parser.add_argument("--latency", type=float, default=0.08, help="Server response latency in seconds")
+    return parser.parse_args()
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING, force=True)
+    asyncio.run(bench(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Candle-history benchmark: paged e:10 fetches with 1..N requests in flight.
+
+A fake OlympTrade server answers every request after --latency seconds. The same range
+of --count candles is fetched with get_candle_range() at each window size; a window of 1
+is the old one-round-trip-at-a-time loop.
+
+    python benchmarks/candle_history.py --count 20000 --latency 0.08
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from olymptrade_ws.core.client import OlympTradeClient
+from olymptrade_ws.fakeserver import FakeOlympTradeServer, FakeServerConfig
+
+
+async def bench(args):
+    config = FakeServerConfig(latency=args.latency, tick_interval=3600)
+    async with FakeOlympTradeServer(config) as server:
+        client = OlympTradeClient(access_token="bench", uri=server.uri, auto_reconnect=False)
+        await client.start()
+        end_time = 1_700_000_000
+        print(f"{args.count} candles of {args.size}s in pages of {args.page_size}, latency {args.latency * 1000:.0f} ms")
+        print(f"{'in flight':>9} {'seconds':>9} {'candles/s':>10} {'speed-up':>9}")
+        baseline = None
+        for window in args.windows:
+            started = time.perf_counter()
+            candles = await client.market.get_candle_range(args.pair, args.size, args.count, end_time=end_time,
+                                                           page_size=args.page_size, max_inflight=window)
+            elapsed = time.perf_counter() - started
+            assert candles is not None and len(candles) == args.count
+            baseline = baseline or elapsed
+            print(f"{window:>9} {elapsed:>9.3f} {args.count / elapsed:>10.0f} {baseline / elapsed:>8.1f}x")
+        await client.stop()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="MarketAPI.get_candle_range pipelining")
+    parser.add_argument("--pair", default="EURUSD")
+    parser.add_argument("--size", type=int, default=60, help="Candle size in seconds")
+    parser.add_argument("--count", type=int, default=20000, help="Candles to fetch")
+    parser.add_argument("--page-size", type=int, default=500, help="Candles per e:10 request")
+    parser.add_argument("--latency", type=float, default=0.08, help="Server response latency in seconds")
+    parser.add_argument("--windows", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="Requests in flight")
+    return parser.parse_args()
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING, force=True)
+    asyncio.run(bench(parse_args()))
+
+
+if __name__ == "__main__":
+    main()
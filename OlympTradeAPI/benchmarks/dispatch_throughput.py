@@ -0,0 +1,128 @@
+"""
+Dispatch microbenchmark: messages/s through OlympTradeClient's receive path.
+
+Feeds a recorded tick stream (a capture file, see olymptrade_ws.capture) straight into
+`process_raw_message`, with no socket involved, and measures parse + dispatch throughput
+for each dispatch path:
+
+    legacy  the previous path: INFO log per frame, one create_task per callback per frame
+    task    one task per callback, from the dispatch table
+    inline  callbacks awaited directly from the dispatch table
+    pool    callbacks run on bounded worker queues (the default)
+
+Without --capture, a synthetic tick stream shaped like live e:1 frames is generated.
+
+    python benchmarks/dispatch_throughput.py --frames 50000 --pairs 5 --callbacks 2
+    python benchmarks/dispatch_throughput.py --capture captures/session.jsonl.gz
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from olymptrade_ws.capture import CapturedFrame, RECEIVED, load_frames
+from olymptrade_ws.core.client import OlympTradeClient
+from olymptrade_ws.fakeserver import SyntheticMarket
+
+PAIRS = ["EURUSD", "GBPUSD", "USDJPY", "AUDUSD", "ASIA_X", "LATAM_X", "EUROPE_X", "USDCAD"]
+
+
+class LegacyDispatchClient(OlympTradeClient):
+    """The dispatch path as it was before the event dispatcher, kept as the baseline."""
+
+    async def _dispatch_message(self, message: Dict[str, Any]):
+        logging.getLogger("olymptrade_ws.core.client").info(f"_dispatch_message called with message: {message}")
+        request_uuid = message.get("uuid")
+        event_code = message.get("e")
+        if not event_code:
+            return
+        if request_uuid and request_uuid in self._response_futures:
+            self._response_futures.pop(request_uuid).set_result(message)
+            return
+        if event_code == 55:
+            self._latest_balance = message
+        callbacks = self._dispatcher._callbacks
+        if event_code in callbacks:
+            [asyncio.create_task(cb(message)) for cb in callbacks[event_code]]
+
+
+def synthetic_tick_stream(frames: int, pairs: int, seed: int = 0) -> List[CapturedFrame]:
+    """Tick frames as the server sends them: one e:1 message per subscribed pair per frame."""
+    market = SyntheticMarket(seed=seed)
+    start = 1_700_000_000.0
+    stream = []
+    for i in range(frames):
+        t = start + i * 0.25
+        messages = [{"e": 1, "t": 1, "d": [market.tick(pair, t)]} for pair in PAIRS[:pairs]]
+        stream.append(CapturedFrame(t, RECEIVED, json.dumps(messages, separators=(",", ":"))))
+    return stream
+
+
+async def run_mode(mode: str, frames: List[CapturedFrame], callbacks: int) -> Dict[str, Any]:
+    if mode == "legacy":
+        client = LegacyDispatchClient(access_token="bench", auto_reconnect=False)
+    else:
+        client = OlympTradeClient(access_token="bench", auto_reconnect=False, dispatch_mode=mode)
+
+    handled = 0
+
+    async def on_tick(message):
+        nonlocal handled
+        handled += len(message["d"])
+
+    for _ in range(callbacks):
+        client.register_callback(1, on_tick)
+
+    raw_frames = [frame.frame for frame in frames]
+    messages = sum(len(json.loads(raw)) for raw in raw_frames)
+    started = time.perf_counter()
+    for raw in raw_frames:
+        await client.process_raw_message(raw)
+    await client.flush_callbacks()
+    # Let legacy fire-and-forget tasks finish so all modes do the same work
+    while handled < messages * callbacks:
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started
+    await client._dispatcher.stop()
+    return {
+        "mode": mode,
+        "frames": len(raw_frames),
+        "messages": messages,
+        "elapsed": elapsed,
+        "messages_per_sec": messages / elapsed,
+        "callback_errors": client.callback_errors,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="OlympTradeClient dispatch throughput")
+    parser.add_argument("--capture", help="Capture file to replay (default: synthetic tick stream)")
+    parser.add_argument("--frames", type=int, default=20000, help="Synthetic frames to generate")
+    parser.add_argument("--pairs", type=int, default=3, help="Tick messages per synthetic frame")
+    parser.add_argument("--callbacks", type=int, default=1, help="e:1 callbacks to register")
+    parser.add_argument("--modes", default="legacy,task,inline,pool")
+    parser.add_argument("--log-level", default="INFO", help="Client log level (INFO matches production)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    # Records are created and formatted as in production, but not written anywhere
+    # (force: importing olymptrade_ws already configured a stderr handler)
+    logging.basicConfig(level=args.log_level, handlers=[logging.NullHandler()], force=True)
+    frames = load_frames(args.capture, RECEIVED) if args.capture else synthetic_tick_stream(args.frames, args.pairs)
+    print(f"{len(frames)} frames, {args.callbacks} callback(s), log level {args.log_level}")
+    print(f"{'mode':<8} {'messages':>9} {'seconds':>8} {'msg/s':>10}")
+    for mode in args.modes.split(","):
+        result = asyncio.run(run_mode(mode, frames, args.callbacks))
+        print(f"{result['mode']:<8} {result['messages']:>9} {result['elapsed']:>8.3f} {result['messages_per_sec']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Receive-path benchmark: per-message latency and client CPU, queue path vs fast receive.
+
+A fake OlympTrade server runs in a background thread, so the client thread's CPU time
+(time.thread_time) covers only the client. For each configuration:
+
+    rtt     N sequential e:90 requests; round-trip percentiles in microseconds
+    ticks   M pushed e:1 frames; client CPU per message and wall-clock throughput
+
+Configurations combine the receive path (queue: receiver -> ingress queue -> processing
+loop; fast: decoded and resolved in the receiver), the JSON decoder (json / orjson) and the
+event loop (asyncio / uvloop). Missing optional packages are skipped.
+
+    python benchmarks/receive_path.py --requests 2000 --ticks 20000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from olymptrade_ws.core import protocol
+from olymptrade_ws.core.client import OlympTradeClient
+from olymptrade_ws.core.loop import run, uvloop_available
+from olymptrade_ws.fakeserver import FakeServerConfig, FakeServerThread, SyntheticMarket
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def tick_frames(count: int, pairs: int = 3) -> List[str]:
+    market = SyntheticMarket()
+    names = ["EURUSD", "GBPUSD", "USDJPY", "AUDUSD", "ASIA_X"][:pairs]
+    return [json.dumps([{"e": 1, "t": 1, "d": [market.tick(pair, 1_700_000_000 + i * 0.25)]} for pair in names],
+                       separators=(",", ":")) for i in range(count)]
+
+
+async def measure(uri: str, server_thread: FakeServerThread, fast: bool, requests: int, frames: List[str]) -> Dict[str, Any]:
+    client = OlympTradeClient(access_token="bench", uri=uri, fast_receive=fast, dispatch_mode="inline", auto_reconnect=False)
+    client.message_queue.policies = {} # Deliver every tick (no coalescing) so all paths do the same work
+    await client.start()
+
+    # --- Request round trips ---
+    for _ in range(50): # Warm-up
+        await client.send_request(90, {})
+    rtts = []
+    cpu_start = time.thread_time()
+    for _ in range(requests):
+        started = time.perf_counter()
+        await client.send_request(90, {})
+        rtts.append((time.perf_counter() - started) * 1e6)
+    rtt_cpu = (time.thread_time() - cpu_start) / requests * 1e6
+
+    # --- Tick flood ---
+    expected = sum(len(json.loads(frame)) for frame in frames)
+    received = 0
+    done = asyncio.get_running_loop().create_future()
+
+    async def on_tick(message):
+        nonlocal received
+        received += 1
+        if received >= expected and not done.done():
+            done.set_result(None)
+
+    client.register_callback(1, on_tick)
+
+    async def flood():
+        for frame in frames:
+            await server_thread.server.push_raw(frame)
+
+    cpu_start = time.thread_time()
+    started = time.perf_counter()
+    # Flood from the server thread while this loop keeps receiving
+    await asyncio.to_thread(server_thread.call, flood(), None)
+    await asyncio.wait_for(done, timeout=60)
+    elapsed = time.perf_counter() - started
+    tick_cpu = (time.thread_time() - cpu_start) / expected * 1e6
+    await client.stop()
+    return {
+        "rtt_p50_us": statistics.median(rtts),
+        "rtt_p99_us": percentile(rtts, 99),
+        "rtt_cpu_us": rtt_cpu,
+        "tick_cpu_us": tick_cpu,
+        "ticks_per_sec": expected / elapsed,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="OlympTradeClient receive-path latency and CPU")
+    parser.add_argument("--requests", type=int, default=2000, help="Sequential e:90 round trips")
+    parser.add_argument("--ticks", type=int, default=10000, help="Tick frames pushed by the server")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING, handlers=[logging.NullHandler()], force=True)
+    frames = tick_frames(args.ticks)
+    decoders = ["json"] + (["orjson"] if protocol.orjson is not None else [])
+    loops = [False] + ([True] if uvloop_available() else [])
+    configs = [("queue", "json", False)] + [("fast", decoder, use_uvloop) for decoder in decoders for use_uvloop in loops]
+
+    print(f"{'path':<6} {'json':<7} {'loop':<8} {'rtt p50':>9} {'rtt p99':>9} {'cpu/req':>9} {'cpu/tick':>9} {'ticks/s':>9}")
+    with FakeServerThread(FakeServerConfig(tick_interval=3600)) as server_thread:
+        for path, decoder, use_uvloop in configs:
+            # The queue path on asyncio with stdlib json is the baseline (the default configuration)
+            protocol.use_json_backend(decoder)
+            result = run(measure(server_thread.uri, server_thread, path == "fast", args.requests, frames), use_uvloop=use_uvloop)
+            print(f"{path:<6} {decoder:<7} {'uvloop' if use_uvloop else 'asyncio':<8} "
+                  f"{result['rtt_p50_us']:>8.0f}u {result['rtt_p99_us']:>8.0f}u {result['rtt_cpu_us']:>8.1f}u "
+                  f"{result['tick_cpu_us']:>8.1f}u {result['ticks_per_sec']:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Connection-pool benchmark: tick throughput and order latency with history traffic in the way.
+
+A fake OlympTrade server (in its own thread) streams ticks for --pairs pairs every
+--tick-interval seconds while the client keeps --history large e:10 requests in flight and
+places one order every --order-interval seconds. Each run is repeated per --connections value:
+1 is the single shared socket; with 2+ orders and pings get a dedicated connection and ticks
+are sharded over the rest. Server and client share the machine, so on few cores the numbers
+mostly show CPU contention; point it at a roomier host for the socket-level effect.
+
+    python benchmarks/sharded_pool.py --connections 1 4 --duration 5
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from olymptrade_ws.core.client import OlympTradeClient
+from olymptrade_ws.fakeserver import FakeServerConfig, FakeServerThread
+
+
+async def run_once(uri: str, connections: int, args) -> dict:
+    client = OlympTradeClient(access_token="bench", uri=uri, auto_reconnect=False, connections=connections,
+                              account_id=2911220983, account_group="demo",
+                              fast_receive=args.fast_receive)
+    ticks = 0
+
+    async def on_tick(message):
+        nonlocal ticks
+        ticks += len(message["d"])
+
+    client.register_callback(1, on_tick)
+    await client.start()
+    pairs = [f"PAIR{i:03d}" for i in range(args.pairs)]
+    await client.market.subscribe_ticks(*pairs)
+    stop_at = time.monotonic() + args.duration
+
+    async def history():
+        while time.monotonic() < stop_at:
+            await client.send_request(10, [{"pair": "EURUSD", "size": 60, "to": 1_700_000_000,
+                                            "count": args.candles}], timeout=30)
+
+    async def orders():
+        latencies = []
+        while time.monotonic() < stop_at:
+            sent = time.perf_counter()
+            await client.trade.place_order("EURUSD", 1, "up", 60, client.account_id, "demo")
+            latencies.append((time.perf_counter() - sent) * 1000)
+            await asyncio.sleep(args.order_interval)
+        return latencies
+
+    await asyncio.sleep(0.2) # Let the tick streams start
+    ticks = 0
+    started = time.monotonic()
+    results = await asyncio.gather(orders(), *(history() for _ in range(args.history)))
+    elapsed = time.monotonic() - started
+    await client.stop()
+    latencies = sorted(results[0])
+    return {
+        "ticks_per_s": ticks / elapsed,
+        "orders": len(latencies),
+        "p50": statistics.median(latencies),
+        "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "max": latencies[-1],
+    }
+
+
+async def bench(args, uri: str):
+    print(f"{args.pairs} pairs every {args.tick_interval * 1000:.0f} ms, {args.history} e:10 x {args.candles} candles "
+          f"in flight, {args.duration}s per run")
+    print(f"{'conns':>5} {'ticks/s':>9} {'orders':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for connections in args.connections:
+        r = await run_once(uri, connections, args)
+        print(f"{connections:>5} {r['ticks_per_s']:>9.0f} {r['orders']:>7} {r['p50']:>8.2f} {r['p99']:>8.2f} {r['max']:>8.2f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="OlympTradeClient connection pool under load")
+    parser.add_argument("--connections", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--pairs", type=int, default=50)
+    parser.add_argument("--tick-interval", type=float, default=0.05)
+    parser.add_argument("--history", type=int, default=1, help="e:10 requests kept in flight")
+    parser.add_argument("--candles", type=int, default=1000, help="Candles per e:10 answer")
+    parser.add_argument("--order-interval", type=float, default=0.05)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--queued-receive", dest="fast_receive", action="store_false",
+                        help="Resolve responses from the shared ingress queue instead of each receiver task")
+    return parser.parse_args()
+
+
+def main():
+    logging.basicConfig(level=logging.WARNING, force=True)
+    args = parse_args()
+    config = FakeServerConfig(tick_interval=args.tick_interval, candles_per_request=args.candles)
+    with FakeServerThread(config) as server:
+        asyncio.run(bench(args, server.uri))
+
+
+if __name__ == "__main__":
+    main()
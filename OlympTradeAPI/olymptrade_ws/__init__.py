@@ -2,14 +2,19 @@
 # Expose main classes for easy import
 from .main import OlympTradeClient
 from .core.client import OlympTradeClient as CoreOlympTradeClient
+from .core.manager import AccountManager
 from .api.balance import BalanceAPI
 from .api.market import MarketAPI
 from .api.trade import TradeAPI
+from .data import CandleAggregator, TickStore
 
 __all__ = [
     "OlympTradeClient",
     "CoreOlympTradeClient",
+    "AccountManager",
     "BalanceAPI",
     "MarketAPI",
-    "TradeAPI"
+    "TradeAPI",
+    "TickStore",
+    "CandleAggregator"
 ]
@@ -29,8 +29,9 @@ class BalanceAPI:
         
         logger.info(f"Attempting to subscribe to balance updates (event {event_code_balance}) using event {event_code_subscribe}...")
         try:
-            # Subscription does not require a response; server sends updates unsolicited
-            await self._client.send_request(event_code_subscribe, [data], requires_response=False)
+            # Subscription does not require a response; server sends updates unsolicited.
+            # Reference-counted: repeated calls do not resend the same e:98 group.
+            await self._client.subscriptions.subscribe_events([data])
             logger.info(f"Subscription request for balance updates sent.")
         except Exception as e:
              logger.error(f"Failed to send subscription request for balance updates: {e}")
@@ -46,6 +47,13 @@ class BalanceAPI:
              logger.warning("No balance data received yet. Ensure you are subscribed and connected.")
         return balance_data
         
+    def get_account_balance(self, account_id: Optional[int] = None, group: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Returns the balance dict of one account from the local mirror (client.state), indexed by
+        (account_id, group) and kept current from e:55 pushes. Defaults to the session's account.
+        """
+        return self._client.state.balance(account_id, group)
+
     async def request_balance(self, account_id: int, group: str = "real") -> Optional[Dict[str, Any]]:
         """
         Explicitly requests current balance state (if possible).
@@ -68,15 +76,14 @@ class BalanceAPI:
             logger.error(f"Failed to request balance using event {event_code}: {e}")
             return None
 
-    async def get_balance(self, timeout: float = 10.0, poll_interval: float = 0.5) -> dict:
+    async def get_balance(self, timeout: float = 10.0, poll_interval: Optional[float] = None) -> dict:
         """
         Ensures session initialization, subscribes, and waits for a balance update, then returns it.
         Usage: balance = await client.balance.get_balance()
         """
         # Ensure all startup subscriptions and account_id are set
-        if not getattr(self._client, '_session_initialized', False):
+        if not self._client._session_initialized:
             await self._client.initialize_session()
-            self._client._session_initialized = True
         try:
             await self.subscribe_balance_updates()
         except Exception:
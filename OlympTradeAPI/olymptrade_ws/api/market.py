@@ -1,46 +1,92 @@
 # api/market.py
+import asyncio
 import logging
 import time
-from typing import TYPE_CHECKING, Dict, Any, Optional, List, Union
+from typing import TYPE_CHECKING, Dict, Any, Optional, List, Tuple, Union
 from datetime import datetime, timezone
 
 from olymptrade_ws.core.protocol import get_current_timestamp_ms
+from olymptrade_ws.olympconfig import parameters
+
+try:
+    import numpy as np
+except ImportError: # Optional: get_candle_range(as_numpy=True)
+    np = None
 
 if TYPE_CHECKING:
     from olymptrade_ws.core.client import OlympTradeClient
 
 logger = logging.getLogger(__name__)
 
+def _extract_candles(data: Any, pair: str) -> Optional[List[Dict[str, Any]]]:
+    """Candles for `pair` from an e:10 response: [{"p", "candles": [...]}, ...] or a bare candle list."""
+    if not isinstance(data, list):
+        return None
+    if data and all(isinstance(group, dict) and "candles" in group for group in data):
+        return [candle for group in data if group.get("p") in (None, pair) for candle in group["candles"]]
+    return data
+
+def _to_timestamp(value: Optional[Union[datetime, int]]) -> int:
+    """Seconds since the epoch for an int/float timestamp or datetime (naive = UTC); now if None."""
+    if value is None:
+        return int(time.time())
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    return int(value)
+
+def _pages(last_start: int, count: int, size: int, page_size: int) -> List[Tuple[int, int]]:
+    """(to, count) e:10 pages covering `count` candles ending at `last_start`, newest first; the oldest may be partial."""
+    return [(last_start - k * page_size * size, min(page_size, count - k * page_size))
+            for k in range(-(-count // page_size))]
+
+
+def _runs(times: List[int], size: int) -> List[Tuple[int, int]]:
+    """Consecutive candle times (sorted) grouped into (last time, count) runs."""
+    runs: List[Tuple[int, int]] = []
+    for t in times:
+        if runs and t - runs[-1][0] == size:
+            runs[-1] = (t, runs[-1][1] + 1)
+        else:
+            runs.append((t, 1))
+    return runs
+
+
+def _candle_columns(candles: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Candle dicts as NumPy columns: int64 times and float64 prices/volume."""
+    columns = {"t": np.fromiter((c["t"] for c in candles), dtype=np.int64, count=len(candles))}
+    for field in ("open", "high", "low", "close", "volume"):
+        columns[field] = np.fromiter((c.get(field, 0.0) for c in candles), dtype=np.float64, count=len(candles))
+    return columns
+
 class MarketAPI:
     def __init__(self, client: 'OlympTradeClient'):
         self._client = client
 
-    async def subscribe_ticks(self, pair: str) -> None:
-        """Subscribes to live price ticks (Event 1) for a given asset pair."""
-        logger.info(f"Subscribing to ticks for {pair}...")
-        # Logs show events 12 and 280 are sent when subscribing to a pair
+    async def subscribe_ticks(self, *pairs: str) -> None:
+        """
+        Subscribes to live price ticks (Event 1) for one or more asset pairs.
+        Subscriptions are reference-counted by client.subscriptions: events 12 and 280 are only
+        sent for pairs nobody was subscribed to yet, batched into one request each.
+        """
+        logger.info(f"Subscribing to ticks for {', '.join(pairs)}...")
         try:
-            # Event 12
-            await self._client.send_request(12, [{"pair": pair}], requires_response=True)
-             # Event 280
-            await self._client.send_request(280, [{"pair": pair}], requires_response=True)
-            logger.info(f"Successfully sent tick subscription requests for {pair}.")
+            await self._client.subscriptions.subscribe_ticks(*pairs)
         except Exception as e:
-            logger.error(f"Failed to subscribe to ticks for {pair}: {e}")
+            logger.error(f"Failed to subscribe to ticks for {', '.join(pairs)}: {e}")
             raise
 
-    async def unsubscribe_ticks(self, pair: str) -> None:
-        """Unsubscribes from live price ticks for a given asset pair."""
-        logger.info(f"Unsubscribing from ticks for {pair}...")
-         # Logs show events 13 and 281 are sent when unsubscribing
+    async def unsubscribe_ticks(self, *pairs: str) -> None:
+        """
+        Releases tick subscriptions for one or more asset pairs. Events 13 and 281 are only
+        sent for pairs whose last subscriber this was.
+        """
+        logger.info(f"Unsubscribing from ticks for {', '.join(pairs)}...")
         try:
-             # Event 13
-            await self._client.send_request(13, [{"pair": pair}], requires_response=True)
-            # Event 281
-            await self._client.send_request(281, [{"pair": pair}], requires_response=True)
-            logger.info(f"Successfully sent tick unsubscription requests for {pair}.")
+            await self._client.subscriptions.unsubscribe_ticks(*pairs)
         except Exception as e:
-            logger.error(f"Failed to unsubscribe from ticks for {pair}: {e}")
+            logger.error(f"Failed to unsubscribe from ticks for {', '.join(pairs)}: {e}")
             raise
             
     async def get_candles(self, pair: str, size: int, count: int, end_time: Optional[Union[datetime, int]] = None) -> Optional[List[Dict[str, Any]]]:
@@ -50,77 +96,153 @@ class MarketAPI:
         Args:
             pair: Asset pair (e.g., "EURUSD", "ASIA_X").
             size: Candle size in seconds (e.g., 5, 60, 300).
-            count: Number of candles to retrieve before end_time.
+            count: Number of candles to retrieve before end_time. More than CANDLE_PAGE_SIZE
+                   candles are fetched page by page with get_candle_range().
             end_time: Timestamp (int seconds or datetime object) for the *end* of the period.
                       Defaults to the current time.
 
         Returns:
-            A list of candle dictionaries (format needs verification from e:1003 response) or None on error.
-            
-        NOTE: The exact mapping of 'count' to the API request ('solid'?) needs confirmation.
-              The response format (event 1003) structure needs verification.
-        """
-        if end_time is None:
-            to_ts = int(time.time())
-        elif isinstance(end_time, datetime):
-            # Ensure datetime is timezone-aware (assume UTC if naive)
-            if end_time.tzinfo is None:
-                 end_time = end_time.replace(tzinfo=timezone.utc)
-            to_ts = int(end_time.timestamp())
-        else:
-            to_ts = int(end_time)
+            A list of candle dictionaries [{t, open, high, low, close, volume}, ...] or None on error.
 
+        NOTE: 'count' is sent with the request; a server that ignores it returns its own batch size,
+              which is then trimmed to the latest `count` candles.
+              The server answers e:10 with the same event code and uuid, d = [{"p": pair, "candles": [...]}]
+              (older logs suggested e:1003, which is still accepted).
+        """
+        if count > parameters.CANDLE_PAGE_SIZE:
+            return await self.get_candle_range(pair, size, count, end_time=end_time)
+        to_ts = _to_timestamp(end_time)
         logger.info(f"Requesting {count} candles for {pair} (size: {size}s) ending around {datetime.fromtimestamp(to_ts, tz=timezone.utc)}")
-        
-        # Event 10 seems to request candles, Event 1003 is the response in logs
-        event_code_req = 10
-        event_code_resp = 1003 # Expected response event code
-        
-        # The log shows 'solid: true'. This *might* relate to fetching historical batch?
-        # The 'count' parameter isn't directly visible in the logged request payload.
-        # The API might implicitly return a certain number based on 'to' and 'size',
-        # or 'count' needs to be mapped differently (e.g., calculate 'from' timestamp).
-        # Let's assume for now the API returns a batch ending at 'to'. We might need
-        # multiple requests or a different parameter to get exactly 'count'.
-        # For now, we request data ending at 'to_ts'.
-        
-        data = [{"pair": pair, "size": size, "to": to_ts, "solid": True}] # 'solid' is a guess
-        
-        # Also saw event 282 sent along with 10 in logs, purpose unclear. Send it too?
-        event_code_req_alt = 282
-        data_alt = [{"pair": pair, "size": size, "to": to_ts, "solid": True}]
-
         try:
-            # Send the primary request (e:10) and expect a response (e:1003)
-            # NOTE: The log for e:1003 doesn't show a UUID matching the e:10 request.
-            # This suggests e:1003 might be an unsolicited push triggered by e:10,
-            # or the UUID matching was missed in logging. Assuming direct response for now.
-            response = await self._client.send_request(event_code_req, data, requires_response=True)
-            
-            # Optionally send the secondary request (e:282) if needed - requires_response=False?
-            # await self._client.send_request(event_code_req_alt, data_alt, requires_response=False) 
-
-            if response and response.get("e") == event_code_resp:
-                 candles_data = response.get("d")
-                 if isinstance(candles_data, list):
-                     logger.info(f"Received {len(candles_data)} candles for {pair}.")
-                     # TODO: Validate candle format [{p, t, open, low, high, close}, ...]
-                     return candles_data
-                 else:
-                     logger.error(f"Unexpected data format in candle response: {candles_data}")
-                     return None
-            else:
-                 logger.error(f"Did not receive expected candle response (e:{event_code_resp}). Got: {response}")
-                 return None
-
+            candles_data = await self._request_candles(pair, size, to_ts, count)
         except Exception as e:
             logger.error(f"Failed to get candles for {pair}: {e}")
             return None
+        if candles_data is not None:
+            logger.info(f"Received {len(candles_data)} candles for {pair}.")
+            return candles_data[-count:] if count > 0 else candles_data
+        return None
+
+    async def get_candle_range(self, pair: str, size: int, count: Optional[int] = None,
+                               start_time: Optional[Union[datetime, int]] = None,
+                               end_time: Optional[Union[datetime, int]] = None,
+                               page_size: Optional[int] = None, max_inflight: Optional[int] = None,
+                               as_numpy: bool = False, allow_gaps: bool = False) -> Optional[Union[List[Dict[str, Any]], Dict[str, Any]]]:
+        """
+        Fetches a long candle history as pages of e:10 requests kept in flight concurrently.
+
+        The range is `count` candles ending at end_time, or every candle from start_time to end_time.
+        It is split into pages of `page_size` candles (CANDLE_PAGE_SIZE), and up to `max_inflight`
+        (CANDLE_MAX_INFLIGHT) page requests are outstanding on the connection at once, each matched
+        to its response by uuid. Pages are merged, deduplicated by candle time and sorted.
+
+        e:10's "count" is not confirmed by the logbook: a server that ignores or caps it answers
+        short pages. Every candle time in the range is therefore checked after merging, and
+        missing runs are re-requested (up to CANDLE_GAP_MAX_ROUNDS rounds, while they make
+        progress). Candles still missing then fail the call, unless `allow_gaps=True` (e.g. a
+        market that was closed), which logs them and returns what there is.
+
+        Returns:
+            The candle dicts oldest first, or with as_numpy=True a dict of NumPy columns
+            {"t", "open", "high", "low", "close", "volume"}. None if any page fails or
+            candles are missing.
+        """
+        if count is None and start_time is None:
+            raise ValueError("get_candle_range needs count or start_time")
+        if as_numpy and np is None:
+            raise ImportError("as_numpy=True requires numpy (pip install numpy)")
+        page_size = page_size or parameters.CANDLE_PAGE_SIZE
+        max_inflight = max_inflight or parameters.CANDLE_MAX_INFLIGHT
+        to_ts = _to_timestamp(end_time)
+        last_start = to_ts // size * size
+        if start_time is not None:
+            first_start = -(-_to_timestamp(start_time) // size) * size # First candle starting at or after start_time
+            total = (last_start - first_start) // size + 1
+            count = total if count is None else min(count, total)
+        if count <= 0:
+            return _candle_columns([]) if as_numpy else []
+        first_start = last_start - (count - 1) * size
+
+        pages = _pages(last_start, count, size, page_size)
+        logger.info(f"Requesting {count} candles for {pair} (size: {size}s) in {len(pages)} page(s), "
+                    f"up to {max_inflight} in flight")
+        window = asyncio.Semaphore(max_inflight)
+        merged: Dict[int, Dict[str, Any]] = {}
+        requested = 0
+        last_missing = None
+        for round_ in range(parameters.CANDLE_GAP_MAX_ROUNDS + 1):
+            if not await self._fetch_pages(pair, size, pages, window, merged):
+                return None
+            requested += len(pages)
+            missing = [t for t in range(first_start, last_start + 1, size) if t not in merged]
+            if not missing or round_ == parameters.CANDLE_GAP_MAX_ROUNDS:
+                break
+            if last_missing is not None and len(missing) >= last_missing:
+                break # No progress: the server does not have these candles
+            last_missing = len(missing)
+            gaps = _runs(missing, size)
+            pages = [page for gap_end, gap_count in gaps for page in _pages(gap_end, gap_count, size, page_size)]
+            logger.warning(f"{len(missing)} candle(s) of {pair} missing after paging ({len(gaps)} gap(s)); "
+                           f"re-requesting {len(pages)} page(s)")
+
+        candles = [merged[t] for t in sorted(merged) if first_start <= t <= last_start]
+        if missing:
+            gaps = ", ".join(f"{gap_end - (gap_count - 1) * size}..{gap_end}" for gap_end, gap_count in _runs(missing, size)[:5])
+            if not allow_gaps:
+                logger.error(f"Candle range for {pair} is incomplete: {len(missing)} candle(s) missing ({gaps})")
+                return None
+            logger.warning(f"Returning candle range for {pair} with {len(missing)} candle(s) missing ({gaps})")
+        logger.info(f"Received {len(candles)} candles for {pair} in {requested} page(s).")
+        return _candle_columns(candles) if as_numpy else candles
+
+    async def _fetch_pages(self, pair: str, size: int, pages: List[Tuple[int, int]], window: asyncio.Semaphore,
+                           merged: Dict[int, Dict[str, Any]]) -> bool:
+        """Requests pages concurrently (bounded by `window`) into `merged` by candle time; False if one fails."""
+        async def fetch(page_to: int, page_count: int) -> List[Dict[str, Any]]:
+            async with window:
+                candles = await self._request_candles(pair, size, page_to, page_count)
+            if candles is None:
+                raise ValueError(f"No candles in response for page ending {page_to}")
+            return candles
+
+        tasks = [asyncio.create_task(fetch(page_to, page_count)) for page_to, page_count in pages]
+        try:
+            results = await asyncio.gather(*tasks)
+        except Exception as e:
+            for task in tasks:
+                task.cancel()
+            logger.error(f"Failed to get candle range for {pair}: {e}")
+            return False
+        for page in results:
+            for candle in page:
+                try:
+                    merged[int(candle["t"])] = candle
+                except (KeyError, TypeError, ValueError):
+                    continue
+        return True
+
+    async def _request_candles(self, pair: str, size: int, to_ts: int, count: int) -> Optional[List[Dict[str, Any]]]:
+        """One e:10 request; the candles of `pair` in the response, or None if it has none."""
+        # The log shows 'solid: true'. This *might* relate to fetching historical batch?
+        # Also saw event 282 sent along with 10 in logs, purpose unclear; not sent.
+        data = [{"pair": pair, "size": size, "to": to_ts, "count": count, "solid": True}] # 'solid' is a guess
+        response = await self._client.send_request(parameters.E_GET_CANDLES_REQUEST, data, requires_response=True)
+        if response and response.get("e") in (parameters.E_GET_CANDLES_REQUEST, parameters.E_GET_CANDLES_RESPONSE):
+            candles_data = _extract_candles(response.get("d"), pair)
+            if candles_data is None:
+                logger.error(f"Unexpected data format in candle response: {response.get('d')}")
+            return candles_data
+        logger.error(f"Did not receive expected candle response (e:{parameters.E_GET_CANDLES_RESPONSE}). Got: {response}")
+        return None
 
     async def get_profitability(self, account_id: int) -> Optional[List[Dict[str, Any]]]:
-        """Requests current profitability for assets (Event 182)."""
+        """
+        Requests current profitability for assets (Event 182) and refreshes the account's
+        table in `client.profitability`. Prefer `client.profitability.ensure()` / `.best()`,
+        which answer from the cache kept current by e:183.
+        """
         logger.info(f"Requesting asset profitability for account {account_id}...")
-        event_code = 182
+        event_code = parameters.E_ASSET_PROFITABILITY
         data = [{"account_id": account_id}]
         try:
             response = await self._client.send_request(event_code, data, requires_response=True)
@@ -128,6 +250,7 @@ class MarketAPI:
                 profit_data = response.get("d")
                 if isinstance(profit_data, list):
                     logger.info(f"Received profitability for {len(profit_data)} assets.")
+                    self._client.profitability.load(account_id, profit_data, replace=True)
                     return profit_data
                 else:
                      logger.error(f"Unexpected data format in profitability response: {profit_data}")
@@ -139,52 +262,35 @@ class MarketAPI:
             logger.error(f"Failed to get profitability: {e}")
             return None
 
-    async def select_asset(self, pair: str, category: str = "digital") -> Optional[Dict[str, Any]]:
+    async def select_asset(self, pair: str, category: str = "digital", timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
          """Selects an asset, potentially retrieving strike/payout info (Events 95, 80)."""
          logger.info(f"Selecting asset {pair} (category: {category})...")
-         event_code_select = 95
-         event_code_strikes = 80 # Often follows e:95 in logs
+         event_code_select = parameters.E_SELECT_ASSET
+         event_code_strikes = parameters.E_ASSET_STRIKES # Often follows e:95 in logs
          data = [{"cat": category, "pair": pair}]
+
+         def for_pair(message: Dict[str, Any]) -> bool:
+             return any(isinstance(item, dict) and item.get("p") == pair for item in message.get("d") or [])
+
+         # Event 80 is pushed after 95, not a direct response, and may arrive in the same frame:
+         # the waiter is registered before e:95 is sent.
+         strikes = self._client.expect(event_code_strikes, for_pair)
          try:
-             # Send e:95 request
              response_select = await self._client.send_request(event_code_select, data, requires_response=True)
              if not (response_select and response_select.get("e") == event_code_select):
                  logger.error(f"Failed to get confirmation for asset selection (e:{event_code_select}).")
                  # Decide if we should proceed to wait for strikes anyway
-             
-             logger.info(f"Asset {pair} selected. Waiting for strike/payout info (e:{event_code_strikes})...")
-             # Event 80 seems to be pushed after 95, not a direct response.
-             # We need a way to wait for a specific *unsolicited* event.
-             # Option 1: Register a temporary callback for e:80 with a filter for the pair.
-             # Option 2: Have a general e:80 callback update internal state, then retrieve it.
-             
-             # Using Option 1 (temporary callback) for demonstration:
-             future = asyncio.get_running_loop().create_future()
-
-             async def temp_strike_callback(message: Dict[str, Any]):
-                 strike_data_list = message.get("d", [])
-                 if isinstance(strike_data_list, list):
-                     for item in strike_data_list:
-                         # Check if this strike data is for the requested pair
-                         if isinstance(item, dict) and item.get("p") == pair:
-                              if not future.done():
-                                   future.set_result(item) # Return the specific strike data for the pair
-                              break # Found our pair
-
-             self._client.register_callback(event_code_strikes, temp_strike_callback)
-             
-             try:
-                 # Wait for the callback to set the future's result
-                 strike_info = await asyncio.wait_for(future, timeout=settings.DEFAULT_RESPONSE_TIMEOUT)
-                 logger.info(f"Received strike info for {pair}: {strike_info}")
-                 return strike_info
-             except asyncio.TimeoutError:
-                  logger.error(f"Timeout waiting for strike info (e:{event_code_strikes}) for {pair}.")
-                  return None
-             finally:
-                  # Always unregister the temporary callback
-                  self._client.unregister_callback(event_code_strikes, temp_strike_callback)
 
+             logger.info(f"Asset {pair} selected. Waiting for strike/payout info (e:{event_code_strikes})...")
+             message = await self._client.wait_for(event_code_strikes, timeout=timeout, future=strikes)
+             strike_info = next(item for item in message["d"] if isinstance(item, dict) and item.get("p") == pair)
+             logger.info(f"Received strike info for {pair}: {strike_info}")
+             return strike_info
+         except asyncio.TimeoutError:
+             logger.error(f"Timeout waiting for strike info (e:{event_code_strikes}) for {pair}.")
+             return None
          except Exception as e:
              logger.error(f"Failed during asset selection/strike retrieval for {pair}: {e}")
              return None
+         finally:
+             strikes.cancel() # No-op once resolved; withdraws the waiter if e:95 failed
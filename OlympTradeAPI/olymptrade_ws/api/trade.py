@@ -1,96 +1,173 @@
 # api/trade.py
+import asyncio
+import decimal
+import json
 import logging
+import math
+import numbers
+import statistics
 import time
-from typing import TYPE_CHECKING, Dict, Any, Optional, Literal, Union
+from collections import OrderedDict, deque
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Deque, Dict, Any, Iterable, Iterator, List, Optional, Literal, Tuple, Union
 
 
 from olymptrade_ws.core.protocol import get_current_timestamp_ms
+from olymptrade_ws.olympconfig import parameters
 
 if TYPE_CHECKING:
     from core.client import OlympTradeClient
 
 logger = logging.getLogger(__name__)
 
-class TradeAPI:
-    def __init__(self, client: 'OlympTradeClient'):
-        self._client = client
+class OrderTemplate:
+    """
+    A pre-serialized e:23 order for one pair/account/duration. Only amount, direction, timestamp
+    and the request uuid are filled in when an order is placed, by string concatenation.
+    """
 
-    async def place_trade(
-        self,
-        pair: str,
-        amount: Union[int, float],
-        direction: Literal["up", "down"],
-        duration: int, # In seconds, needs confirmation based on API
-        account_id: int,
-        group: Literal["real", "demo"] = "demo",
-        category: Literal["digital", "forex", "stocks"] = "digital", # Verify categories
-        source: str = "platform", # Seems constant in logs
-        position: int = 0, # Seems constant in logs
-        is_flex: bool = False, # Needs confirmation
-        risk_free_id: Optional[int] = None
-    ) -> Optional[Dict[str, Any]]:
-        """
-        Places a trade order.
+    __slots__ = ("pair", "static", "_head")
 
-        Args:
-            pair: Asset pair (e.g., "EURUSD").
-            amount: Trade amount.
-            direction: "up" or "down".
-            duration: Trade duration in seconds (needs confirmation).
-            account_id: The ID of the account to trade on.
-            group: "real" or "demo".
-            category: Trade category (e.g., "digital").
-            source: Source identifier (default "platform").
-            position: Position identifier (default 0).
-            is_flex: Flexibility flag (default False).
-            risk_free_id: ID for risk-free trade, if applicable.
+    def __init__(self, pair: str, duration: int, account_id: int, group: str, category: str = "digital",
+                 pos: int = 0, source: str = "platform", risk_free_id: Optional[int] = None, is_flex: bool = False):
+        self.pair = pair
+        self.static = {"pair": pair, "cat": category, "pos": pos, "source": source, "account_id": account_id,
+                       "group": group, "risk_free_id": risk_free_id, "is_flex": is_flex, "duration": duration}
+        fields = json.dumps(self.static, separators=(",", ":"))[1:-1]
+        self._head = f'[{{"t":2,"e":{parameters.E_PLACE_TRADE_REQUEST},"d":[{{{fields},"amount":'
 
-        Returns:
-            The initial trade confirmation dictionary from the server (Event 23 response),
-            or None on error. The final trade result comes via Event 26 callback.
+    @staticmethod
+    def _amount(amount: Union[int, float, decimal.Decimal, str]) -> Union[int, float]:
         """
-        event_code = 23
-        timestamp_ms = get_current_timestamp_ms()
-        
-        data = [{
-            "amount": amount,
-            "dir": direction,
-            "pair": pair,
-            "cat": category,
-            "pos": position,
-            "source": source,
-            "account_id": account_id,
-            "group": group,
-            "timestamp": timestamp_ms,
-            "risk_free_id": risk_free_id,
-            "is_flex": is_flex,
-            "duration": duration 
-        }]
-
-        logger.info(f"Placing {group} {category} trade: {pair} {direction} ${amount} for {duration}s")
-        
-        try:
-            response = await self._client.send_request(event_code, data, requires_response=True)
-            if response and response.get("e") == event_code:
-                 trade_details = response.get("d")
-                 if isinstance(trade_details, list) and len(trade_details) > 0:
-                     initial_status = trade_details[0]
-                     trade_id = initial_status.get("id")
-                     logger.info(f"Trade placed successfully (ID: {trade_id}). Initial status: {initial_status.get('status')}")
-                     # Note: This is the *initial* response. Updates (e:21, e:22, e:26) come separately.
-                     return initial_status # Return the first item in the data list
-                 else:
-                     logger.error(f"Unexpected data format in place trade response: {trade_details}")
-                     return None
-            else:
-                 # The response might contain error information
-                 error_msg = response.get("d") if response else "No response"
-                 logger.error(f"Failed to place trade. Response: {error_msg}")
-                 # You might want to parse the error message here if the structure is known
-                 return None # Indicate failure
-        except Exception as e:
-            logger.error(f"Exception placing trade: {e}")
-            return None
+        A plain int or float, so it serializes as a JSON number: numpy scalars, Decimal and numeric
+        strings ("10", "2.5") are converted. TypeError for anything else, ValueError if not finite.
+        """
+        if isinstance(amount, bool) or not isinstance(amount, (numbers.Real, decimal.Decimal, str)):
+            raise TypeError(f"amount must be a number, not {type(amount).__name__}")
+        if isinstance(amount, numbers.Integral):
+            amount = int(amount)
+        else:
+            try:
+                amount = float(amount)
+            except ValueError:
+                raise ValueError(f"Invalid amount {amount!r}") from None
+        if not math.isfinite(amount):
+            raise ValueError(f"Invalid amount {amount!r}")
+        return amount
+
+    def render(self, request_uuid: str, amount: Union[int, float], direction: str, timestamp: int) -> str:
+        """The complete request frame."""
+        if direction not in ("up", "down"):
+            raise ValueError(f"direction must be 'up' or 'down', not {direction!r}")
+        return (f'{self._head}{json.dumps(self._amount(amount))},"dir":"{direction}","timestamp":{int(timestamp)}}}],'
+                f'"uuid":"{request_uuid}"}}]')
+
+    def order(self, amount: Union[int, float], direction: str, timestamp: int) -> Dict[str, Any]:
+        """The order as a dict (what render() serializes), for logging and inspection."""
+        return {**self.static, "amount": self._amount(amount), "dir": direction, "timestamp": timestamp}
+
+
+class TradeHandle(Mapping):
+    """
+    A placed order, updated from dispatch as its e:22 / e:21 / e:26 pushes arrive.
+
+    Reads like the trade dict (latest server state): handle["id"], handle.get("status").
+    Await `accepted()` for e:22 and `closed()` (or the handle itself) for the e:26 result.
+    `timings` has the latency of each stage in milliseconds:
+
+        ack      order sent -> e:23 response
+        accept   e:23 response -> e:22 push
+        close    trade expiry (server close_time) -> e:26 push
+    """
+
+    def __init__(self, order: Dict[str, Any], sent_at: float, acked_at: float):
+        loop = asyncio.get_running_loop()
+        self.id = order.get("id")
+        self.data: Dict[str, Any] = dict(order)
+        self.sent_at = sent_at         # perf_counter() when the order was sent
+        self.acked_at = acked_at       # ... when its e:23 response arrived
+        self.accepted_at: Optional[float] = None
+        self.closed_at: Optional[float] = None
+        self.close_delay: Optional[float] = None # Seconds from close_time to the e:26 push
+        self.updates = 0               # Interim e:21 updates seen
+        self._accepted = loop.create_future()
+        self._closed = loop.create_future()
+
+    # --- Mapping over the latest trade state ---
+
+    def __getitem__(self, key: str) -> Any:
+        return self.data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return f"TradeHandle(id={self.id}, status={self.data.get('status')!r})"
+
+    # --- Lifecycle ---
+
+    @property
+    def done(self) -> bool:
+        return self._closed.done()
+
+    async def accepted(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """The trade dict once e:22 arrives (or e:26, for a trade closed before its e:22 was seen)."""
+        return await asyncio.wait_for(asyncio.shield(self._accepted), timeout)
+
+    async def closed(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """The final trade dict from e:26 (status "win"/"loose", balance_change, curs_close, ...)."""
+        return await asyncio.wait_for(asyncio.shield(self._closed), timeout)
+
+    def __await__(self):
+        return self.closed().__await__()
+
+    def _update(self, event_code: int, item: Dict[str, Any]):
+        now = time.perf_counter()
+        self.data.update(item)
+        if event_code == parameters.E_TRADE_UPDATE_INTERIM:
+            self.updates += 1
+            return
+        if self.accepted_at is None:
+            self.accepted_at = now
+        if not self._accepted.done():
+            self._accepted.set_result(dict(self.data)) # The trade as accepted; `data` keeps changing
+        if event_code == parameters.E_TRADE_CLOSED and not self._closed.done():
+            self.closed_at = now
+            close_time = self.data.get("close_time")
+            if isinstance(close_time, (int, float)):
+                self.close_delay = time.time() - close_time
+            self._closed.set_result(self.data)
+
+    def _fail(self, error: BaseException):
+        for future in (self._accepted, self._closed):
+            if not future.done():
+                future.set_exception(error)
+                future.exception() # Retrieved here; awaiting callers re-raise it
+
+    @property
+    def timings(self) -> Dict[str, Optional[float]]:
+        """Milliseconds per stage (None until reached)."""
+        def ms(start: Optional[float], end: Optional[float]) -> Optional[float]:
+            return (end - start) * 1000 if start is not None and end is not None else None
+        return {
+            "ack": ms(self.sent_at, self.acked_at),
+            "accept": ms(self.acked_at, self.accepted_at),
+            "close": self.close_delay * 1000 if self.close_delay is not None else None,
+        }
+
+
+class TradeAPI:
+    def __init__(self, client: 'OlympTradeClient'):
+        self._client = client
+        # Open trades by id: e:22/21/26 pushes resolve their handle with one lookup
+        self._handles: Dict[Any, TradeHandle] = {}
+        # Pushes for ids not (yet) known, e.g. an e:22 dispatched before its e:23 response
+        self._early: "OrderedDict[Any, List[tuple]]" = OrderedDict()
+        self.timings: Deque[Dict[str, Optional[float]]] = deque(maxlen=parameters.TRADE_TIMINGS_HISTORY)
+        self._templates: Dict[Tuple, OrderTemplate] = {}
 
     async def place_order(
         self,
@@ -106,7 +183,7 @@ class TradeAPI:
         timestamp: Optional[int] = None,
         risk_free_id: Optional[int] = None,
         is_flex: bool = False
-    ) -> Optional[Dict[str, Any]]:
+    ) -> Optional[TradeHandle]:
         """
         Places an order (trade) with the exact structure required by the API.
         Args:
@@ -123,50 +200,96 @@ class TradeAPI:
             risk_free_id: Risk-free id (default None).
             is_flex: Flex trade (default False).
         Returns:
-            The initial trade confirmation dictionary from the server (Event 23 response), or None on error.
+            A TradeHandle over the trade confirmation from the server (Event 23 response), or None
+            on error. It reads like that dict and can be awaited for acceptance (e:22) and the
+            result (e:26): `result = await handle`.
+        Raises:
+            TypeError / ValueError: `amount` is not a finite number (or numeric string); nothing is sent.
         """
-        event_code = 23
+        amount = OrderTemplate._amount(amount)
+        template = self.order_template(pair, duration, account_id, group, category, pos, source, risk_free_id, is_flex)
+        logger.info(f"Placing {group} {category} order: {pair} {direction} ${amount} for {duration}s")
+        return await self._submit(template, amount, direction, timestamp)
+
+    async def place_orders(self, orders: Iterable[Dict[str, Any]], duration: int = 60, account_id: Optional[int] = None,
+                           group: Literal["real", "demo"] = "demo", category: str = "digital") -> List[Optional[TradeHandle]]:
+        """
+        Places many orders at once, e.g. one per pair for signals raised in the same second.
+
+        All orders are sent concurrently over the connection (queued in the same loop tick, so with
+        `batch_sends=True` the outgoing batcher writes them as one multi-message frame) instead of one
+        e:23 round trip after another. Each order is a dict with "pair", "amount" and "direction", and may override
+        "duration", "account_id", "group" and the other place_order arguments.
+
+            handles = await client.trade.place_orders(
+                [{"pair": "EURUSD", "amount": 1, "direction": "up"},
+                 {"pair": "GBPUSD", "amount": 1, "direction": "down"}],
+                duration=60, account_id=demo_id)
+            print([h.timings["ack"] for h in handles if h])   # per-order e:23 latency, ms
+
+        Returns:
+            One TradeHandle per order, in order; None where that order failed.
+        Raises:
+            TypeError / ValueError: an amount is not a finite number; no order is sent.
+        """
+        orders = [{**order, "amount": OrderTemplate._amount(order["amount"])} for order in orders]
+        submits = []
+        for order in orders:
+            template = self.order_template(
+                order["pair"], order.get("duration", duration), order.get("account_id", account_id),
+                order.get("group", group), order.get("category", category), order.get("pos", 0),
+                order.get("source", "platform"), order.get("risk_free_id"), order.get("is_flex", False))
+            submits.append(self._submit(template, order["amount"], order["direction"], order.get("timestamp")))
+        logger.info(f"Placing {len(submits)} orders concurrently")
+        handles = await asyncio.gather(*submits)
+        acks = sorted(handle.timings["ack"] for handle in handles if handle is not None)
+        if acks:
+            logger.info(f"Placed {len(acks)}/{len(handles)} orders; e:23 ack p50 {statistics.median(acks):.1f} ms, "
+                        f"max {acks[-1]:.1f} ms")
+        return handles
+
+    def order_template(self, pair: str, duration: int, account_id: int, group: str = "demo", category: str = "digital",
+                       pos: int = 0, source: str = "platform", risk_free_id: Optional[int] = None,
+                       is_flex: bool = False) -> OrderTemplate:
+        """The cached template for these order fields; call ahead of time to keep it off the hot path."""
+        key = (pair, duration, account_id, group, category, pos, source, risk_free_id, is_flex)
+        template = self._templates.get(key)
+        if template is None:
+            template = self._templates[key] = OrderTemplate(*key)
+        return template
+
+    async def _submit(self, template: OrderTemplate, amount: Union[int, float], direction: str,
+                      timestamp: Optional[int] = None) -> Optional[TradeHandle]:
+        event_code = parameters.E_PLACE_TRADE_REQUEST
         if timestamp is None:
-            from olymptrade_ws.core.protocol import get_current_timestamp_ms
             timestamp = get_current_timestamp_ms()
-        data = [{
-            "amount": amount,
-            "dir": direction,
-            "pair": pair,
-            "cat": category,
-            "pos": pos,
-            "source": source,
-            "account_id": account_id,
-            "group": group,
-            "timestamp": timestamp,
-            "risk_free_id": risk_free_id,
-            "is_flex": is_flex,
-            "duration": duration
-        }]
-        logger.info(f"Placing {group} {category} order: {pair} {direction} ${amount} for {duration}s")
         try:
-            response = await self._client.send_request(event_code, data, requires_response=True)
+            sent_at = time.perf_counter()
+            response = await self._client.send_prepared(
+                event_code, lambda request_uuid: template.render(request_uuid, amount, direction, timestamp))
+            acked_at = time.perf_counter()
             if response and response.get("e") == event_code:
                 trade_details = response.get("d")
                 if isinstance(trade_details, list) and len(trade_details) > 0:
                     initial_status = trade_details[0]
                     trade_id = initial_status.get("id")
                     logger.info(f"Order placed successfully (ID: {trade_id}). Initial status: {initial_status.get('status')}")
-                    return initial_status
+                    return self._track(TradeHandle(initial_status, sent_at, acked_at))
                 else:
                     logger.error(f"Unexpected data format in place order response: {trade_details}")
                     return None
             else:
                 error_msg = response.get("d") if response else "No response"
-                logger.error(f"Failed to place order. Response: {error_msg}")
+                logger.error(f"Failed to place order {template.order(amount, direction, timestamp)}. Response: {error_msg}")
                 return None
         except Exception as e:
-            logger.error(f"Exception placing order: {e}")
+            logger.error(f"Exception placing order on {template.pair}: {e}")
             return None
 
     async def get_open_trades(self, account_id: int, group: str = "real") -> Optional[list[Dict[str, Any]]]:
          """
          Requests currently open trades.
+         client.state.open_trades() answers the same from the local mirror, without a round trip.
          NOTE: Event 31 is used in logs, but the response 'd' is empty.
                This might require different parameters or the log missed the actual data push.
                Functionality needs verification.
@@ -193,6 +316,91 @@ class TradeAPI:
              logger.error(f"Failed to get open trades: {e}")
              return None
 
+    async def wait_for_result(self, trade: Union[int, Mapping], timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Waits for the final result (Event 26) of a placed trade and returns its trade dict
+        (status "win"/"loose", balance_change, curs_close, ...), or None on timeout.
+
+        Args:
+            trade: The trade id, or the handle/dict returned by place_order.
+            timeout: Seconds to wait. Defaults to the time left until the trade's close_time
+                     (when `trade` carries it) plus DEFAULT_RESPONSE_TIMEOUT.
+        """
+        trade_id = trade.get("id") if isinstance(trade, Mapping) else trade
+        if timeout is None:
+            close_time = trade.get("close_time") if isinstance(trade, Mapping) else None
+            timeout = parameters.DEFAULT_RESPONSE_TIMEOUT + (max(0.0, close_time - time.time()) if close_time else 0.0)
+        handle = trade if isinstance(trade, TradeHandle) else self._handles.get(trade_id)
+        if handle is not None:
+            try:
+                return await handle.closed(timeout)
+            except asyncio.TimeoutError:
+                logger.error(f"Timeout waiting for the result (e:{parameters.E_TRADE_CLOSED}) of trade {trade_id}.")
+                return None
+
+        def closes_trade(message: Dict[str, Any]) -> bool:
+            return any(isinstance(item, dict) and item.get("id") == trade_id for item in message.get("d") or [])
+
+        try:
+            message = await self._client.wait_for(parameters.E_TRADE_CLOSED, closes_trade, timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Timeout waiting for the result (e:{parameters.E_TRADE_CLOSED}) of trade {trade_id}.")
+            return None
+        result = next(item for item in message["d"] if isinstance(item, dict) and item.get("id") == trade_id)
+        logger.info(f"Trade {trade_id} closed: {result.get('status')} ({result.get('balance_change')})")
+        return result
+
+    # --- Lifecycle tracking ---
+
+    def _track(self, handle: TradeHandle) -> TradeHandle:
+        if handle.id is None:
+            return handle
+        self._handles[handle.id] = handle
+        for event_code, item in self._early.pop(handle.id, ()):
+            self._apply(handle, event_code, item)
+        return handle
+
+    def _apply(self, handle: TradeHandle, event_code: int, item: Dict[str, Any]):
+        handle._update(event_code, item)
+        if handle.done:
+            del self._handles[handle.id]
+            self.timings.append(handle.timings)
+
+    def _on_trade_event(self, message: Dict[str, Any]):
+        """Internal e:22 / e:21 / e:26 handler, run from dispatch before callbacks."""
+        event_code = message.get("e")
+        for item in message.get("d") or ():
+            if not isinstance(item, dict) or item.get("id") is None:
+                continue
+            handle = self._handles.get(item["id"])
+            if handle is not None:
+                self._apply(handle, event_code, item)
+            else:
+                # Possibly our own order whose e:23 response is still being processed
+                self._early.setdefault(item["id"], []).append((event_code, item))
+                if len(self._early) > parameters.TRADE_EARLY_EVENTS:
+                    self._early.popitem(last=False)
+
+    def fail_open(self, error: BaseException):
+        """Fails every open handle (e.g. the session ended before their results arrived)."""
+        for handle in self._handles.values():
+            handle._fail(error)
+        self._handles.clear()
+
+    @property
+    def open_handles(self) -> List[TradeHandle]:
+        return list(self._handles.values())
+
+    def latency_summary(self) -> Dict[str, Dict[str, float]]:
+        """Median, p90 and max per stage (ms) over the last TRADE_TIMINGS_HISTORY closed trades."""
+        summary = {}
+        for stage in ("ack", "accept", "close"):
+            values = sorted(t[stage] for t in self.timings if t[stage] is not None)
+            if values:
+                summary[stage] = {"count": len(values), "p50": statistics.median(values),
+                                  "p90": values[min(len(values) - 1, int(len(values) * 0.9))], "max": values[-1]}
+        return summary
+
     # Add subscribe/unsubscribe for trade updates (e:21, e:22, e:26) if needed,
     # likely using the generic event 98 subscription mechanism.
 
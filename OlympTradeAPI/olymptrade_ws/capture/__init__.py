@@ -0,0 +1,18 @@
+# olymptrade_ws/capture/__init__.py
+# Record WebSocket sessions and replay them deterministically (tests, benchmarks, debugging)
+from .format import CaptureReader, CaptureWriter, CapturedFrame, RECEIVED, SENT, load_frames
+from .logbook import import_logbook, iter_logbook
+from .replay import Replayer, ReplayStats
+
+__all__ = [
+    "CaptureReader",
+    "CaptureWriter",
+    "CapturedFrame",
+    "RECEIVED",
+    "SENT",
+    "load_frames",
+    "import_logbook",
+    "iter_logbook",
+    "Replayer",
+    "ReplayStats"
+]
@@ -0,0 +1,88 @@
+# capture/__main__.py
+# Work with capture files from the command line:
+#   python -m olymptrade_ws.capture import logs/message_logbook.md captures/session.jsonl.gz
+#   python -m olymptrade_ws.capture info captures/session.jsonl.gz
+#   python -m olymptrade_ws.capture replay captures/session.jsonl.gz --speed 0
+import argparse
+import asyncio
+import json
+import logging
+from collections import Counter
+
+from olymptrade_ws.olympconfig import parameters
+from .format import CaptureReader, RECEIVED
+from .logbook import import_logbook
+from .replay import Replayer
+
+
+def _event_counts(frames) -> Counter:
+    counts = Counter()
+    for frame in frames:
+        try:
+            messages = json.loads(frame.frame)
+        except ValueError:
+            counts["invalid"] += 1
+            continue
+        for message in messages if isinstance(messages, list) else []:
+            if isinstance(message, dict):
+                counts[f"e:{message.get('e')}"] += 1
+    return counts
+
+
+def cmd_import(args):
+    count = import_logbook(args.logbook, args.output, step=args.step)
+    print(f"Wrote {count} frames to {args.output}")
+
+
+def cmd_info(args):
+    reader = CaptureReader(args.capture)
+    frames = list(reader)
+    received = [frame for frame in frames if frame.direction == RECEIVED]
+    span = frames[-1].ts - frames[0].ts if frames else 0.0
+    print(f"Header:   {reader.header}")
+    print(f"Frames:   {len(frames)} ({len(received)} received, {len(frames) - len(received)} sent)")
+    print(f"Bytes:    {sum(len(frame.frame) for frame in frames)}")
+    print(f"Duration: {span:.3f}s")
+    for event, count in _event_counts(frames).most_common():
+        print(f"  {event:<8} {count}")
+
+
+async def cmd_replay(args):
+    # Replays into an offline client: exercises parsing and dispatch without a socket
+    from olymptrade_ws.core.client import OlympTradeClient
+    client = OlympTradeClient(access_token="replay")
+    replayer = Replayer(args.capture, speed=args.speed, max_gap=args.max_gap)
+    stats = await replayer.into_client(client)
+    print(f"Replayed {stats.frames} frames ({stats.bytes} bytes) in {stats.elapsed:.3f}s "
+          f"= {stats.frames_per_second:.0f} frames/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OlympTrade WebSocket capture tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_import = sub.add_parser("import", help="Convert a markdown raw-message logbook into a capture")
+    p_import.add_argument("logbook")
+    p_import.add_argument("output", help="Capture path (.gz for compression)")
+    p_import.add_argument("--step", type=float, default=0.001, help="Seconds between frames without a server ts")
+
+    p_info = sub.add_parser("info", help="Summarize a capture")
+    p_info.add_argument("capture")
+
+    p_replay = sub.add_parser("replay", help="Replay received frames through the client dispatch path")
+    p_replay.add_argument("capture")
+    p_replay.add_argument("--speed", type=float, default=1.0, help="Playback speed multiplier, 0 = as fast as possible")
+    p_replay.add_argument("--max-gap", type=float, default=5.0, help="Cap on any single pause, in seconds")
+
+    args = parser.parse_args()
+    if args.command == "import":
+        cmd_import(args)
+    elif args.command == "info":
+        cmd_info(args)
+    else:
+        asyncio.run(cmd_replay(args))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=parameters.LOG_LEVEL, format=parameters.LOG_FORMAT)
+    main()
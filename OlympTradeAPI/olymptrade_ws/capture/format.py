@@ -0,0 +1,98 @@
+# capture/format.py
+import gzip
+import io
+import json
+import time
+from dataclasses import dataclass
+from typing import IO, Iterable, Iterator, List, Optional, Union
+
+CAPTURE_FORMAT = "olymptrade-capture"
+CAPTURE_VERSION = 1
+
+SENT = "s"
+RECEIVED = "r"
+
+
+@dataclass
+class CapturedFrame:
+    """One WebSocket frame as it went over the wire."""
+    ts: float          # Seconds since epoch when the frame was sent/received
+    direction: str     # SENT ("s") or RECEIVED ("r")
+    frame: str         # The raw frame text, byte-for-byte
+
+    @property
+    def received(self) -> bool:
+        return self.direction == RECEIVED
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    """Open a capture file, transparently gzip-compressed when the name ends in .gz."""
+    if path.endswith(".gz"):
+        return io.TextIOWrapper(gzip.open(path, mode + "b"), encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class CaptureWriter:
+    """
+    Writes a capture file: a JSON header line followed by one compact JSON line per frame,
+    `[ts, direction, frame]`. Frames are stored as the raw text so replays are exact.
+    Use a `.gz` suffix for gzip compression (real traffic compresses ~10x).
+    """
+
+    def __init__(self, path: str, source: Optional[str] = None):
+        self.path = path
+        self.frames_written = 0
+        self._file = _open(path, "w")
+        header = {"format": CAPTURE_FORMAT, "version": CAPTURE_VERSION, "created": time.time()}
+        if source:
+            header["source"] = source
+        self._file.write(json.dumps(header) + "\n")
+
+    def write(self, direction: str, frame: str, ts: Optional[float] = None):
+        self._file.write(json.dumps([round(ts if ts is not None else time.time(), 6), direction, frame],
+                                    ensure_ascii=False, separators=(",", ":")) + "\n")
+        self.frames_written += 1
+
+    def write_frames(self, frames: Iterable[CapturedFrame]):
+        for frame in frames:
+            self.write(frame.direction, frame.frame, frame.ts)
+
+    def close(self):
+        if self._file and not self._file.closed:
+            self._file.close()
+
+    def __enter__(self) -> "CaptureWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CaptureReader:
+    """Iterates the frames of a capture file written by CaptureWriter."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with _open(path, "r") as f:
+            self.header = json.loads(f.readline())
+        if self.header.get("format") != CAPTURE_FORMAT:
+            raise ValueError(f"{path} is not an {CAPTURE_FORMAT} file")
+        if self.header.get("version", 0) > CAPTURE_VERSION:
+            raise ValueError(f"{path} uses capture version {self.header['version']}, newer than supported")
+
+    def __iter__(self) -> Iterator[CapturedFrame]:
+        with _open(self.path, "r") as f:
+            f.readline()  # Header
+            for line in f:
+                if line.strip():
+                    ts, direction, frame = json.loads(line)
+                    yield CapturedFrame(ts, direction, frame)
+
+    def frames(self, direction: Optional[str] = None) -> List[CapturedFrame]:
+        return [frame for frame in self if direction is None or frame.direction == direction]
+
+
+def load_frames(source: Union[str, Iterable[CapturedFrame]], direction: Optional[str] = None) -> List[CapturedFrame]:
+    """Frames from a capture path or an iterable of frames, optionally filtered by direction."""
+    frames = CaptureReader(source) if isinstance(source, str) else source
+    return [frame for frame in frames if direction is None or frame.direction == direction]
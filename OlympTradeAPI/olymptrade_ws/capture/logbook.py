@@ -0,0 +1,74 @@
+# capture/logbook.py
+import json
+import logging
+from typing import Iterator, List, Optional
+
+from .format import CapturedFrame, CaptureWriter, SENT, RECEIVED, _open
+
+logger = logging.getLogger(__name__)
+
+# Direction markers written by OlympTradeClient._log_raw
+_MARKERS = {
+    "📤 SENT ➜ ": SENT,
+    "📥 RECEIVED ➜ ": RECEIVED,
+}
+
+
+def _frame_timestamp(frame: str) -> Optional[float]:
+    """Server timestamp ("ts", seconds) carried by some messages in a frame, if any."""
+    try:
+        messages = json.loads(frame)
+    except ValueError:
+        return None
+    for message in messages if isinstance(messages, list) else []:
+        if isinstance(message, dict) and isinstance(message.get("ts"), (int, float)):
+            return float(message["ts"])
+    return None
+
+
+def iter_logbook(path: str, step: float = 0.001) -> Iterator[CapturedFrame]:
+    """
+    Parse a markdown raw-message logbook into frames.
+
+    The logbook has no timestamps of its own, so times are reconstructed: frames that carry
+    a server "ts" (e.g. e:90 pongs, e:110 pushes) anchor the clock, and every other frame is
+    placed `step` seconds after the previous one. Replays at 1x therefore keep the real gaps
+    between anchored frames and run everything in between back-to-back.
+    """
+    parsed = []
+    block: List[str] = []
+    in_block = False
+    with _open(path, "r") as f: # Rotated logbooks are gzipped
+        for line in f:
+            line = line.rstrip("\n")
+            if line.startswith("```json"):
+                in_block, block = True, []
+                continue
+            if line.startswith("```") and in_block:
+                in_block = False
+                text = "\n".join(block)
+                for marker, direction in _MARKERS.items():
+                    if text.startswith(marker):
+                        frame = text[len(marker):]
+                        anchor = _frame_timestamp(frame) if direction == RECEIVED else None
+                        parsed.append((direction, frame, anchor))
+                        break
+                else:
+                    logger.debug(f"Skipping unrecognized logbook block: {text[:80]}")
+                continue
+            if in_block:
+                block.append(line)
+
+    # Start the clock so that the first anchored frame lands on its own timestamp
+    first_anchor = next(((i, anchor) for i, (_, _, anchor) in enumerate(parsed) if anchor is not None), (0, 0.0))
+    clock = first_anchor[1] - step * (first_anchor[0] + 1)
+    for direction, frame, anchor in parsed:
+        clock = anchor if anchor is not None and anchor > clock else clock + step
+        yield CapturedFrame(round(clock, 6), direction, frame)
+
+
+def import_logbook(path: str, output: str, step: float = 0.001) -> int:
+    """Convert a markdown logbook into a capture file. Returns the number of frames written."""
+    with CaptureWriter(output, source=path) as writer:
+        writer.write_frames(iter_logbook(path, step))
+        return writer.frames_written
@@ -0,0 +1,78 @@
+# capture/replay.py
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Awaitable, Callable, Iterable, Optional, Union
+
+from .format import CapturedFrame, RECEIVED, load_frames
+
+if TYPE_CHECKING:
+    from olymptrade_ws.core.client import OlympTradeClient
+    from olymptrade_ws.fakeserver import FakeOlympTradeServer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReplayStats:
+    frames: int = 0
+    bytes: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def frames_per_second(self) -> float:
+        return self.frames / self.elapsed if self.elapsed else float("inf")
+
+
+class Replayer:
+    """
+    Plays captured frames into a sink at their recorded pace.
+
+    speed: 1.0 replays in real time, N replays N times faster, None (or 0) replays
+           as fast as the sink accepts frames.
+    max_gap: cap on any single pause (seconds, before speed scaling), so captures
+             spanning several sessions do not sit idle for hours.
+    """
+
+    def __init__(self, frames: Union[str, Iterable[CapturedFrame]], speed: Optional[float] = 1.0,
+                 max_gap: Optional[float] = None, direction: Optional[str] = RECEIVED):
+        self.frames = load_frames(frames, direction)
+        self.speed = speed or None
+        self.max_gap = max_gap
+
+    async def play(self, sink: Callable[[str], Awaitable[None]]) -> ReplayStats:
+        stats = ReplayStats()
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        start_at = loop.time()
+        offset = 0.0
+        previous_ts = self.frames[0].ts if self.frames else 0.0
+
+        for frame in self.frames:
+            if self.speed is not None:
+                gap = max(0.0, frame.ts - previous_ts)
+                if self.max_gap is not None:
+                    gap = min(gap, self.max_gap)
+                offset += gap / self.speed
+                delay = start_at + offset - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            previous_ts = frame.ts
+            await sink(frame.frame)
+            stats.frames += 1
+            stats.bytes += len(frame.frame)
+
+        stats.elapsed = time.perf_counter() - started
+        logger.info(f"Replayed {stats.frames} frames in {stats.elapsed:.3f}s ({stats.frames_per_second:.0f} frames/s)")
+        return stats
+
+    async def into_client(self, client: 'OlympTradeClient') -> ReplayStats:
+        """Feed received frames through the client's receive path (parse + dispatch), no socket needed."""
+        stats = await self.play(client.process_raw_message)
+        await client.flush_callbacks()
+        return stats
+
+    async def into_server(self, server: 'FakeOlympTradeServer') -> ReplayStats:
+        """Have a fake server push the frames to every connected client, over a real WebSocket."""
+        return await self.play(server.push_raw)
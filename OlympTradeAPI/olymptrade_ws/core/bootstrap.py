@@ -0,0 +1,108 @@
+# core/bootstrap.py
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from olymptrade_ws.olympconfig import parameters
+
+logger = logging.getLogger(__name__)
+
+# Clients of one process (e.g. an AccountManager) may share a cache file: read-modify-write per path is serialized
+_PATH_LOCKS: Dict[str, threading.Lock] = {}
+_PATH_LOCKS_GUARD = threading.Lock()
+
+
+def token_subject(access_token: str) -> str:
+    """
+    Stable key for the account behind an access token: the JWT's user id (or `sub`),
+    read without verifying the signature. Opaque tokens fall back to a hash of the token.
+    """
+    try:
+        payload = access_token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        subject = claims.get("user_id") or claims.get("sub")
+        if subject is not None:
+            return f"user:{subject}"
+    except (IndexError, ValueError, AttributeError):
+        pass
+    return "token:" + hashlib.sha256(access_token.encode()).hexdigest()[:16]
+
+
+class AccountCache:
+    """
+    Account discovery results (e:1068) kept on disk across restarts, keyed by token subject.
+
+    A small JSON file: {subject: {"account_id", "group", "saved_at"}}. Entries older than
+    `max_age` seconds are ignored. Writes go to a temporary file that replaces the old one,
+    so a crash mid-write never leaves a truncated cache.
+    """
+
+    def __init__(self, path: str, max_age: Optional[float] = None):
+        self.path = path
+        self.max_age = parameters.BOOTSTRAP_CACHE_MAX_AGE if max_age is None else max_age
+        with _PATH_LOCKS_GUARD:
+            self._lock = _PATH_LOCKS.setdefault(os.path.abspath(path), threading.Lock())
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable account cache {self.path}: {e}")
+            return {}
+
+    def get(self, subject: str) -> Optional[Dict[str, Any]]:
+        entry = self._read().get(subject)
+        if not isinstance(entry, dict) or entry.get("account_id") is None:
+            return None
+        if self.max_age and time.time() - entry.get("saved_at", 0) > self.max_age:
+            return None
+        return entry
+
+    def put(self, subject: str, account_id: Any, group: Optional[str]):
+        with self._lock:
+            data = self._read()
+            data[subject] = {"account_id": account_id, "group": group, "saved_at": time.time()}
+            self._write(data)
+
+    def discard(self, subject: str):
+        with self._lock:
+            data = self._read()
+            if data.pop(subject, None) is not None:
+                self._write(data)
+
+    def _write(self, data: Dict[str, Any]):
+        directory = os.path.dirname(self.path)
+        tmp_path = f"{self.path}.tmp"
+        try:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write account cache {self.path}: {e}")
+
+
+@dataclass
+class BootstrapStats:
+    """Startup timings of the last initialize_session, exposed as `client.bootstrap_stats`."""
+    connect: Optional[float] = None          # Seconds from start() to the WebSocket being open
+    subscribe: Optional[float] = None        # Seconds for the e:98 groups and pings, sent together
+    discovery: Optional[float] = None        # Seconds to know account_id (0 when already known or cached)
+    resync: Optional[float] = None           # Seconds for the e:1043 / e:31 state reload
+    connect_to_ready: Optional[float] = None # Seconds from start() until initialize_session returned
+    discovery_source: Optional[str] = None   # "known", "cache", "server" or None if not found
+    sessions: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
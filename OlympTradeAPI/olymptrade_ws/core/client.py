@@ -1,45 +1,102 @@
 # core/client.py
 import asyncio
 import logging
-from typing import Any, Dict, Optional, Callable, Awaitable, List, Coroutine
-from collections import defaultdict
+import time
+from typing import Any, Dict, Optional, Callable, Awaitable, List, Coroutine, Tuple
 # core/client.py - Line 6 (Corrected)
 from olymptrade_ws.olympconfig import parameters
-from .connection import Connection
+from .connection import AuthenticationError, Connection
 from .protocol import format_message, parse_message, generate_uuid
+from .bootstrap import AccountCache, BootstrapStats, token_subject
+from .dispatcher import POOL, EventDispatcher
+from .ingress import IngressQueue
+from .pool import ConnectionPool
+from .profitability import ProfitabilityCache
+from .rawlog import RawLogWriter
+from .reconnect import Backoff, MessageClock, ReconnectStats
+from .state import StateMirror
+from .subscriptions import SubscriptionManager
+from olymptrade_ws.capture.format import CaptureWriter, SENT, RECEIVED
 from olymptrade_ws.api import balance, market, trade # Import API modules
 import olymptrade_ws.olympconfig.parameters as settings
 
 logger = logging.getLogger(__name__)
 
 class OlympTradeClient:
-    def __init__(self, access_token: str, uri: str = parameters.DEFAULT_WEBSOCKET_URI, log_raw_messages: bool = False, account_id: int = None, account_group: str = None):
-        logger.info(f"Initializing OlympTradeClient with uri={uri}, log_raw_messages={log_raw_messages}, account_id={account_id}, account_group={account_group}")
+    def __init__(self, access_token: str, uri: str = parameters.DEFAULT_WEBSOCKET_URI, log_raw_messages: bool = False, account_id: int = None, account_group: str = None, capture_path: Optional[str] = None, auto_reconnect: bool = True, max_reconnect_attempts: Optional[int] = parameters.RECONNECT_MAX_ATTEMPTS, dispatch_mode: str = parameters.DISPATCH_MODE, callback_workers: int = parameters.CALLBACK_WORKERS, on_callback_error: Optional[Callable[[int, Callable, BaseException], None]] = None, fast_receive: bool = parameters.FAST_RECEIVE, raw_log_file: Optional[str] = None, batch_sends: bool = parameters.SEND_BATCHING, account_cache: Optional[str] = parameters.BOOTSTRAP_CACHE_FILE, connections: int = parameters.POOL_CONNECTIONS, failover: bool = parameters.HEALTH_FAILOVER, token_provider: Optional[Callable[[], Awaitable[Optional[str]]]] = None):
+        logger.info(f"Initializing OlympTradeClient with uri={uri}, log_raw_messages={log_raw_messages}, account_id={account_id}, account_group={account_group}, capture_path={capture_path}, auto_reconnect={auto_reconnect}")
         self.access_token = access_token
+        # Called for a fresh token when the server refuses the current one (start and reconnect)
+        self.token_provider = token_provider
         self.uri = uri
         self.account_id = account_id
         self.account_group = account_group
-        self.message_queue = asyncio.Queue()
-        self.connection = Connection(self.uri, self.access_token, self.message_queue, self._connection_lost_handler)
+        # Bounded: ticks coalesce and noisy events drop under pressure, responses and trades never do
+        self.message_queue = IngressQueue(tap=self._record_received)
+        # Pool callbacks may wait on responses: resolve those in the receiver, never behind a full callback queue
+        self.fast_receive = fast_receive or dispatch_mode == POOL
+        self._batch_sends = batch_sends
+        # connections >= 2: primary + dedicated trade connection + tick shards, one receive path
+        self.pool: Optional[ConnectionPool] = ConnectionPool(self._make_connection, connections) if connections > 1 else None
+        self.connection = self.pool.primary if self.pool else self._make_connection("primary")
         
         self._response_futures: Dict[str, asyncio.Future] = {}
-        self._event_callbacks: Dict[int, List[Callable[[Dict[str, Any]], Coroutine[Any, Any, None]]]] = defaultdict(list)
+        self._request_connections: Dict[str, Connection] = {} # uuid -> connection it went out on (pool mode)
+        # Unsolicited events go through a precomputed event-code table to inline or pooled callbacks
+        self._dispatcher = EventDispatcher(mode=dispatch_mode, workers=callback_workers,
+                                           queue_size=parameters.CALLBACK_QUEUE_SIZE, on_error=on_callback_error)
+        # Synchronous state updates run for pushed events before any callback sees them
+        self._internal_handlers: Dict[int, Tuple[Callable[[Dict[str, Any]], None], ...]] = {}
+        self._add_internal_handler(settings.E_BALANCE_UPDATE, self._on_balance_update)
+        # One-shot waiters (wait_for/expect), checked as each pushed event is dispatched
+        self._waiters: Dict[int, List[Tuple[Optional[Callable[[Dict[str, Any]], bool]], asyncio.Future]]] = {}
         self._is_running = False
         self._processing_task: Optional[asyncio.Task] = None
         self._ping_task: Optional[asyncio.Task] = None
         self._log_raw_messages = log_raw_messages
-        self._raw_log_file = "logs/message_logbook.md" # Consider making configurable
+        self._raw_log_file = raw_log_file or parameters.RAW_LOG_FILE
+        # Batched, rotating logbook writer; drops (and counts) frames rather than blocking the loop
+        self._raw_log = RawLogWriter(self._raw_log_file) if log_raw_messages else None
+        # Timestamped capture of every frame for later replay (see olymptrade_ws.capture)
+        self._capture = CaptureWriter(capture_path) if capture_path else None
+
+        # --- Reconnection ---
+        self.auto_reconnect = auto_reconnect
+        self.max_reconnect_attempts = max_reconnect_attempts
+        self.reconnect_stats = ReconnectStats()
+        self._message_clock = MessageClock()
+        self._inflight: Dict[str, Tuple[int, str]] = {} # uuid -> (event_code, raw frame) for replayable requests
+        self._reconnect_tasks: Dict[Connection, asyncio.Task] = {}
+        # Health failover: a degraded connection is replaced (new one first) instead of waiting for it to drop
+        self.failover = failover
+        self._failover_tasks: Dict[str, asyncio.Task] = {}
+        self._last_failover: Dict[str, float] = {}
+
+        # --- Session bootstrap ---
+        self._account_cache = AccountCache(account_cache) if account_cache else None
+        self.bootstrap_stats = BootstrapStats()
+        self._session_initialized = False
+        self._start_time: Optional[float] = None
+        self.subscriptions = SubscriptionManager(self) # Reference-counted tick pairs and e:98 groups
+        # Open trades and balances mirrored from pushes, answered locally
+        self.state = StateMirror(self)
+        self._add_internal_handler(settings.E_BALANCE_UPDATE, self.state.on_balance)
+        # Per-account payouts: seeded from e:182, kept current from e:183
+        self.profitability = ProfitabilityCache(self)
+        self._add_internal_handler(settings.E_ASSET_PROFITABILITY_UPDATE, self.profitability.on_update)
 
         # --- API Modules ---
         self.balance = balance.BalanceAPI(self)
         self.market = market.MarketAPI(self)
         self.trade = trade.TradeAPI(self)
+        # Trade pushes resolve place_order handles straight from dispatch
+        for event_code in (settings.E_TRADE_ACCEPTED, settings.E_TRADE_UPDATE_INTERIM, settings.E_TRADE_CLOSED):
+            self._add_internal_handler(event_code, self.state.on_trade_event)
+            self._add_internal_handler(event_code, self.trade._on_trade_event)
         # Add other API modules here
 
         # --- Internal State ---
         self._latest_balance: Dict[str, Any] = {} # Store latest balance update (e:55)
-        self.account_id = None
-        self.account_group = None # To store the account group (demo/real)
 
 
     async def start(self):
@@ -49,10 +106,18 @@ class OlympTradeClient:
             return
         
         try:
-            await self.connection.connect()
+            self._start_time = time.monotonic()
+            try:
+                await (self.pool.connect() if self.pool else self.connection.connect())
+            except AuthenticationError:
+                if not await self.renew_token():
+                    raise
+                await (self.pool.connect() if self.pool else self.connection.connect())
+            self.bootstrap_stats.connect = time.monotonic() - self._start_time
             self._is_running = True
             self._processing_task = asyncio.create_task(self._process_messages())
             self._ping_task = asyncio.create_task(self._ping_loop())
+            self.state.schedule_resync() # One-time reload of balances/open trades for this connection
             logger.info("Client started successfully.")
         except ConnectionError as e:
             logger.error(f"Client failed to start: {e}")
@@ -72,8 +137,12 @@ class OlympTradeClient:
             self._ping_task.cancel()
         if self._processing_task and not self._processing_task.done():
             self._processing_task.cancel()
+        for task in [*self._reconnect_tasks.values(), *self._failover_tasks.values()]:
+            if not task.done():
+                task.cancel()
             
-        await self.connection.disconnect()
+        await (self.pool.disconnect() if self.pool else self.connection.disconnect())
+        await self._dispatcher.stop()
 
         # Wait for tasks to finish cancellation
         try:
@@ -89,46 +158,275 @@ class OlympTradeClient:
             if not fut.done():
                 fut.cancel("Client stopping")
         self._response_futures.clear()
+        self._request_connections.clear()
+        self._inflight.clear()
+        for waiters in self._waiters.values():
+            for _, fut in waiters:
+                fut.cancel("Client stopping")
+        self._waiters.clear()
+        self.trade.fail_open(ConnectionError("Client stopped"))
+        if self._capture:
+            self._capture.close()
+        if self._raw_log:
+            await asyncio.to_thread(self._raw_log.close)
+
 
+    def _make_connection(self, name: str) -> Connection:
+        connection = Connection(self.uri, self.access_token, self.message_queue,
+                                frame_handler=self._receive_frame if self.fast_receive else None,
+                                batch_sends=self._batch_sends, name=name)
+        connection.connection_lost_callback = lambda: self._connection_lost_handler(connection)
+        return connection
+
+    @property
+    def connections(self) -> List[Connection]:
+        return self.pool.connections if self.pool else [self.connection]
 
-    async def _connection_lost_handler(self):
+    def _route(self, event_code: int) -> Connection:
+        return self.pool.route(event_code) if self.pool else self.connection
+
+    def tick_connections(self, pairs: List[str]) -> Dict[Connection, List[str]]:
+        """Pairs grouped by the connection their tick subscription (and e:1 stream) lives on."""
+        return self.pool.split_pairs(pairs) if self.pool else {self.connection: list(pairs)}
+
+    async def _connection_lost_handler(self, connection: Optional[Connection] = None):
         """Callback executed by Connection when the websocket closes unexpectedly."""
-        logger.warning("Connection lost. Attempting to clean up and stop client.")
-        # Signal loops to stop if they haven't already noticed
-        self._is_running = False 
-        if self._ping_task and not self._ping_task.done():
-            self._ping_task.cancel()
-        if self._processing_task and not self._processing_task.done():
-            self._processing_task.cancel()
-            
-        # Clean up pending futures with an error
-        for fut in self._response_futures.values():
+        connection = connection or self.connection
+        if not self._is_running:
+            return
+        self.reconnect_stats.disconnects += 1
+        self._message_clock.mark_loss()
+
+        if not self.auto_reconnect:
+            logger.warning("Connection lost. Attempting to clean up and stop client.")
+            # Signal loops to stop if they haven't already noticed
+            self._is_running = False
+            if self._ping_task and not self._ping_task.done():
+                self._ping_task.cancel()
+            if self._processing_task and not self._processing_task.done():
+                self._processing_task.cancel()
+            self._fail_pending(ConnectionError("WebSocket connection lost"))
+            if self.pool:
+                asyncio.create_task(self.pool.disconnect())
+            logger.info("Client state reset due to connection loss. Manual restart required (auto_reconnect is off).")
+            return
+
+        # Idempotent requests stay pending and are re-sent once reconnected; the rest fail now
+        self._fail_pending(ConnectionError("WebSocket connection lost"), keep_replayable=True, connection=connection)
+        task = self._reconnect_tasks.get(connection)
+        if task is None or task.done():
+            logger.warning(f"Connection lost ({connection.name}). Reconnecting...")
+            self._reconnect_tasks[connection] = asyncio.create_task(self._reconnect_loop(connection))
+
+    def set_access_token(self, access_token: str):
+        """Uses `access_token` for every later handshake (open sockets keep the one they were opened with)."""
+        self.access_token = access_token
+        for connection in self.connections:
+            connection.access_token = access_token
+
+    async def renew_token(self) -> bool:
+        """Asks `token_provider` for a fresh access token after a refused handshake; False if there is none."""
+        if self.token_provider is None:
+            return False
+        try:
+            access_token = await self.token_provider()
+        except Exception as e:
+            logger.error(f"Token provider failed: {e}")
+            return False
+        if not access_token or access_token == self.access_token:
+            logger.warning("Token provider returned no new access token.")
+            return False
+        logger.info("Access token renewed.")
+        self.set_access_token(access_token)
+        return True
+
+    def _fail_pending(self, error: Exception, keep_replayable: bool = False, connection: Optional[Connection] = None):
+        """
+        Fails pending request futures, optionally keeping the ones that can be replayed.
+        With a pool and a `connection`, only requests sent on that connection are affected.
+        """
+        scoped = self.pool is not None and connection is not None
+        for request_uuid, fut in list(self._response_futures.items()):
+            if scoped and self._request_connections.get(request_uuid, self.connection) is not connection:
+                continue
+            if keep_replayable and request_uuid in self._inflight:
+                continue
+            del self._response_futures[request_uuid]
+            self._request_connections.pop(request_uuid, None)
             if not fut.done():
-                fut.set_exception(ConnectionError("WebSocket connection lost"))
-        self._response_futures.clear()
-        
-        # TODO: Implement reconnection logic here if desired
-        logger.info("Client state reset due to connection loss. Manual restart required (or implement auto-reconnect).")
+                fut.set_exception(error)
+                self.reconnect_stats.failed_requests += 1
+        if not keep_replayable and not scoped:
+            self._inflight.clear()
+
+    async def _reconnect_loop(self, connection: Optional[Connection] = None):
+        """Reconnects with jittered exponential backoff, then restores subscriptions and in-flight requests."""
+        connection = connection or self.connection
+        lost_at = time.monotonic()
+        backoff = Backoff()
+        attempts = 0
+        while self._is_running:
+            delay = backoff.next_delay()
+            logger.info(f"Reconnect attempt {attempts + 1} ({connection.name}) in {delay:.2f}s...")
+            await asyncio.sleep(delay)
+            try:
+                await connection.connect()
+            except ConnectionError as e:
+                attempts += 1
+                self.reconnect_stats.failed_attempts += 1
+                logger.warning(f"Reconnect attempt {attempts} failed: {e}")
+                if isinstance(e, AuthenticationError):
+                    await self.renew_token()
+                if self.max_reconnect_attempts is not None and attempts >= self.max_reconnect_attempts:
+                    logger.error(f"Giving up after {attempts} reconnect attempts.")
+                    self._fail_pending(ConnectionError("WebSocket connection lost"))
+                    asyncio.create_task(self.stop())
+                    return
+                continue
+
+            recovered_in = time.monotonic() - lost_at
+            stats = self.reconnect_stats
+            stats.reconnects += 1
+            stats.last_time_to_recover = recovered_in
+            stats.max_time_to_recover = max(stats.max_time_to_recover, recovered_in)
+            stats.total_downtime += recovered_in
+            logger.info(f"✅ Reconnected ({connection.name}) after {recovered_in:.2f}s ({attempts} failed attempts).")
+            await self._restore_session(connection)
+            return
 
+    async def _restore_session(self, connection: Optional[Connection] = None):
+        """Re-sends subscriptions and replayable in-flight requests on a fresh connection."""
+        connection = connection or self.connection
+        try:
+            await self.subscriptions.restore(connection)
+            if connection is self.connection:
+                self.state.schedule_resync()
+                self.profitability.schedule_refresh()
+            for request_uuid, (event_code, message_str) in list(self._inflight.items()):
+                future = self._response_futures.get(request_uuid)
+                if future is None or future.done():
+                    self._inflight.pop(request_uuid, None)
+                    continue
+                if self.pool and self._request_connections.get(request_uuid) is not connection:
+                    continue
+                logger.info(f"Replaying in-flight request uuid {request_uuid} (e:{event_code})")
+                await connection.send(message_str)
+                self.reconnect_stats.replayed_requests += 1
+        except ConnectionError as e:
+            # Lost again mid-restore; the next reconnect starts over from the tracked state
+            logger.warning(f"Connection lost while restoring session: {e}")
+
+    async def _wait_for_reconnect(self, timeout: float, connection: Optional[Connection] = None):
+        """Waits (up to timeout) for a reconnect in progress to bring the connection back."""
+        connection = connection or self.connection
+        deadline = time.monotonic() + timeout
+        while not connection.is_connected:
+            task = self._reconnect_tasks.get(connection)
+            remaining = deadline - time.monotonic()
+            if task is None or task.done() or remaining <= 0:
+                return
+            await asyncio.wait({task}, timeout=remaining)
 
     def register_callback(self, event_code: int, callback: Callable[[Dict[str, Any]], Coroutine[Any, Any, None]]):
         logger.info(f"Registering callback for event_code={event_code}, callback={callback}")
         """Register a callback for a specific unsolicited event code (e.g., ticks, balance updates)."""
-        self._event_callbacks[event_code].append(callback)
+        self._dispatcher.register(event_code, callback)
 
     def unregister_callback(self, event_code: int, callback: Callable[[Dict[str, Any]], Coroutine[Any, Any, None]]):
         logger.info(f"Unregistering callback for event_code={event_code}, callback={callback}")
         """Unregister a specific callback."""
-        if event_code in self._event_callbacks:
+        if not self._dispatcher.unregister(event_code, callback):
+            logger.warning(f"Callback not found for event code {event_code}")
+
+    def _add_internal_handler(self, event_code: int, handler: Callable[[Dict[str, Any]], None]):
+        self._internal_handlers[event_code] = self._internal_handlers.get(event_code, ()) + (handler,)
+
+    def expect(self, event_code: int, predicate: Optional[Callable[[Dict[str, Any]], bool]] = None) -> asyncio.Future:
+        """
+        Registers a one-shot waiter for the next pushed `event_code` message matching `predicate`.
+        Register before sending the request that triggers the event, so a push arriving in the same
+        frame as the response is not missed. The waiter is removed once the future is done;
+        cancel it to withdraw.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(event_code, []).append((predicate, future))
+        future.add_done_callback(lambda done: self._discard_waiter(event_code, done))
+        return future
+
+    async def wait_for(self, event_code: int, predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+                       timeout: Optional[float] = None, future: Optional[asyncio.Future] = None) -> Dict[str, Any]:
+        """
+        Waits for the next pushed `event_code` message for which `predicate(message)` is true and
+        returns it. It resolves as the frame is dispatched, with no polling and no callback to
+        clean up. Pass a future from `expect()` to wait on a waiter registered earlier.
+
+        Raises:
+            asyncio.TimeoutError: If no matching message arrives within `timeout` (DEFAULT_RESPONSE_TIMEOUT).
+        """
+        future = future or self.expect(event_code, predicate)
+        return await asyncio.wait_for(future, timeout=parameters.DEFAULT_RESPONSE_TIMEOUT if timeout is None else timeout)
+
+    def _discard_waiter(self, event_code: int, future: asyncio.Future):
+        waiters = self._waiters.get(event_code)
+        if waiters:
+            waiters[:] = [waiter for waiter in waiters if waiter[1] is not future]
+            if not waiters:
+                del self._waiters[event_code]
+
+    def _wake_waiters(self, event_code: int, message: Dict[str, Any]):
+        pending = []
+        for predicate, future in self._waiters.pop(event_code, ()):
+            if future.done():
+                continue
             try:
-                self._event_callbacks[event_code].remove(callback)
-                if not self._event_callbacks[event_code]: # Remove key if list is empty
-                    del self._event_callbacks[event_code]
-            except ValueError:
-                logger.warning(f"Callback not found for event code {event_code}")
+                matched = predicate is None or predicate(message)
+            except Exception as e:
+                logger.error(f"wait_for predicate for e:{event_code} failed: {e}")
+                future.set_exception(e)
+                continue
+            if matched:
+                future.set_result(message)
+            else:
+                pending.append((predicate, future))
+        if pending:
+            self._waiters.setdefault(event_code, []).extend(pending)
 
+    @property
+    def is_running(self) -> bool:
+        """True between a successful start() and stop() (also when auto-reconnect gave up and stopped it)."""
+        return self._is_running
 
-    async def send_request(self, event_code: int, data: Any, requires_response: bool = True, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    @property
+    def ingress_stats(self) -> Dict[str, Any]:
+        """Receive-queue depth, lag and dropped/coalesced frame counters."""
+        return self.message_queue.stats()
+
+    @property
+    def send_stats(self) -> Optional[Dict[str, Any]]:
+        """Outgoing batching counters (messages, frames, messages per frame), if batching is on; primary connection."""
+        return self.connection.batcher.stats() if self.connection.batcher else None
+
+    @property
+    def pool_stats(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Per-connection state and batching counters, in pool mode (connections >= 2)."""
+        return self.pool.stats() if self.pool else None
+
+    @property
+    def raw_log_stats(self) -> Optional[Dict[str, Any]]:
+        """Raw logbook writer counters (written, dropped, rotations), if raw logging is on."""
+        return self._raw_log.stats() if self._raw_log else None
+
+    @property
+    def callback_errors(self) -> int:
+        """Number of exceptions raised by event callbacks so far."""
+        return self._dispatcher.callback_errors
+
+    async def flush_callbacks(self):
+        """Waits until every queued event callback has run (pool dispatch mode)."""
+        await self._dispatcher.drain()
+
+
+    async def send_request(self, event_code: int, data: Any, requires_response: bool = True, timeout: Optional[float] = None, connection: Optional[Connection] = None) -> Optional[Dict[str, Any]]:
         #logger.info(f"send_request called with event_code={event_code}, data={data}, requires_response={requires_response}, timeout={timeout}")
         """
         Sends a request to the WebSocket server and optionally waits for a response.
@@ -138,6 +436,7 @@ class OlympTradeClient:
             data: The data payload for the request (usually a list of dicts).
             requires_response: If True, waits for a response matched by UUID.
             timeout: Custom timeout for waiting for the response. Uses default if None.
+            connection: Send on this connection instead of the one the event code is routed to (pool mode).
 
         Returns:
             The parsed response dictionary if requires_response is True, otherwise None.
@@ -147,67 +446,95 @@ class OlympTradeClient:
             asyncio.TimeoutError: If waiting for a response times out.
             Exception: For other send/serialization errors.
         """
-        if not self.connection.is_connected:
+        request_uuid = generate_uuid() if requires_response else None
+        return await self._send(event_code, lambda: format_message(event_code, data, request_uuid),
+                                request_uuid, timeout, data, connection)
+
+    async def send_prepared(self, event_code: int, render: Callable[[str], str], timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Sends a pre-serialized request and waits for its response, like send_request.
+        `render(uuid)` returns the complete frame with that uuid filled in (see trade.OrderTemplate),
+        so the hot path skips building and serializing the payload.
+        """
+        request_uuid = generate_uuid()
+        return await self._send(event_code, lambda: render(request_uuid), request_uuid, timeout)
+
+    async def _send(self, event_code: int, build: Callable[[], str], request_uuid: Optional[str],
+                    timeout: Optional[float], data: Any = None, connection: Optional[Connection] = None) -> Optional[Dict[str, Any]]:
+        requires_response = request_uuid is not None
+        response_timeout = timeout if timeout is not None else parameters.DEFAULT_RESPONSE_TIMEOUT
+        replayable = self.auto_reconnect and event_code in settings.IDEMPOTENT_EVENTS
+        connection = connection or (self.pool.route(event_code) if self.pool else self.connection)
+        if not connection.is_connected and replayable:
+            await self._wait_for_reconnect(response_timeout, connection)
+        if not connection.is_connected:
             logger.error("Cannot send request: Not connected.")
             raise ConnectionError("Not connected")
 
-        request_uuid = generate_uuid() if requires_response else None
-        message_str = format_message(event_code, data, request_uuid)
+        message_str = build()
         
-        logger.debug(f"📤 Sending (e:{event_code}, uuid:{request_uuid}): {data}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"📤 Sending (e:{event_code}, uuid:{request_uuid}): {message_str if data is None else data}")
         if self._log_raw_messages:
              self._log_raw("📤 SENT", message_str)
+        if self._capture:
+            self._capture.write(SENT, message_str)
 
         future = None
         if requires_response and request_uuid:
             future = asyncio.get_running_loop().create_future()
             self._response_futures[request_uuid] = future
+            if self.pool:
+                self._request_connections[request_uuid] = connection
+            if replayable:
+                self._inflight[request_uuid] = (event_code, message_str)
 
         try:
-            await self.connection.send(message_str)
+            await connection.send(message_str)
+        except ConnectionError as e:
+            if not (future and replayable and self._is_running):
+                self._drop_request(request_uuid, future, e)
+                raise
+            # Stays pending: the reconnect loop re-sends it once the connection is back
+            logger.warning(f"Send failed for uuid {request_uuid} (e:{event_code}); will replay after reconnect.")
         except Exception as e:
-            # Clean up future if send fails
-            if request_uuid in self._response_futures:
-                del self._response_futures[request_uuid]
-                if future and not future.done():
-                     future.set_exception(e) # Propagate send error
+            self._drop_request(request_uuid, future, e)
             raise # Re-raise the sending error
 
         if future:
             try:
-                response_timeout = timeout if timeout is not None else parameters.DEFAULT_RESPONSE_TIMEOUT
                 result = await asyncio.wait_for(future, timeout=response_timeout)
                 return result
             except asyncio.TimeoutError:
                 logger.error(f"Timeout waiting for response to request uuid {request_uuid} (e:{event_code})")
                 # Remove future on timeout
-                if request_uuid in self._response_futures:
-                     del self._response_futures[request_uuid]
+                self._drop_request(request_uuid)
                 raise
             except asyncio.CancelledError:
                  logger.warning(f"Request uuid {request_uuid} (e:{event_code}) cancelled.")
                  # Future might already be removed if cancelled via stop()
-                 if request_uuid in self._response_futures:
-                      del self._response_futures[request_uuid]
+                 self._drop_request(request_uuid)
                  raise
         else:
             return None # No response expected
 
 
+    def _drop_request(self, request_uuid: Optional[str], future: Optional[asyncio.Future] = None, error: Optional[Exception] = None):
+        """Forgets a pending request, propagating `error` to its future if given."""
+        self._inflight.pop(request_uuid, None)
+        self._request_connections.pop(request_uuid, None)
+        if request_uuid in self._response_futures:
+            del self._response_futures[request_uuid]
+            if future and error and not future.done():
+                future.set_exception(error)
+
     async def _process_messages(self):
         logger.info("_process_messages loop started.")
         """Continuously processes messages from the connection queue."""
         while self._is_running:
             try:
-                raw_message = await self.message_queue.get()
-                if self._log_raw_messages:
-                     self._log_raw("📥 RECEIVED", raw_message)
-                     
-                parsed_messages = parse_message(raw_message)
-                if not parsed_messages:
-                    continue # Skip invalid messages
-
-                for message in parsed_messages:
+                item = await self.message_queue.get()
+                for message in item.messages:
                     await self._dispatch_message(message)
 
             except asyncio.CancelledError:
@@ -219,84 +546,102 @@ class OlympTradeClient:
                 await asyncio.sleep(1)
         logger.info("Message processing loop finished.")
 
+    async def process_raw_message(self, raw_message: str):
+        """
+        Runs one raw frame through the receive path (logging, capture, parsing, dispatch),
+        bypassing the ingress queue. Used by capture replays, which feed frames without a socket.
+        """
+        self._record_received(raw_message)
+        parsed_messages = parse_message(raw_message)
+        if not parsed_messages:
+            return # Skip invalid messages
+
+        for message in parsed_messages:
+            await self._dispatch_message(message)
+
+    async def _receive_frame(self, raw_message: str):
+        """
+        Fast receive path, run by the receiver task: decodes the frame once and resolves
+        responses directly, so request latency does not include a queue hop. Pushes are
+        handed to the ingress queue already decoded.
+        """
+        self._record_received(raw_message)
+        parsed_messages = parse_message(raw_message)
+        if not parsed_messages:
+            self.message_queue.invalid_frames += 1
+            return
+        pushes = [message for message in parsed_messages if not self._resolve_response(message)]
+        if pushes:
+            await self.message_queue.put_messages(pushes)
+
+    def _record_received(self, raw_message: str):
+        """Raw log, capture and gap tracking for each frame, as it arrives (before any ingress policy)."""
+        if self._log_raw_messages:
+             self._log_raw("📥 RECEIVED", raw_message)
+        if self._capture:
+            self._capture.write(RECEIVED, raw_message)
+        gap = self._message_clock.on_message()
+        if gap is not None:
+            self.reconnect_stats.last_message_gap = gap
+            self.reconnect_stats.max_message_gap = max(self.reconnect_stats.max_message_gap, gap)
+
     async def _dispatch_message(self, message: Dict[str, Any]):
-        logger.info(f"_dispatch_message called with message: {message}")
         """Handles a single parsed message dictionary."""
-        request_uuid = message.get("uuid")
+        # Level-gated: formatting every tick costs more than dispatching it
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"_dispatch_message called with message: {message}")
         event_code = message.get("e")
-        message_type = message.get("t") # 1: Server Push, 3: Response/Push?
-
         if not event_code:
             logger.warning(f"Received message without event code: {message}")
             return
 
         # --- Handle Responses to Requests ---
-        if request_uuid and request_uuid in self._response_futures:
-            future = self._response_futures.pop(request_uuid)
-            if not future.done():
-                logger.debug(f"Received response for uuid {request_uuid} (e:{event_code})")
-                future.set_result(message)
-            else:
-                 logger.warning(f"Received response for already completed/cancelled uuid {request_uuid}")
-            # Even if it was a response, it might *also* be an event we have callbacks for
-            # Fall through to check callbacks unless we are sure responses are never also events.
-            # Based on logs (e.g., e:23 response AND e:22 push), it seems responses can be separate from pushes.
-            # Let's assume a message with a matched UUID is *only* a response for now.
-            return # Don't process as a general event if it was a direct response
+        if self._resolve_response(message):
+            return
 
         # --- Handle Internal State Updates ---
-        if event_code == settings.E_BALANCE_UPDATE:
-            logger.debug(f"Received balance update (e:{event_code}): {message.get('d')}")
-            # Store the latest balance data (assuming 'd' contains the relevant list/dict)
-            # The log shows 'd' is a list of account dicts. Find the relevant one if needed.
-            self._latest_balance = message # Store the whole message for now
-        
+        handlers = self._internal_handlers.get(event_code)
+        if handlers is not None:
+            for handler in handlers:
+                handler(message)
+        if event_code in self._waiters:
+            self._wake_waiters(event_code, message)
+
         # --- Handle Registered Callbacks for Unsolicited Events ---
-        if event_code in self._event_callbacks:
-            logger.debug(f"Dispatching event {event_code} to {len(self._event_callbacks[event_code])} callbacks.")
-            # Create tasks for each callback to avoid blocking the dispatcher
-            callback_tasks = [
-                asyncio.create_task(cb(message)) 
-                for cb in self._event_callbacks[event_code]
-            ]
-            # Optionally gather results or just let them run
-            # asyncio.gather(*callback_tasks) # If you need to wait/handle errors
+        await self._dispatcher.dispatch(event_code, message)
+
+    def _resolve_response(self, message: Dict[str, Any]) -> bool:
+        """
+        Completes the pending request a message answers. A message with a matched UUID is
+        *only* a response (e.g. e:23 response and e:22 push arrive as separate messages),
+        so it is not dispatched as a general event.
+        """
+        request_uuid = message.get("uuid")
+        if request_uuid is None:
+            return False
+        future = self._response_futures.pop(request_uuid, None)
+        if future is None:
+            return False
+        self._inflight.pop(request_uuid, None)
+        if self.pool:
+            self._request_connections.pop(request_uuid, None)
+        if not future.done():
+            future.set_result(message)
         else:
-             # Log unhandled events if needed (can be noisy)
-             # logger.debug(f"Received unhandled event (e:{event_code}): {message}")
-             pass
+            logger.warning(f"Received response for already completed/cancelled uuid {request_uuid}")
+        return True
 
+    def _on_balance_update(self, message: Dict[str, Any]):
+        # The log shows 'd' is a list of account dicts; store the whole message for now
+        self._latest_balance = message
 
     async def _ping_loop(self):
         logger.info("_ping_loop started.")
-        """Sends periodic pings (e.g., event 90) to keep the connection alive."""
+        """Sends periodic pings (e.g., event 90) to keep the connection alive (each one, in pool mode)."""
         while self._is_running:
             try:
                 await asyncio.sleep(parameters.PING_INTERVAL)
-                if not self.connection.is_connected:
-                    logger.warning("Ping loop: Not connected, skipping ping.")
-                    continue
-                
-                logger.debug("Sending ping...")
-                # Event 90 seems to be the ping/keep-alive based on logs
-                # It requires a UUID and returns a timestamp
-                try:
-                    # Send ping and wait for response to ensure connection is active
-                    response = await self.send_request(settings.E_PING, {}, requires_response=True, timeout=5) 
-                    if response:
-                         logger.debug(f"Pong received (ts: {response.get('ts')})")
-                    else:
-                         logger.warning("Did not receive pong response within timeout.")
-                         # Consider triggering connection check/reconnect here
-                except ConnectionError:
-                     logger.warning("Ping failed: Connection error.")
-                     # Connection loss is handled by the receiver loop / callback
-                except asyncio.TimeoutError:
-                     logger.warning("Ping failed: Timeout waiting for pong.")
-                     # Consider triggering connection check/reconnect here
-                except Exception as e:
-                     logger.error(f"Error during ping: {e}")
-
+                await asyncio.gather(*(self._ping(connection) for connection in self.connections))
             except asyncio.CancelledError:
                 logger.info("Ping loop cancelled.")
                 break
@@ -304,90 +649,239 @@ class OlympTradeClient:
                  logger.exception(f"Unexpected error in ping loop: {e}")
                  await asyncio.sleep(settings.PING_INTERVAL) # Avoid tight loop on error
 
-    def _log_raw(self, direction: str, message: str):
-        logger.debug(f"_log_raw called with direction={direction}, message={message}")
-        """Logs raw messages to the markdown file. Ensures logs directory exists."""
-        import os
-        log_dir = os.path.dirname(self._raw_log_file)
-        if log_dir and not os.path.exists(log_dir):
-            try:
-                os.makedirs(log_dir, exist_ok=True)
-            except Exception as e:
-                logger.error(f"Failed to create log directory: {e}")
-                return
+    async def _ping(self, connection: Connection):
+        if not connection.is_connected:
+            logger.warning(f"Ping loop: Not connected ({connection.name}), skipping ping.")
+            return
+
+        logger.debug("Sending ping...")
+        # Event 90 seems to be the ping/keep-alive based on logs
+        # It requires a UUID and returns a timestamp
         try:
-            with open(self._raw_log_file, "a") as f:
-                f.write(f"```json\n{direction} ➜ {message}\n```\n")
+            # Send ping and wait for response to ensure connection is active; its RTT feeds connection.health
+            sent = time.perf_counter()
+            response = await self.send_request(settings.E_PING, {}, requires_response=True,
+                                               timeout=parameters.PING_TIMEOUT, connection=connection)
+            connection.health.record_rtt((time.perf_counter() - sent) * 1000)
+            if response:
+                 logger.debug(f"Pong received (ts: {response.get('ts')})")
+        except ConnectionError:
+             logger.warning("Ping failed: Connection error.")
+             # Connection loss is handled by the receiver loop / callback
+             return
+        except asyncio.TimeoutError:
+             logger.warning(f"Ping failed: Timeout waiting for pong ({connection.name}).")
+             connection.health.record_miss()
         except Exception as e:
-            logger.error(f"Failed to write to raw log file: {e}")
+             logger.error(f"Error during ping: {e}")
+        if self.failover and connection.is_connected and connection.health.degraded:
+            self._schedule_failover(connection)
+
+    def _schedule_failover(self, connection: Connection):
+        task = self._failover_tasks.get(connection.name)
+        if task is not None and not task.done():
+            return
+        last = self._last_failover.get(connection.name)
+        if last is not None and time.monotonic() - last < parameters.HEALTH_FAILOVER_COOLDOWN:
+            return
+        self._failover_tasks[connection.name] = asyncio.create_task(self.replace_connection(connection))
+
+    async def replace_connection(self, connection: Optional[Connection] = None) -> bool:
+        """
+        Replaces a live but degraded connection without a gap in service (health failover).
+
+        The replacement connects first and takes over the connection's role and routing, so new
+        requests use it at once; its subscriptions are restored there. The old socket stays open
+        up to HEALTH_DRAIN_TIMEOUT for the responses it still owes, then closes. Requests still
+        unanswered by then are re-sent on the replacement if idempotent, and fail otherwise.
+        Returns False (old connection kept) if the replacement cannot connect.
+        """
+        old = connection or self.connection
+        self._last_failover[old.name] = time.monotonic()
+        logger.warning(f"Connection {old.name} degraded (score {old.health.score:.2f}); opening a replacement.")
+        new = self._make_connection(old.name)
+        try:
+            await new.connect()
+        except ConnectionError as e:
+            logger.warning(f"Failover for {old.name} failed, keeping the current connection: {e}")
+            return False
+
+        # From here new requests go out on the replacement; what is pending stays with the old socket
+        owed = [request_uuid for request_uuid in self._response_futures
+                if self._request_connections.get(request_uuid, old) is old]
+        if self.pool:
+            self.pool.replace(old, new)
+            self.connection = self.pool.primary
+        else:
+            self.connection = new
+        old.connection_lost_callback = None # Its loss no longer needs a reconnect
+        self.reconnect_stats.failovers += 1
+        moved_pairs = self.tick_connections(sorted(self.subscriptions.tick_pairs)).get(new)
+        try:
+            await self.subscriptions.restore(new)
+        except ConnectionError as e:
+            logger.warning(f"Replacement {new.name} lost while restoring: {e}")
+        if moved_pairs and old.is_connected:
+            # The replacement streams these now; stop the old socket's copies (best effort)
+            data = [{"pair": pair} for pair in moved_pairs]
+            try:
+                await asyncio.wait_for(asyncio.gather(
+                    self.send_request(settings.E_UNSUBSCRIBE_TICKS, data, requires_response=False, connection=old),
+                    self.send_request(settings.E_UNSUBSCRIBE_TICKS_RELATED, data, requires_response=False, connection=old)),
+                    timeout=1)
+            except (ConnectionError, asyncio.TimeoutError):
+                pass
+
+        pending = [self._response_futures[request_uuid] for request_uuid in owed if request_uuid in self._response_futures]
+        if pending:
+            await asyncio.wait(pending, timeout=parameters.HEALTH_DRAIN_TIMEOUT)
+        await old.disconnect()
+        for request_uuid in owed:
+            future = self._response_futures.get(request_uuid)
+            if future is None or future.done():
+                continue
+            if request_uuid in self._inflight:
+                if self.pool:
+                    self._request_connections[request_uuid] = new
+                try:
+                    await new.send(self._inflight[request_uuid][1])
+                    self.reconnect_stats.replayed_requests += 1
+                    continue
+                except ConnectionError:
+                    pass
+            self._drop_request(request_uuid, future, ConnectionError("Connection replaced"))
+            self.reconnect_stats.failed_requests += 1
+        logger.info(f"Connection {new.name} replaced; {len(owed)} request(s) were owed by the old one.")
+        return True
+
+    @property
+    def connection_health(self) -> Dict[str, Dict[str, Any]]:
+        """Per-connection ping RTT percentiles and histogram, missed pongs, receive gap and health score."""
+        return {connection.name: connection.health.snapshot() for connection in self.connections}
+
+    def _log_raw(self, direction: str, message: str):
+        """Queues a raw message for the markdown logbook (written by a background thread)."""
+        self._raw_log.write(direction, message)
+
     # --- Convenience property to get last known balance ---
     @property
     def current_balance(self) -> Dict[str, Any]:
         """Returns the last known balance dictionary received from the server (event 55)."""
         return self._latest_balance
 
-    async def initialize_session(self):
+    async def initialize_session(self, rediscover: bool = False):
         """
         Sends the required subscription, ping, and account info requests after connecting.
         This mimics the browser's startup sequence.
+
+        Independent steps run concurrently: the e:98 groups and pings share one frame while the
+        account is discovered and the state mirror reloaded. Discovery is skipped when account_id
+        is already known (given, or kept from before a reconnect) or cached for this token's
+        subject from an earlier run; `rediscover=True` forces the e:1068 round trip.
+        Timings land in `client.bootstrap_stats`.
         """
         logger.info("Sending initial subscription, ping, and account info requests...")
-        # 1. Send e:98 subscriptions (mimic browser)
-        startup_subscriptions = [
-            [220],
-            [110,700,112,140,1038,1037,1039,141,22,26,111],
-            [1054,1076,1301,1097],
-            [141,241],
-            [230,231],
-            [75],
-            [1055],
-            [2223,2301,55,150,152,151,126,602,601],
-            [2076],
-            [126],
-        ]
-        for sub in startup_subscriptions:
-            await self.send_request(98, sub, requires_response=False)
-        # 2. Send initial pings (e:90) - not strictly required, but mimics browser
-        import uuid
-        for _ in range(2):
-            await self.send_request(90, {}, requires_response=True)  # uuid auto-generated
-        # 3. Request account info (demo and real)
-        self.account_id = self.account_id or None
-        self.account_group = self.account_group or None
-        for group in ["demo", "real"]:
-            try:
-                resp = await self.send_request(1068, [{"group": group}], requires_response=True)
-                logger.info(f"Account info response for group {group}: {resp}")
-                if resp and 'd' in resp and isinstance(resp['d'], list) and resp['d']:
-                    self.account_id = resp['d'][0].get('account_id')
-                    self.account_group = group
-                    logger.info(f"Set account_id to {self.account_id} (group: {group})")
-                    break
-            except Exception as e:
-                logger.warning(f"Failed to get account_id for group {group}: {e}")
-        if not self.account_id:
-            logger.error("Could not determine account_id from account info requests.")
-        # 4. Request balance for the found account_id
-        if self.account_id:
+        began = time.monotonic()
+        stats = self.bootstrap_stats
+
+        async def subscribe():
+            # 1. e:98 subscriptions (mimic browser) and initial pings (e:90), sent concurrently
+            #    so they share one frame like the browser's
+            startup_subscriptions = [
+                [220],
+                [110,700,112,140,1038,1037,1039,141,22,26,111],
+                [1054,1076,1301,1097],
+                [141,241],
+                [230,231],
+                [75],
+                [1055],
+                [2223,2301,55,150,152,151,126,602,601],
+                [2076],
+                [126],
+            ]
+            await asyncio.gather(*(self.subscriptions.subscribe_events(sub) for sub in startup_subscriptions),
+                                 *(self.send_request(90, {}, requires_response=True) for _ in range(2)))
+            stats.subscribe = time.monotonic() - began
+
+        async def account():
+            # 2. Account discovery (e:1068), then balance (e:1043) and open trades (e:31) into client.state
+            await self._discover_account(rediscover)
+            stats.discovery = time.monotonic() - began
+            if not self.account_id:
+                logger.error("Could not determine account_id from account info requests.")
+                return
+            resync_began = time.monotonic()
             try:
-                resp = await self.send_request(1043, [{"account_id": self.account_id, "group": self.account_group}], requires_response=True)
-                logger.info(f"Balance info response: {resp}")
+                await self.state.resync()
             except Exception as e:
                 logger.warning(f"Failed to get balance for account_id {self.account_id}: {e}")
+            stats.resync = time.monotonic() - resync_began
+            if stats.discovery_source == "cache" and not self._account_confirmed():
+                # The cached account is not among this token's balances: discover it again
+                logger.warning(f"Cached account {self.account_id} not confirmed by e:1043; rediscovering.")
+                self._account_cache.discard(token_subject(self.access_token))
+                self.account_id = self.account_group = None
+                await self._discover_account(True)
+                if self.account_id:
+                    await self.state.resync()
+
+        await asyncio.gather(subscribe(), account())
+        self._session_initialized = True
+        stats.sessions += 1
+        stats.connect_to_ready = time.monotonic() - (self._start_time or began)
+        logger.info(f"Session ready in {stats.connect_to_ready:.3f}s (account via {stats.discovery_source}).")
+
+    async def _discover_account(self, rediscover: bool):
+        stats = self.bootstrap_stats
+        if self.account_id and not rediscover:
+            stats.discovery_source = "known"
+            return
+        subject = token_subject(self.access_token)
+        if self._account_cache and not rediscover:
+            cached = await asyncio.to_thread(self._account_cache.get, subject)
+            if cached:
+                self.account_id, self.account_group = cached["account_id"], cached.get("group")
+                stats.discovery_source = "cache"
+                logger.info(f"Using cached account_id {self.account_id} (group: {self.account_group})")
+                return
+        # Both groups are asked at once; demo is preferred when both answer
+        groups = ["demo", "real"]
+        responses = await asyncio.gather(*(self.send_request(1068, [{"group": group}], requires_response=True)
+                                           for group in groups), return_exceptions=True)
+        stats.discovery_source = None
+        for group, resp in zip(groups, responses):
+            if isinstance(resp, BaseException):
+                logger.warning(f"Failed to get account_id for group {group}: {resp}")
+                continue
+            logger.info(f"Account info response for group {group}: {resp}")
+            if resp and 'd' in resp and isinstance(resp['d'], list) and resp['d']:
+                self.account_id = resp['d'][0].get('account_id')
+                self.account_group = group
+                stats.discovery_source = "server"
+                logger.info(f"Set account_id to {self.account_id} (group: {group})")
+                break
+        if self.account_id and self._account_cache:
+            await asyncio.to_thread(self._account_cache.put, subject, self.account_id, self.account_group)
 
-    async def wait_for_balance(self, timeout: float = 10.0, poll_interval: float = 0.5):
+    def _account_confirmed(self) -> bool:
+        """False only when e:1043 listed balances and none belongs to the current account."""
+        accounts = {account for account, _ in self.state.balances}
+        return not accounts or self.account_id in accounts
+
+    async def wait_for_balance(self, timeout: float = 10.0, poll_interval: Optional[float] = None):
         """
         Waits until a balance update is received or timeout is reached.
         Returns the balance dict if received, else None.
+        (`poll_interval` is ignored: the wait resolves as soon as the e:55 frame is dispatched.)
         """
+        balance = self._latest_balance
+        if balance and balance.get('d'):
+            return balance
         logger.info(f"Waiting for balance update (timeout={timeout}s)...")
-        waited = 0.0
-        while waited < timeout:
-            balance = self.balance.get_last_balance()
-            if balance and 'd' in balance and balance['d']:
-                logger.info("Balance update received.")
-                return balance
-            await asyncio.sleep(poll_interval)
-            waited += poll_interval
-        logger.warning("Timeout waiting for balance update.")
-        return None
+        try:
+            balance = await self.wait_for(settings.E_BALANCE_UPDATE, lambda message: bool(message.get('d')), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Timeout waiting for balance update.")
+            return None
+        logger.info("Balance update received.")
+        return balance
@@ -4,25 +4,54 @@ import websockets
 import logging
 from typing import Optional, Callable, Awaitable
 from olymptrade_ws.olympconfig import parameters
+from .health import ConnectionHealth
+from .ingress import IngressQueue
+from .outbox import FrameBatcher
 
 logger = logging.getLogger(__name__)
 
+# websockets >= 14 switched `websockets.connect` to the new asyncio implementation,
+# which takes `additional_headers` and exposes `state` instead of `closed`.
+_HEADERS_KWARG = "additional_headers" if int(websockets.__version__.split(".")[0]) >= 14 else "extra_headers"
+
+def _rejected_status(error: Exception) -> Optional[int]:
+    """HTTP status of a refused handshake (InvalidStatus on websockets >= 14, InvalidStatusCode before)."""
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) or getattr(error, "status_code", None)
+
+class AuthenticationError(ConnectionError):
+    """The server refused the handshake's access token (HTTP 401/403): a new token is needed, not a retry."""
+
+def _is_open(websocket) -> bool:
+    closed = getattr(websocket, "closed", None)
+    if closed is not None:
+        return not closed
+    return websocket.state is websockets.protocol.State.OPEN
+
 class Connection:
     def __init__(self, uri: str, access_token: str, 
-                 message_queue: asyncio.Queue, 
-                 connection_lost_callback: Optional[Callable[[], Awaitable[None]]] = None):
+                 message_queue: "IngressQueue", 
+                 connection_lost_callback: Optional[Callable[[], Awaitable[None]]] = None,
+                 frame_handler: Optional[Callable[[str], Awaitable[None]]] = None,
+                 batch_sends: bool = parameters.SEND_BATCHING, name: str = "primary"):
+        self.name = name # Role in a connection pool (logs and stats)
         self.uri = uri
         self.access_token = access_token
         self.message_queue = message_queue
+        # Where received frames go: the queue by default, or a handler that decodes in the receiver
+        self._on_frame = frame_handler or message_queue.put
         self.connection_lost_callback = connection_lost_callback
         self.websocket: Optional[websockets.WebSocketClientProtocol] = None
         self._receive_task: Optional[asyncio.Task] = None
         self._is_connected = False
         self._connect_lock = asyncio.Lock()
+        # Frames sent in the same loop tick (or batch window) go out as one multi-message frame
+        self.batcher: Optional[FrameBatcher] = FrameBatcher(self._write) if batch_sends else None
+        self.health = ConnectionHealth() # Ping RTT, missed pongs and receive gap of the current socket
 
     @property
     def is_connected(self) -> bool:
-        return self._is_connected and self.websocket is not None and not self.websocket.closed
+        return self._is_connected and self.websocket is not None and _is_open(self.websocket)
 
     async def connect(self):
         async with self._connect_lock:
@@ -39,27 +68,27 @@ class Connection:
                 logger.info(f"Attempting to connect to {self.uri}...")
                 self.websocket = await websockets.connect(
                     self.uri,
-                    extra_headers=headers,
+                    **{_HEADERS_KWARG: headers},
                     ping_interval=None, # Disable automatic pings if we handle manually
                     open_timeout=parameters.DEFAULT_CONNECT_TIMEOUT
                 )
                 self._is_connected = True
+                self.health = ConnectionHealth()
                 logger.info("✅ WebSocket connection established.")
-                # Start the receiver loop
-                if self._receive_task is None or self._receive_task.done():
-                     self._receive_task = asyncio.create_task(self._receiver())
-                else:
-                    logger.warning("Receive task already running.")
-
-            except websockets.exceptions.InvalidStatusCode as e:
-                logger.error(f"❌ Connection failed: Invalid status code {e.status_code}. Check access_token.")
-                self._is_connected = False
-                self.websocket = None
-                raise ConnectionError(f"Invalid status code {e.status_code}") from e
+                # Start the receiver loop (a receiver left over from a lost connection is replaced)
+                if self._receive_task is not None and not self._receive_task.done():
+                    logger.warning("Replacing receive task from the previous connection.")
+                    self._receive_task.cancel()
+                self._receive_task = asyncio.create_task(self._receiver())
+
             except (websockets.exceptions.WebSocketException, OSError, asyncio.TimeoutError) as e:
-                logger.error(f"❌ Connection failed: {e}")
                 self._is_connected = False
                 self.websocket = None
+                status = _rejected_status(e)
+                if status is not None:
+                    logger.error(f"❌ Connection failed: Invalid status code {status}. Check access_token.")
+                    raise (AuthenticationError if status in (401, 403) else ConnectionError)(f"Invalid status code {status}") from e
+                logger.error(f"❌ Connection failed: {e}")
                 raise ConnectionError(f"Connection failed: {e}") from e
             except Exception as e:
                 logger.error(f"❌ Unexpected connection error: {e}")
@@ -81,7 +110,7 @@ class Connection:
                     logger.error(f"Error during receiver task cancellation: {e}")
                 self._receive_task = None
 
-            if self.websocket and not self.websocket.closed:
+            if self.websocket and _is_open(self.websocket):
                 try:
                     await self.websocket.close()
                     logger.info("🔌 WebSocket connection closed.")
@@ -97,7 +126,14 @@ class Connection:
         if not self.is_connected:
             logger.error("⚠️ Cannot send: WebSocket not connected.")
             raise ConnectionError("WebSocket not connected.")
-        
+        if self.batcher is not None:
+            await self.batcher.submit(message)
+        else:
+            await self._write(message)
+
+    async def _write(self, message: str):
+        if not self.is_connected:
+            raise ConnectionError("WebSocket not connected.")
         try:
             await self.websocket.send(message)
             # Avoid logging sensitive data directly here, let client handle logging
@@ -119,10 +155,11 @@ class Connection:
                     logger.warning("Receiver loop: Connection lost, stopping.")
                     break
                 message = await self.websocket.recv()
+                self.health.on_frame()
                 #logger.debug(f"📥 Received raw: {message}")
                 #print(f"📥 Received raw: {message}")  # For debugging, can be removed later
                 # logger.debug(f"📥 Received raw: {message}")
-                await self.message_queue.put(message)
+                await self._on_frame(message)
             except asyncio.CancelledError:
                 logger.info("Receiver task cancelled.")
                 break # Exit loop cleanly on cancellation
@@ -0,0 +1,160 @@
+# core/dispatcher.py
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+Callback = Callable[[Dict[str, Any]], Awaitable[None]]
+ErrorHandler = Callable[[int, Callback, BaseException], None]
+
+TASK = "task"
+INLINE = "inline"
+POOL = "pool"
+
+
+class EventDispatcher:
+    """
+    Routes unsolicited events to registered callbacks.
+
+    Callbacks live in a per-event-code table of tuples that is rebuilt on (un)register, so
+    dispatching a frame is one dict lookup with no copying.
+
+    mode:
+        "task":   each callback runs in its own task, as before the dispatcher existed. Callbacks
+                  may await anything (orders, other responses) without holding up the receive
+                  loop, but frames are not guaranteed to be handled in order.
+        "inline": callbacks are awaited in the receive loop. Lowest overhead and strictly
+                  ordered, but a slow callback delays every following frame.
+        "pool":   callbacks run on `workers` worker tasks fed by bounded queues, with no task
+                  per message. Events are sharded by event code, so callbacks for one event
+                  code still see frames in order. A full queue applies backpressure to the
+                  processing loop rather than growing without limit; the client then resolves
+                  responses in the receiver (fast receive), so a callback waiting on one is
+                  not stuck behind the queue it is holding up.
+
+    Callback exceptions are logged, counted in `callback_errors` and passed to `on_error`.
+    """
+
+    def __init__(self, mode: str = POOL, workers: int = 2, queue_size: int = 1000,
+                 on_error: Optional[ErrorHandler] = None):
+        if mode not in (TASK, INLINE, POOL):
+            raise ValueError(f"Unknown dispatch mode: {mode}")
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.on_error = on_error
+        self.dispatched = 0
+        self.callback_errors = 0
+        self._callbacks: Dict[int, List[Callback]] = {}
+        self._table: Dict[int, Tuple[Callback, ...]] = {}
+        self._queues: List[asyncio.Queue] = []
+        self._worker_tasks: List[asyncio.Task] = []
+        self._generation = 0 # Bumped by stop(): workers of an older generation leave their loop
+        self._tasks: Set[asyncio.Task] = set() # Running callbacks in task mode
+
+    # --- Registration ---
+
+    def register(self, event_code: int, callback: Callback):
+        self._callbacks.setdefault(event_code, []).append(callback)
+        self._table[event_code] = tuple(self._callbacks[event_code])
+
+    def unregister(self, event_code: int, callback: Callback) -> bool:
+        callbacks = self._callbacks.get(event_code)
+        if not callbacks or callback not in callbacks:
+            return False
+        callbacks.remove(callback)
+        if callbacks:
+            self._table[event_code] = tuple(callbacks)
+        else:
+            del self._callbacks[event_code]
+            del self._table[event_code]
+        return True
+
+    def callbacks_for(self, event_code: int) -> Tuple[Callback, ...]:
+        return self._table.get(event_code, ())
+
+    # --- Dispatch ---
+
+    async def dispatch(self, event_code: int, message: Dict[str, Any]):
+        callbacks = self._table.get(event_code)
+        if not callbacks:
+            return
+        self.dispatched += 1
+        if self.mode == TASK:
+            for callback in callbacks:
+                task = asyncio.create_task(self._invoke(event_code, callback, message))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return
+        if self.mode == INLINE:
+            for callback in callbacks:
+                await self._invoke(event_code, callback, message)
+            return
+        if not self._worker_tasks:
+            self.start()
+        await self._queues[event_code % self.workers].put((event_code, callbacks, message))
+
+    async def _invoke(self, event_code: int, callback: Callback, message: Dict[str, Any]):
+        try:
+            await callback(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.callback_errors += 1
+            logger.exception(f"Callback {getattr(callback, '__qualname__', callback)} for e:{event_code} failed: {e}")
+            if self.on_error:
+                try:
+                    self.on_error(event_code, callback, e)
+                except Exception:
+                    logger.exception("on_error handler failed")
+
+    async def _worker(self, queue: asyncio.Queue, generation: int):
+        while generation == self._generation:
+            event_code, callbacks, message = await queue.get()
+            try:
+                for callback in callbacks:
+                    await self._invoke(event_code, callback, message)
+            finally:
+                queue.task_done()
+
+    # --- Lifecycle ---
+
+    def start(self):
+        """Starts the worker pool (pool mode). Called lazily on the first dispatch."""
+        if self.mode != POOL or self._worker_tasks:
+            return
+        self._queues = [asyncio.Queue(maxsize=self.queue_size) for _ in range(self.workers)]
+        self._worker_tasks = [asyncio.create_task(self._worker(queue, self._generation)) for queue in self._queues]
+
+    async def drain(self):
+        """Waits until every queued (or, in task mode, running) callback has run."""
+        for queue in self._queues:
+            await queue.join()
+        current = asyncio.current_task()
+        while self._tasks - {current}:
+            await asyncio.gather(*(self._tasks - {current}), return_exceptions=True)
+
+    async def stop(self, drain_timeout: Optional[float] = 1.0):
+        """Lets queued callbacks finish (up to drain_timeout), then stops the workers."""
+        if not self._worker_tasks and not self._tasks:
+            return
+        workers, self._worker_tasks = self._worker_tasks, []
+        # A callback may itself stop the client; never wait on (or cancel) the task running it.
+        # Its worker sees the new generation and leaves its loop once that callback returns.
+        current = asyncio.current_task()
+        self._generation += 1
+        if drain_timeout and current not in workers:
+            try:
+                await asyncio.wait_for(self.drain(), timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Dropping queued callbacks still pending at shutdown.")
+        others = [task for task in [*workers, *self._tasks] if task is not current]
+        for task in others:
+            task.cancel()
+        await asyncio.gather(*others, return_exceptions=True)
+        self._queues = []
+
+    @property
+    def pending(self) -> int:
+        return sum(queue.qsize() for queue in self._queues) + len(self._tasks)
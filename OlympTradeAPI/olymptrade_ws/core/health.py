@@ -0,0 +1,92 @@
+# core/health.py
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from olymptrade_ws.olympconfig import parameters
+
+
+def _ramp(value: float, good: float, bad: float) -> float:
+    """1.0 at or below `good`, 0.0 at or above `bad`, linear in between."""
+    if value <= good:
+        return 1.0
+    if value >= bad:
+        return 0.0
+    return 1.0 - (value - good) / (bad - good)
+
+
+class ConnectionHealth:
+    """
+    Ping RTT and liveness of one connection (`connection.health`).
+
+    RTTs of the last `HEALTH_RTT_WINDOW` pongs are kept for percentiles and a bucketed
+    histogram. The score (1.0 healthy .. 0.0 dead) is the worst of three parts: p90 RTT
+    between HEALTH_RTT_GOOD_MS and HEALTH_RTT_BAD_MS, consecutive missed pongs against
+    HEALTH_MAX_MISSED, and the time since the last received frame against HEALTH_GAP_BAD.
+    """
+
+    def __init__(self, window: Optional[int] = None):
+        self.rtts: deque = deque(maxlen=window or parameters.HEALTH_RTT_WINDOW)  # ms
+        self.pongs = 0
+        self.missed = 0
+        self.consecutive_missed = 0
+        self.created_at = time.monotonic()
+        self.last_frame_at: Optional[float] = None
+
+    def record_rtt(self, rtt_ms: float):
+        self.rtts.append(rtt_ms)
+        self.pongs += 1
+        self.consecutive_missed = 0
+
+    def record_miss(self):
+        self.missed += 1
+        self.consecutive_missed += 1
+
+    def on_frame(self):
+        self.last_frame_at = time.monotonic()
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.rtts:
+            return None
+        ordered = sorted(self.rtts)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def histogram(self, bounds: Optional[List[float]] = None) -> Dict[str, int]:
+        """Counts of recent RTTs per bucket, keyed by upper bound in ms ("+Inf" last)."""
+        bounds = list(bounds or parameters.HEALTH_RTT_BUCKETS_MS)
+        counts = [0] * (len(bounds) + 1)
+        for rtt in self.rtts:
+            counts[bisect_left(bounds, rtt)] += 1
+        return {**{f"{bound:g}": count for bound, count in zip(bounds, counts)}, "+Inf": counts[-1]}
+
+    @property
+    def receive_gap(self) -> float:
+        """Seconds since the last frame arrived (since creation if none has)."""
+        return time.monotonic() - (self.last_frame_at or self.created_at)
+
+    @property
+    def score(self) -> float:
+        p90 = self.percentile(0.9)
+        rtt_score = 1.0 if p90 is None else _ramp(p90, parameters.HEALTH_RTT_GOOD_MS, parameters.HEALTH_RTT_BAD_MS)
+        miss_score = max(0.0, 1.0 - self.consecutive_missed / parameters.HEALTH_MAX_MISSED)
+        gap_score = _ramp(self.receive_gap, parameters.HEALTH_GAP_GOOD, parameters.HEALTH_GAP_BAD)
+        return min(rtt_score, miss_score, gap_score)
+
+    @property
+    def degraded(self) -> bool:
+        return self.score < parameters.HEALTH_FAILOVER_SCORE
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "score": round(self.score, 3),
+            "rtt_last_ms": self.rtts[-1] if self.rtts else None,
+            "rtt_p50_ms": self.percentile(0.5),
+            "rtt_p90_ms": self.percentile(0.9),
+            "rtt_p99_ms": self.percentile(0.99),
+            "pongs": self.pongs,
+            "missed": self.missed,
+            "consecutive_missed": self.consecutive_missed,
+            "receive_gap": round(self.receive_gap, 3),
+            "histogram": self.histogram(),
+        }
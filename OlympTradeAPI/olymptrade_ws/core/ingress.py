@@ -0,0 +1,167 @@
+# core/ingress.py
+import asyncio
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from olymptrade_ws.olympconfig import parameters
+from .protocol import parse_message
+
+logger = logging.getLogger(__name__)
+
+# Per-event-code policies for when the consumer falls behind
+KEEP = "keep"          # Never dropped; a full queue blocks the receiver (backpressure)
+COALESCE = "coalesce"  # Under pressure only the latest item per pair is kept (e.g. ticks)
+DROP = "drop"          # Dropped while the queue is full
+
+
+@dataclass
+class IngressItem:
+    messages: List[Dict[str, Any]]
+    enqueued_at: float
+
+
+class IngressQueue:
+    """
+    Bounded queue between the WebSocket receiver and the message-processing loop.
+
+    Frames are parsed on arrival and each message is classified by its event code.
+    Responses to requests (messages with a uuid) are always KEEP, whatever their code.
+    Once the queue holds `coalesce_at` frames, COALESCE messages are folded into a
+    latest-per-pair buffer instead of being queued. That buffer is delivered as one
+    synthesized message once everything queued before it has been consumed, or, once
+    it is `max_hold` seconds old, queued in order behind those frames while a new
+    buffer starts, so sustained traffic cannot hold ticks back indefinitely. DROP
+    messages are discarded only when the queue is full. KEEP messages wait for room,
+    which stalls the receiver and pushes back on the socket.
+
+    `tap` sees every raw frame as it arrives, before any policy applies, so raw logs
+    and captures stay complete.
+    """
+
+    def __init__(self, capacity: Optional[int] = None, coalesce_at: Optional[int] = None,
+                 policies: Optional[Dict[int, str]] = None, tap: Optional[Callable[[str], None]] = None,
+                 max_hold: Optional[float] = None):
+        self.capacity = capacity or parameters.INGRESS_CAPACITY
+        self.coalesce_at = coalesce_at if coalesce_at is not None else int(self.capacity * parameters.INGRESS_COALESCE_FRACTION)
+        self.policies = dict(parameters.INGRESS_POLICIES if policies is None else policies)
+        self.max_hold = max_hold if max_hold is not None else parameters.INGRESS_COALESCE_MAX_HOLD
+        self.tap = tap
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=self.capacity)
+        self._coalesced: Dict[Tuple[int, Any], Dict[str, Any]] = {}
+        self._coalesced_since: Optional[float] = None
+
+        # --- Metrics ---
+        self.frames_in = 0
+        self.frames_out = 0
+        self.invalid_frames = 0
+        self.blocked_puts = 0
+        self.max_depth = 0
+        self.coalesced = Counter()  # event code -> items superseded by a newer one
+        self.dropped = Counter()    # event code -> messages discarded
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    # --- Producer side (receiver) ---
+
+    async def put(self, raw: str):
+        self.frames_in += 1
+        if self.tap:
+            self.tap(raw)
+        messages = parse_message(raw)
+        if not messages:
+            self.invalid_frames += 1
+            return
+        await self.put_messages(messages)
+
+    async def put_messages(self, messages: List[Dict[str, Any]]):
+        """Queues already-decoded messages of one frame, applying the per-event policies."""
+        if self._coalesced and time.monotonic() - self._coalesced_since >= self.max_hold:
+            await self._enqueue(self._flush_coalesced()) # Held long enough: take its place in line
+        depth = self._queue.qsize()
+        # Once coalescing, keep going until the buffer is delivered so ticks stay in order
+        pressured = depth >= self.coalesce_at or bool(self._coalesced)
+        full = depth >= self.capacity
+        keep = []
+        for message in messages:
+            policy = KEEP
+            if not isinstance(message, dict):
+                keep.append(message)
+                continue
+            if message.get("uuid") is None:
+                policy = self.policies.get(message.get("e"), KEEP)
+            if policy == COALESCE and pressured and self._coalesce(message):
+                continue
+            if policy == DROP and full:
+                self.dropped[message.get("e")] += 1
+                continue
+            keep.append(message)
+        if keep:
+            await self._enqueue(IngressItem(keep, time.monotonic()))
+
+    async def _enqueue(self, item: IngressItem):
+        if self._queue.full():
+            self.blocked_puts += 1
+        await self._queue.put(item)
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+
+    def _coalesce(self, message: Dict[str, Any]) -> bool:
+        """Folds a message into the latest-per-pair buffer; False if it has no pairs to key on."""
+        items = message.get("d")
+        if not isinstance(items, list) or not all(isinstance(item, dict) and "p" in item for item in items):
+            return False
+        event_code = message.get("e")
+        for item in items:
+            key = (event_code, item["p"])
+            if key in self._coalesced:
+                self.coalesced[event_code] += 1
+            self._coalesced[key] = item
+        if self._coalesced_since is None:
+            self._coalesced_since = time.monotonic()
+        return True
+
+    # --- Consumer side (processing loop) ---
+
+    async def get(self) -> IngressItem:
+        if self._coalesced and self._queue.empty():
+            item = self._flush_coalesced()
+        else:
+            item = await self._queue.get()
+        self.frames_out += 1
+        self.last_lag = time.monotonic() - item.enqueued_at
+        if self.last_lag > self.max_lag:
+            self.max_lag = self.last_lag
+        return item
+
+    def _flush_coalesced(self) -> IngressItem:
+        by_event: Dict[int, List[Dict[str, Any]]] = {}
+        for (event_code, _), item in self._coalesced.items():
+            by_event.setdefault(event_code, []).append(item)
+        since = self._coalesced_since or time.monotonic()
+        self._coalesced = {}
+        self._coalesced_since = None
+        return IngressItem([{"e": event_code, "t": 1, "d": items} for event_code, items in by_event.items()], since)
+
+    # --- Introspection ---
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self._queue.qsize(),
+            "max_depth": self.max_depth,
+            "capacity": self.capacity,
+            "coalesce_pending": len(self._coalesced),
+            "frames_in": self.frames_in,
+            "frames_out": self.frames_out,
+            "invalid_frames": self.invalid_frames,
+            "blocked_puts": self.blocked_puts,
+            "coalesced": dict(self.coalesced),
+            "dropped": dict(self.dropped),
+            "last_lag": self.last_lag,
+            "max_lag": self.max_lag,
+        }
@@ -0,0 +1,31 @@
+# core/loop.py
+import asyncio
+import logging
+from typing import Any, Coroutine, Optional
+
+from olymptrade_ws.olympconfig import parameters
+
+try:
+    import uvloop
+except ImportError: # Optional: faster event loop on Linux/macOS (pip install uvloop)
+    uvloop = None
+
+logger = logging.getLogger(__name__)
+
+
+def uvloop_available() -> bool:
+    return uvloop is not None
+
+
+def run(main: Coroutine[Any, Any, Any], use_uvloop: Optional[bool] = None) -> Any:
+    """
+    asyncio.run() for library entry points, on uvloop when requested (USE_UVLOOP by
+    default) and installed; falls back to the stdlib loop otherwise.
+    """
+    use_uvloop = parameters.USE_UVLOOP if use_uvloop is None else use_uvloop
+    if use_uvloop and uvloop is None:
+        logger.warning("uvloop requested but not installed; using the default asyncio event loop.")
+    if use_uvloop and uvloop is not None:
+        logger.info("Using uvloop event loop.")
+        return uvloop.run(main)
+    return asyncio.run(main)
@@ -0,0 +1,258 @@
+# core/manager.py
+import asyncio
+import inspect
+import logging
+from typing import Any, Awaitable, Callable, Coroutine, Dict, List, Optional, Tuple, Union
+
+from olymptrade_ws.olympconfig import parameters
+from .client import OlympTradeClient
+from .connection import AuthenticationError
+
+logger = logging.getLogger(__name__)
+
+# token_provider(key, refresh): the account's access token; refresh=True after the server refused it
+TokenProvider = Callable[[str, bool], Union[Optional[str], Awaitable[Optional[str]]]]
+AccountCallback = Callable[[str, Dict[str, Any]], Coroutine[Any, Any, None]]
+
+
+class AccountManager:
+    """
+    Many account sessions, one OlympTradeClient each, on one event loop.
+
+    - Tokens: each account has its own access token, given to `add_account()` or fetched with
+      `token_provider(key, refresh)`. It is asked again with refresh=True whenever the server
+      refuses the account's token, at start or on reconnect.
+    - Market data: tick subscriptions made through the manager are shared. They live on one
+      account's client (the feed: `market_account`, else the first running account), so each
+      pair's ticks arrive once however many accounts there are, and market callbacks run once
+      per tick. If the feed account is removed or stops, pairs and callbacks move to another
+      running account.
+    - Account streams: balance and trade pushes arrive on the connection of the account they
+      belong to; `register_callback()` callbacks get them as `callback(key, message)`.
+    """
+
+    def __init__(self, uri: str = parameters.DEFAULT_WEBSOCKET_URI, token_provider: Optional[TokenProvider] = None,
+                 market_account: Optional[str] = None, **client_options):
+        self.uri = uri
+        self.token_provider = token_provider
+        self.market_account = market_account
+        self._client_options = client_options # Passed to every OlympTradeClient (add_account can override)
+        self.clients: Dict[str, OlympTradeClient] = {}
+        self._feed_key: Optional[str] = None
+        self._feed: Optional[OlympTradeClient] = None
+        self._feed_lock = asyncio.Lock()
+        self._tick_refs: Dict[str, int] = {} # Manager-level subscribers per pair, mirrored on the feed client
+        self._market_callbacks: List[Tuple[int, Callable[[Dict[str, Any]], Coroutine[Any, Any, None]]]] = []
+        self._account_callbacks: List[Tuple[int, AccountCallback]] = []
+        self._wrappers: Dict[Tuple[str, int, AccountCallback], Callable[[Dict[str, Any]], Coroutine[Any, Any, None]]] = {}
+        self._watch_task: Optional[asyncio.Task] = None
+
+    # --- Accounts ---
+
+    def add_account(self, key: str, access_token: Optional[str] = None, **options) -> OlympTradeClient:
+        """Creates the client for an account (started by `start()`); without a token, one comes from `token_provider`."""
+        if key in self.clients:
+            raise ValueError(f"Account {key!r} is already managed")
+        renew = (lambda: self._token(key, refresh=True)) if self.token_provider else None
+        client = OlympTradeClient(access_token=access_token, uri=self.uri, token_provider=renew,
+                                  **{**self._client_options, **options})
+        self.clients[key] = client
+        for event_code, callback in self._account_callbacks:
+            self._attach(key, client, event_code, callback)
+        return client
+
+    async def _token(self, key: str, refresh: bool) -> Optional[str]:
+        token = self.token_provider(key, refresh)
+        if inspect.isawaitable(token):
+            token = await token
+        return token
+
+    async def start(self, *keys: str) -> Dict[str, BaseException]:
+        """
+        Connects and initializes the given accounts (default: every one not running), at most
+        MANAGER_START_CONCURRENCY at a time. One account failing does not stop the others:
+        failures are returned by key.
+        """
+        keys = keys or tuple(key for key, client in self.clients.items() if not client.is_running)
+        semaphore = asyncio.Semaphore(parameters.MANAGER_START_CONCURRENCY)
+
+        async def start_one(key: str):
+            async with semaphore:
+                await self._start_account(key)
+
+        results = await asyncio.gather(*(start_one(key) for key in keys), return_exceptions=True)
+        failures = {key: result for key, result in zip(keys, results) if isinstance(result, BaseException)}
+        for key, error in failures.items():
+            logger.error(f"Account {key} failed to start: {error}")
+        await self._ensure_feed()
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.create_task(self._watch_feed())
+        return failures
+
+    async def _start_account(self, key: str):
+        client = self.clients[key]
+        if not client.access_token:
+            token = await self._token(key, refresh=False) if self.token_provider else None
+            if not token:
+                raise AuthenticationError(f"No access token for account {key}")
+            client.set_access_token(token)
+        await client.start()
+        await client.initialize_session()
+
+    async def remove_account(self, key: str):
+        """Stops an account's client; if it carried the shared market data, that moves first."""
+        client = self.clients.pop(key)
+        for wrapper_key in [wrapper_key for wrapper_key in self._wrappers if wrapper_key[0] == key]:
+            del self._wrappers[wrapper_key]
+        if client is self._feed:
+            await self._ensure_feed()
+        if client.is_running:
+            await client.stop()
+
+    async def stop(self):
+        if self._watch_task and not self._watch_task.done():
+            self._watch_task.cancel()
+        await asyncio.gather(*(client.stop() for client in self.clients.values() if client.is_running))
+        self._feed_key = self._feed = None
+
+    def __getitem__(self, key: str) -> OlympTradeClient:
+        return self.clients[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.clients
+
+    @property
+    def accounts(self) -> List[str]:
+        return list(self.clients)
+
+    def owner(self, account_id: Any) -> Optional[str]:
+        """Key of the managed account an account_id (demo or real) belongs to."""
+        for key, client in self.clients.items():
+            if client.account_id == account_id or any(acc == account_id for acc, _ in client.state.balances):
+                return key
+        return None
+
+    # --- Shared market data ---
+
+    @property
+    def feed_account(self) -> Optional[str]:
+        """Key of the account whose connection currently carries the shared market data."""
+        return self._feed_key
+
+    def _elect_feed(self) -> Optional[str]:
+        preferred = self.clients.get(self.market_account) if self.market_account else None
+        if preferred is not None and preferred.is_running:
+            return self.market_account
+        return next((key for key, client in self.clients.items() if client.is_running), None)
+
+    async def _ensure_feed(self) -> Optional[OlympTradeClient]:
+        """The running feed client, moving pairs and market callbacks to another account if it is gone."""
+        async with self._feed_lock:
+            old = self._feed
+            if old is not None and old.is_running and self.clients.get(self._feed_key) is old:
+                return old
+            key = self._elect_feed()
+            new = self.clients.get(key) if key else None
+            if new is None:
+                if old is not None:
+                    logger.warning("No running account left to carry the shared market data.")
+                self._feed_key = self._feed = None
+                return None
+            # Make before break: the new feed subscribes before the old one lets go
+            for event_code, callback in self._market_callbacks:
+                new.register_callback(event_code, callback)
+            await self._resubscribe(new.subscriptions.subscribe_ticks)
+            self._feed_key, self._feed = key, new
+            if old is not None:
+                for event_code, callback in self._market_callbacks:
+                    old.unregister_callback(event_code, callback)
+                if old.is_running:
+                    try:
+                        await self._resubscribe(old.subscriptions.unsubscribe_ticks)
+                    except ConnectionError as e:
+                        logger.warning(f"Could not release ticks on the previous feed: {e}")
+                logger.info(f"Shared market data moved to account {key}.")
+            return new
+
+    async def _resubscribe(self, send: Callable[..., Awaitable[None]]):
+        """Applies every manager-level reference of every pair (only 0 <-> 1 transitions are sent)."""
+        level = 0
+        while True:
+            pairs = [pair for pair, refs in self._tick_refs.items() if refs > level]
+            if not pairs:
+                return
+            await send(*pairs)
+            level += 1
+
+    async def _watch_feed(self):
+        while True:
+            await asyncio.sleep(parameters.MANAGER_FEED_CHECK_INTERVAL)
+            if self._tick_refs or self._market_callbacks:
+                try:
+                    await self._ensure_feed()
+                except ConnectionError as e:
+                    logger.warning(f"Moving the shared market data failed, retrying: {e}")
+
+    async def subscribe_ticks(self, *pairs: str):
+        """Shared tick subscription: e:12/e:280 go out once per pair, on the feed account's connection."""
+        feed = await self._ensure_feed()
+        if feed is None:
+            raise ConnectionError("No running account to receive market data")
+        pairs = list(dict.fromkeys(pairs))
+        await feed.subscriptions.subscribe_ticks(*pairs)
+        for pair in pairs:
+            self._tick_refs[pair] = self._tick_refs.get(pair, 0) + 1
+
+    async def unsubscribe_ticks(self, *pairs: str):
+        held = [pair for pair in dict.fromkeys(pairs) if pair in self._tick_refs]
+        for pair in held:
+            self._tick_refs[pair] -= 1
+            if not self._tick_refs[pair]:
+                del self._tick_refs[pair]
+        if held and self._feed is not None and self._feed.is_running:
+            await self._feed.subscriptions.unsubscribe_ticks(*held)
+
+    @property
+    def tick_pairs(self) -> Dict[str, int]:
+        return dict(self._tick_refs)
+
+    def register_market_callback(self, event_code: int, callback: Callable[[Dict[str, Any]], Coroutine[Any, Any, None]]):
+        """Callback for market events (e.g. e:1 ticks) from the feed account; runs once per event."""
+        self._market_callbacks.append((event_code, callback))
+        if self._feed is not None:
+            self._feed.register_callback(event_code, callback)
+
+    def unregister_market_callback(self, event_code: int, callback: Callable[[Dict[str, Any]], Coroutine[Any, Any, None]]):
+        self._market_callbacks.remove((event_code, callback))
+        if self._feed is not None:
+            self._feed.unregister_callback(event_code, callback)
+
+    # --- Account streams ---
+
+    def register_callback(self, event_code: int, callback: AccountCallback):
+        """Callback for an account event (balances, trades) from every account, as `callback(key, message)`."""
+        self._account_callbacks.append((event_code, callback))
+        for key, client in self.clients.items():
+            self._attach(key, client, event_code, callback)
+
+    def unregister_callback(self, event_code: int, callback: AccountCallback):
+        self._account_callbacks.remove((event_code, callback))
+        for key, client in self.clients.items():
+            wrapper = self._wrappers.pop((key, event_code, callback), None)
+            if wrapper is not None:
+                client.unregister_callback(event_code, wrapper)
+
+    def _attach(self, key: str, client: OlympTradeClient, event_code: int, callback: AccountCallback):
+        async def routed(message: Dict[str, Any]):
+            await callback(key, message)
+        self._wrappers[(key, event_code, callback)] = routed
+        client.register_callback(event_code, routed)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-account state: running, account_id, whether it is the feed, connections and reconnects."""
+        return {key: {"running": client.is_running,
+                      "account_id": client.account_id,
+                      "feed": client is self._feed,
+                      "connections": sum(connection.is_connected for connection in client.connections),
+                      "reconnects": client.reconnect_stats.reconnects}
+                for key, client in self.clients.items()}
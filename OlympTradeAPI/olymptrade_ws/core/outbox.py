@@ -0,0 +1,132 @@
+# core/outbox.py
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from olymptrade_ws.olympconfig import parameters
+
+logger = logging.getLogger(__name__)
+
+
+class FrameBatcher:
+    """
+    Coalesces outgoing frames into multi-message frames, like the browser does.
+
+    Every frame is a JSON list of messages. Frames submitted in the same event-loop tick
+    (window=0) or within `window` seconds of the first one are merged into one list and
+    written together, in submission order. A merged frame holds at most `max_messages`
+    messages and `max_bytes` characters; larger batches are split, and a frame that is
+    already bigger than `max_bytes` goes out alone.
+
+    `submit()` returns once its frame has been written, or raises the write error, so
+    callers see the same outcome as with a direct send. A submitter that is cancelled
+    after queueing does not take its message back.
+    """
+
+    def __init__(self, write: Callable[[str], Awaitable[None]], window: Optional[float] = None,
+                 max_bytes: Optional[int] = None, max_messages: Optional[int] = None):
+        self._write = write
+        self.window = parameters.SEND_BATCH_WINDOW if window is None else window
+        self.max_bytes = max_bytes or parameters.SEND_BATCH_MAX_BYTES
+        self.max_messages = max_messages or parameters.SEND_BATCH_MAX_MESSAGES
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._pending_bytes = 0
+        self._flush_handle: Optional[asyncio.Handle] = None
+        self._write_lock = asyncio.Lock()
+        self._tasks: set = set()
+
+        # --- Metrics ---
+        self.messages = 0
+        self.frames = 0
+        self.largest_batch = 0
+
+    async def submit(self, frame: str):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((frame, future))
+        self._pending_bytes += len(frame)
+        if len(self._pending) >= self.max_messages or self._pending_bytes >= self.max_bytes:
+            self._schedule_flush(loop, now=True)
+        elif self._flush_handle is None:
+            self._schedule_flush(loop, now=False)
+        await future
+
+    def _schedule_flush(self, loop: asyncio.AbstractEventLoop, now: bool):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        if now or self.window <= 0:
+            self._flush_handle = loop.call_soon(self._start_flush)
+        else:
+            self._flush_handle = loop.call_later(self.window, self._start_flush)
+
+    def _start_flush(self):
+        self._flush_handle = None
+        task = asyncio.get_running_loop().create_task(self._flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self):
+        # The lock keeps batches in order: a later flush writes only after the earlier one
+        async with self._write_lock:
+            batch, self._pending, self._pending_bytes = self._pending, [], 0
+            if not batch:
+                return
+            frames = self._merge(batch)
+            for index, (frame, futures) in enumerate(frames):
+                try:
+                    await self._write(frame)
+                except BaseException as e:
+                    # This frame and everything after it in the batch fail alike
+                    failed = [future for _, pending in frames[index:] for future in pending]
+                    for future in failed:
+                        if not future.done():
+                            future.set_exception(e if isinstance(e, Exception) else ConnectionError("Send cancelled"))
+                    if not isinstance(e, Exception):
+                        raise
+                    return
+                self.frames += 1
+                self.messages += len(futures)
+                if len(futures) > self.largest_batch:
+                    self.largest_batch = len(futures)
+                for future in futures:
+                    if not future.done():
+                        future.set_result(None)
+
+    def _merge(self, batch: List[Tuple[str, asyncio.Future]]) -> List[Tuple[str, List[asyncio.Future]]]:
+        """Groups queued frames into merged frames within the message and size caps."""
+        frames: List[Tuple[str, List[asyncio.Future]]] = []
+        parts: List[str] = []
+        futures: List[asyncio.Future] = []
+        size = 2
+
+        def close():
+            if parts:
+                frames.append(("[" + ",".join(parts) + "]", list(futures)))
+                parts.clear()
+                futures.clear()
+
+        for frame, future in batch:
+            body = frame.strip()
+            if not (body.startswith("[") and body.endswith("]")) or body == "[]":
+                close() # Not a message list: sent as is, in order
+                frames.append((frame, [future]))
+                size = 2
+                continue
+            body = body[1:-1]
+            if parts and (len(parts) >= self.max_messages or size + 1 + len(body) > self.max_bytes):
+                close()
+                size = 2
+            parts.append(body)
+            futures.append(future)
+            size += len(body) + 1
+        close()
+        return frames
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "messages": self.messages,
+            "frames": self.frames,
+            "messages_per_frame": self.messages / self.frames if self.frames else 0.0,
+            "largest_batch": self.largest_batch,
+            "pending": len(self._pending),
+        }
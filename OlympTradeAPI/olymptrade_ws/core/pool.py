@@ -0,0 +1,90 @@
+# core/pool.py
+import asyncio
+import logging
+import zlib
+from typing import Any, Callable, Dict, Iterable, List
+
+from olymptrade_ws.olympconfig import parameters
+from .connection import Connection
+
+logger = logging.getLogger(__name__)
+
+# Tick subscribe/unsubscribe requests: sent on the pair's shard, where its e:1 ticks then arrive
+TICK_EVENTS = frozenset((parameters.E_SUBSCRIBE_TICKS, parameters.E_SUBSCRIBE_TICKS_RELATED,
+                         parameters.E_UNSUBSCRIBE_TICKS, parameters.E_UNSUBSCRIBE_TICKS_RELATED))
+
+
+class ConnectionPool:
+    """
+    A small set of authenticated connections behind one client (`connections=N`).
+
+    - `primary`: everything not routed elsewhere: e:98 subscriptions, candle history, account
+      and balance requests. It is also `client.connection`.
+    - `trade` (with N >= 2): latency-critical requests (`POOL_TRADE_EVENTS`: orders, pings), so
+      they never queue behind ticks or a large e:10 answer on the same socket.
+    - tick shards (the remaining N - 2): tick subscriptions, by a stable hash of the pair, so a
+      pair's e:1 stream always arrives on the same socket. With no shard left, ticks use primary.
+
+    Every connection feeds the client's one receive path, so callbacks, waiters and uuid
+    matching work the same whichever socket a message arrived on.
+    """
+
+    def __init__(self, make_connection: Callable[[str], Connection], size: int):
+        if size < 2:
+            raise ValueError("A connection pool needs at least 2 connections")
+        self.primary = make_connection("primary")
+        self.trade = make_connection("trade")
+        self.tick_shards: List[Connection] = [make_connection(f"ticks-{i}") for i in range(size - 2)]
+        self._routes: Dict[int, Connection] = {event_code: self.trade for event_code in parameters.POOL_TRADE_EVENTS}
+
+    @property
+    def connections(self) -> List[Connection]:
+        return [self.primary, self.trade] + self.tick_shards
+
+    def route(self, event_code: int) -> Connection:
+        """Connection for a request that is not tied to a pair."""
+        return self._routes.get(event_code, self.primary)
+
+    def for_pair(self, pair: str) -> Connection:
+        """The tick shard for a pair (stable across restarts: crc32, not the salted hash())."""
+        if not self.tick_shards:
+            return self.primary
+        return self.tick_shards[zlib.crc32(pair.encode()) % len(self.tick_shards)]
+
+    def split_pairs(self, pairs: Iterable[str]) -> Dict[Connection, List[str]]:
+        groups: Dict[Connection, List[str]] = {}
+        for pair in pairs:
+            groups.setdefault(self.for_pair(pair), []).append(pair)
+        return groups
+
+    def replace(self, old: Connection, new: Connection):
+        """Puts `new` in `old`'s role (and routes), e.g. when a degraded connection is failed over."""
+        if self.primary is old:
+            self.primary = new
+        if self.trade is old:
+            self.trade = new
+        self.tick_shards = [new if shard is old else shard for shard in self.tick_shards]
+        self._routes = {event_code: new if connection is old else connection
+                        for event_code, connection in self._routes.items()}
+
+    async def connect(self):
+        """Opens every connection at once; if one fails, the others are closed again."""
+        results = await asyncio.gather(*(connection.connect() for connection in self.connections),
+                                       return_exceptions=True)
+        failed = next((result for result in results if isinstance(result, BaseException)), None)
+        if failed is not None:
+            await self.disconnect()
+            raise failed
+
+    async def disconnect(self):
+        await asyncio.gather(*(connection.disconnect() for connection in self.connections))
+
+    @property
+    def is_connected(self) -> bool:
+        return all(connection.is_connected for connection in self.connections)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-connection state and outgoing batching counters."""
+        return {connection.name: {"connected": connection.is_connected,
+                                  **(connection.batcher.stats() if connection.batcher else {})}
+                for connection in self.connections}
@@ -0,0 +1,207 @@
+# core/profitability.py
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from olymptrade_ws.olympconfig import parameters
+
+if TYPE_CHECKING:
+    from .client import OlympTradeClient
+
+logger = logging.getLogger(__name__)
+
+# e:182/e:183 payloads are not in the logbook yet: accept the usual spellings
+_PAIR_KEYS = ("pair", "p", "asset", "id")
+_PAYOUT_KEYS = ("profitability", "profit", "payout", "value", "percent")
+
+ChangeCallback = Callable[[Any, str, Optional[float], Optional[float]], None]
+
+
+def _payout_items(data: Any) -> List[Tuple[Optional[Any], str, Optional[float]]]:
+    """(account_id or None, pair, payout or None) for each asset in an e:182/e:183 payload."""
+    if isinstance(data, dict):
+        # {"EURUSD": 82, ...} or a single asset dict
+        if any(key in data for key in _PAIR_KEYS):
+            data = [data]
+        else:
+            data = [{"pair": pair, "payout": value} for pair, value in data.items()]
+    if not isinstance(data, list):
+        return []
+    items = []
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        pair = next((item[key] for key in _PAIR_KEYS if isinstance(item.get(key), str)), None)
+        if pair is None:
+            continue
+        value = next((item[key] for key in _PAYOUT_KEYS if key in item), None)
+        if isinstance(value, dict): # e.g. {"digital": 82}
+            value = max((v for v in value.values() if isinstance(v, (int, float))), default=None)
+        try:
+            payout = float(value) if value is not None else None
+        except (TypeError, ValueError):
+            continue
+        items.append((item.get("account_id"), pair, payout))
+    return items
+
+
+class ProfitabilityCache:
+    """
+    Per-account payout table, seeded once from e:182 and kept current from e:183 pushes.
+
+    Payouts are indexed by pair per account; `best()` returns pairs by payout, highest first,
+    from a sorted view rebuilt only after a change. Concurrent `ensure()` calls for the same
+    account share one e:182. Change callbacks run synchronously from dispatch, before event
+    callbacks, as `callback(account_id, pair, old_payout, new_payout)` (None = added/removed);
+    they must not block. Accounts already seeded are re-seeded after a reconnect, since pushes
+    sent while disconnected are lost.
+    """
+
+    def __init__(self, client: 'OlympTradeClient'):
+        self._client = client
+        self._payouts: Dict[Any, Dict[str, float]] = {}
+        self._sorted: Dict[Any, List[Tuple[str, float]]] = {}  # account -> best-first view, dropped on change
+        self._pending: Dict[Any, asyncio.Future] = {}
+        self._callbacks: List[ChangeCallback] = []
+        self._seeded: set = set()  # accounts answered by an e:182
+        self.updated_at: Dict[Any, float] = {}
+        self.updates = 0
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    # --- Callbacks ---
+
+    def on_change(self, callback: ChangeCallback):
+        self._callbacks.append(callback)
+
+    def remove_callback(self, callback: ChangeCallback):
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+    # --- Loading ---
+
+    def _account(self, account_id: Any) -> Any:
+        return self._client.account_id if account_id is None else account_id
+
+    def load(self, account_id: Any, data: Any, replace: bool = False) -> int:
+        """Applies an e:182/e:183 payload; replace=True drops pairs it does not list. Returns changes."""
+        default_account = self._account(account_id)
+        changed = 0
+        seen: Dict[Any, set] = {}
+        for item_account, pair, payout in _payout_items(data):
+            account = default_account if item_account is None else item_account
+            seen.setdefault(account, set()).add(pair)
+            changed += self._set(account, pair, payout)
+        if replace:
+            for account in set(seen) | {default_account}:
+                for pair in [p for p in self._payouts.get(account, ()) if p not in seen.get(account, ())]:
+                    changed += self._set(account, pair, None)
+        for account in seen:
+            self.updated_at[account] = time.time()
+        return changed
+
+    def _set(self, account: Any, pair: str, payout: Optional[float]) -> int:
+        table = self._payouts.setdefault(account, {})
+        old = table.get(pair)
+        if old == payout:
+            return 0
+        if payout is None:
+            del table[pair]
+        else:
+            table[pair] = payout
+        self._sorted.pop(account, None)
+        self.updates += 1
+        for callback in list(self._callbacks):
+            try:
+                callback(account, pair, old, payout)
+            except Exception as e:
+                logger.error(f"Payout change callback {callback} failed: {e}", exc_info=True)
+        return 1
+
+    def on_update(self, message: Dict[str, Any]):
+        """e:183 push handler (internal dispatch handler)."""
+        self.load(None, message.get("d"))
+
+    async def seed(self, account_id: Any = None, timeout: float = parameters.PROFITABILITY_SEED_TIMEOUT) -> Dict[str, float]:
+        """Requests e:182 for the account and replaces its table with the answer."""
+        account = self._account(account_id)
+        if account is None:
+            raise ValueError("account_id is not known yet")
+        pending = self._pending.get(account)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = self._pending[account] = asyncio.get_running_loop().create_future()
+        try:
+            response = await self._client.send_request(parameters.E_ASSET_PROFITABILITY, [{"account_id": account}],
+                                                       timeout=timeout)
+            data = (response or {}).get("d")
+            if not isinstance(data, (list, dict)):
+                raise ValueError(f"Unexpected e:{parameters.E_ASSET_PROFITABILITY} answer: {response}")
+            self.load(account, data, replace=True)
+            self._seeded.add(account)
+            self.updated_at[account] = time.time()
+            table = dict(self._payouts.get(account, {}))
+            future.set_result(table)
+            logger.info(f"Payouts seeded for account {account}: {len(table)} assets.")
+            return table
+        except BaseException as e:
+            future.set_exception(e if isinstance(e, Exception) else ConnectionError("Seed cancelled"))
+            future.exception() # Mark retrieved: with no joiners it would be logged as never retrieved
+            raise
+        finally:
+            del self._pending[account]
+
+    async def ensure(self, account_id: Any = None, timeout: float = parameters.PROFITABILITY_SEED_TIMEOUT) -> Dict[str, float]:
+        """The account's table, seeding it first if it never was."""
+        account = self._account(account_id)
+        if account in self._seeded and account not in self._pending:
+            return dict(self._payouts.get(account, {}))
+        return await self.seed(account, timeout)
+
+    def schedule_refresh(self):
+        """Re-seeds every seeded account in the background (after a reconnect)."""
+        if not self._seeded or (self._refresh_task is not None and not self._refresh_task.done()):
+            return
+        self._refresh_task = asyncio.create_task(self._refresh(list(self._seeded)))
+
+    async def _refresh(self, accounts: List[Any]):
+        results = await asyncio.gather(*(self.seed(account) for account in accounts), return_exceptions=True)
+        for account, result in zip(accounts, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Payout refresh for account {account} failed: {result}")
+
+    # --- Queries ---
+
+    def payout(self, pair: str, account_id: Any = None) -> Optional[float]:
+        return self._payouts.get(self._account(account_id), {}).get(pair)
+
+    def payouts(self, account_id: Any = None) -> Dict[str, float]:
+        return dict(self._payouts.get(self._account(account_id), {}))
+
+    def best(self, n: Optional[int] = None, account_id: Any = None, min_payout: Optional[float] = None,
+             pairs: Optional[Any] = None) -> List[Tuple[str, float]]:
+        """(pair, payout) highest first, optionally limited to `pairs` and payouts >= min_payout."""
+        account = self._account(account_id)
+        ranked = self._sorted.get(account)
+        if ranked is None:
+            ranked = self._sorted[account] = sorted(self._payouts.get(account, {}).items(),
+                                                    key=lambda item: (-item[1], item[0]))
+        if pairs is not None or min_payout is not None:
+            allowed = set(pairs) if pairs is not None else None
+            ranked = [(pair, payout) for pair, payout in ranked
+                      if (allowed is None or pair in allowed) and (min_payout is None or payout >= min_payout)]
+        return ranked[:n] if n is not None else list(ranked)
+
+    def best_pair(self, account_id: Any = None, pairs: Optional[Any] = None) -> Optional[str]:
+        ranked = self.best(1, account_id, pairs=pairs)
+        return ranked[0][0] if ranked else None
+
+    @property
+    def accounts(self) -> List[Any]:
+        return list(self._payouts)
+
+    def clear(self):
+        self._payouts.clear()
+        self._sorted.clear()
+        self._seeded.clear()
+        self.updated_at.clear()
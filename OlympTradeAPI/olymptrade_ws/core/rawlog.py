@@ -0,0 +1,169 @@
+# core/rawlog.py
+import gzip
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from olymptrade_ws.olympconfig import parameters
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class RawLogWriter:
+    """
+    Writes the raw-message logbook (markdown ```json blocks) from a background thread.
+
+    `write()` never blocks the event loop: frames go onto a bounded queue and are dropped,
+    and counted in `dropped`, when the writer falls behind. The thread drains the queue
+    in batches into a buffered file and flushes once per batch.
+
+    The file rotates when it exceeds `max_bytes` or is older than `rotate_seconds`. Rotated
+    files are renamed with a timestamp suffix and gzip-compressed when `compress` is set.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None,
+                 rotate_seconds: Optional[float] = None, compress: Optional[bool] = None,
+                 queue_size: Optional[int] = None, batch_size: int = 500, flush_interval: float = 0.5):
+        self.path = path or parameters.RAW_LOG_FILE
+        self.max_bytes = parameters.RAW_LOG_MAX_BYTES if max_bytes is None else max_bytes
+        self.rotate_seconds = parameters.RAW_LOG_ROTATE_SECONDS if rotate_seconds is None else rotate_seconds
+        self.compress = parameters.RAW_LOG_COMPRESS if compress is None else compress
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size or parameters.RAW_LOG_QUEUE_SIZE)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._file = None
+        self._opened_at = 0.0
+        self._size = 0
+
+        # --- Metrics ---
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+        self.errors = 0
+
+    def write(self, direction: str, message: str):
+        """Queues one frame for the logbook; drops it (counted) if the queue is full."""
+        if self._thread is None:
+            self.start()
+        try:
+            self._queue.put_nowait((direction, message))
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="olymptrade-rawlog", daemon=True)
+                self._thread.start()
+
+    def close(self, timeout: float = 5.0):
+        """Writes out what is queued and stops the thread."""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("Raw log queue still full at shutdown; remaining frames are dropped.")
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "rotations": self.rotations,
+            "errors": self.errors,
+        }
+
+    # --- Writer thread ---
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._maybe_rotate()
+                continue
+            batch = []
+            while item is not _STOP:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            stopping = item is _STOP
+            if batch:
+                self._write_batch(batch)
+        self._close_file()
+
+    def _write_batch(self, batch):
+        text = "".join(f"```json\n{direction} ➜ {message}\n```\n" for direction, message in batch)
+        try:
+            if self._file is None:
+                self._open_file()
+            self._file.write(text)
+            self._file.flush()
+            self._size += len(text.encode("utf-8"))
+            self.written += len(batch)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Failed to write to raw log file: {e}")
+            self._close_file()
+            return
+        self._maybe_rotate()
+
+    def _open_file(self):
+        log_dir = os.path.dirname(self.path)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8", buffering=1 << 16)
+        self._size = self._file.tell()
+        self._opened_at = time.time()
+
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception as e:
+                logger.error(f"Failed to close raw log file: {e}")
+            self._file = None
+
+    def _maybe_rotate(self):
+        if self._file is None:
+            return
+        too_big = self.max_bytes and self._size >= self.max_bytes
+        too_old = self.rotate_seconds and time.time() - self._opened_at >= self.rotate_seconds
+        if too_big or too_old:
+            self._rotate()
+
+    def _rotate(self):
+        self._close_file()
+        base, ext = os.path.splitext(self.path)
+        rotated = f"{base}.{time.strftime('%Y%m%d-%H%M%S')}{ext}"
+        suffix = 1
+        while os.path.exists(rotated) or os.path.exists(rotated + ".gz"):
+            rotated = f"{base}.{time.strftime('%Y%m%d-%H%M%S')}-{suffix}{ext}"
+            suffix += 1
+        try:
+            os.replace(self.path, rotated)
+            if self.compress:
+                with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(rotated)
+            self.rotations += 1
+        except OSError as e:
+            self.errors += 1
+            logger.error(f"Failed to rotate raw log file: {e}")
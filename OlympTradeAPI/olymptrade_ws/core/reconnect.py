@@ -0,0 +1,67 @@
+# core/reconnect.py
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from olymptrade_ws.olympconfig import parameters
+
+
+class Backoff:
+    """Jittered exponential backoff: initial * factor**attempt, capped, minus up to `jitter` of it."""
+
+    def __init__(self, initial: Optional[float] = None, maximum: Optional[float] = None,
+                 factor: Optional[float] = None, jitter: Optional[float] = None):
+        # Defaults are read at construction so runtime changes to parameters take effect
+        self.initial = parameters.RECONNECT_INITIAL_DELAY if initial is None else initial
+        self.maximum = parameters.RECONNECT_MAX_DELAY if maximum is None else maximum
+        self.factor = parameters.RECONNECT_BACKOFF_FACTOR if factor is None else factor
+        self.jitter = parameters.RECONNECT_JITTER if jitter is None else jitter
+        self.attempt = 0
+
+    def next_delay(self) -> float:
+        delay = min(self.maximum, self.initial * self.factor ** self.attempt)
+        self.attempt += 1
+        return delay * (1 - self.jitter * random.random())
+
+    def reset(self):
+        self.attempt = 0
+
+
+@dataclass
+class ReconnectStats:
+    """Connection-recovery metrics, exposed as `client.reconnect_stats`."""
+    disconnects: int = 0
+    reconnects: int = 0
+    failed_attempts: int = 0
+    replayed_requests: int = 0
+    failed_requests: int = 0
+    last_time_to_recover: Optional[float] = None  # Seconds from connection loss to reconnected
+    max_time_to_recover: float = 0.0
+    total_downtime: float = 0.0
+    last_message_gap: Optional[float] = None      # Seconds between last frame before loss and first after
+    max_message_gap: float = 0.0
+    failovers: int = 0                            # Degraded connections replaced (health failover)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+class MessageClock:
+    """Tracks when the last frame arrived, to measure the gap a reconnect left in the stream."""
+
+    def __init__(self):
+        self.last_message_at: Optional[float] = None
+        self.gap_started_at: Optional[float] = None
+
+    def mark_loss(self):
+        self.gap_started_at = self.last_message_at or time.monotonic()
+
+    def on_message(self) -> Optional[float]:
+        """Records a frame; returns the gap length if this is the first frame after a loss."""
+        now = time.monotonic()
+        self.last_message_at = now
+        if self.gap_started_at is None:
+            return None
+        gap, self.gap_started_at = now - self.gap_started_at, None
+        return gap
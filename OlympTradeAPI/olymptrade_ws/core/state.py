@@ -0,0 +1,179 @@
+# core/state.py
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from olymptrade_ws.olympconfig import parameters
+
+if TYPE_CHECKING:
+    from .client import OlympTradeClient
+
+logger = logging.getLogger(__name__)
+
+
+class StateMirror:
+    """
+    Client-side mirror of open trades and account balances, kept current from pushes.
+
+    Open trades are indexed by id (e:22 / e:21 add or update, e:26 removes) with running
+    per-pair exposure. Balances are indexed by (account_id, group) from e:55. Queries are
+    answered locally, without a round trip. `resync()` runs once per (re)connect and reloads
+    both from e:1043 / e:31 where the server answers them.
+    """
+
+    def __init__(self, client: 'OlympTradeClient'):
+        self._client = client
+        self.trades: Dict[Any, Dict[str, Any]] = {}
+        self.balances: Dict[Tuple[Any, str], Dict[str, Any]] = {}
+        self._exposure: Dict[str, float] = {}  # pair -> total open amount
+        self._net: Dict[str, float] = {}       # pair -> up minus down amount
+        self.closed = 0
+        self.last_resync: Optional[float] = None
+        self._resync_task: Optional[asyncio.Task] = None
+
+    # --- Push handlers (internal dispatch handlers, run before callbacks) ---
+
+    def on_trade_event(self, message: Dict[str, Any]):
+        closing = message.get("e") == parameters.E_TRADE_CLOSED
+        for item in message.get("d") or ():
+            if not isinstance(item, dict) or item.get("id") is None:
+                continue
+            if closing:
+                if self._remove(item["id"]) is not None:
+                    self.closed += 1
+            else:
+                self._upsert(item)
+
+    def on_balance(self, message: Dict[str, Any]):
+        self._load_balances(message.get("d"))
+
+    # --- Open trades ---
+
+    def _upsert(self, item: Dict[str, Any]):
+        trade = self.trades.get(item["id"])
+        if trade is None:
+            trade = self.trades[item["id"]] = dict(item)
+            self._add_exposure(trade, 1)
+        else:
+            self._add_exposure(trade, -1)
+            trade.update(item)
+            self._add_exposure(trade, 1)
+
+    def _remove(self, trade_id: Any) -> Optional[Dict[str, Any]]:
+        trade = self.trades.pop(trade_id, None)
+        if trade is not None:
+            self._add_exposure(trade, -1)
+        return trade
+
+    def _add_exposure(self, trade: Dict[str, Any], sign: int):
+        pair = trade.get("pair")
+        try:
+            amount = float(trade.get("amount") or 0) * sign
+        except (TypeError, ValueError):
+            return
+        if pair is None or not amount:
+            return
+        self._exposure[pair] = self._exposure.get(pair, 0.0) + amount
+        direction = trade.get("dir")
+        if direction in ("up", "down"):
+            self._net[pair] = self._net.get(pair, 0.0) + (amount if direction == "up" else -amount)
+        if abs(self._exposure[pair]) < 1e-9:
+            del self._exposure[pair]
+            self._net.pop(pair, None)
+
+    def open_trades(self, pair: Optional[str] = None, account_id: Any = None) -> List[Dict[str, Any]]:
+        trades = self.trades.values()
+        if pair is None and account_id is None:
+            return list(trades)
+        return [trade for trade in trades
+                if (pair is None or trade.get("pair") == pair) and (account_id is None or trade.get("account_id") == account_id)]
+
+    def trade(self, trade_id: Any) -> Optional[Dict[str, Any]]:
+        return self.trades.get(trade_id)
+
+    def exposure(self, pair: str, net: bool = False) -> float:
+        """Total amount in open trades on `pair`, or up minus down with net=True."""
+        return (self._net if net else self._exposure).get(pair, 0.0)
+
+    @property
+    def exposures(self) -> Dict[str, float]:
+        return dict(self._exposure)
+
+    def prune_expired(self, grace: float = parameters.STATE_EXPIRED_GRACE) -> int:
+        """Drops trades past close_time + grace whose e:26 never arrived (e.g. closed while disconnected)."""
+        cutoff = time.time() - grace
+        expired = [trade_id for trade_id, trade in self.trades.items()
+                   if isinstance(trade.get("close_time"), (int, float)) and trade["close_time"] < cutoff]
+        for trade_id in expired:
+            self._remove(trade_id)
+        return len(expired)
+
+    # --- Balances ---
+
+    def _load_balances(self, accounts: Any):
+        if not isinstance(accounts, list):
+            return
+        for account in accounts:
+            if isinstance(account, dict) and account.get("account_id") is not None:
+                self.balances[(account["account_id"], account.get("group"))] = account
+
+    def balance(self, account_id: Any = None, group: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Balance dict for an account (default: the client's), or the first of `group`."""
+        if account_id is None and group is None:
+            account_id, group = self._client.account_id, self._client.account_group
+        if account_id is not None:
+            balance = self.balances.get((account_id, group))
+            if balance is not None or group is not None:
+                return balance
+            return next((b for (acc, _), b in self.balances.items() if acc == account_id), None)
+        return next((b for (_, grp), b in self.balances.items() if grp == group), None)
+
+    def amount(self, account_id: Any = None, group: Optional[str] = None) -> Optional[float]:
+        balance = self.balance(account_id, group)
+        return balance.get("amount") if balance else None
+
+    # --- Resync ---
+
+    def schedule_resync(self):
+        """Starts a background resync unless one is already running."""
+        if self._resync_task is None or self._resync_task.done():
+            self._resync_task = asyncio.create_task(self.resync())
+
+    async def resync(self, timeout: float = parameters.STATE_RESYNC_TIMEOUT):
+        """Reloads balances (e:1043) and open trades (e:31) for the client's account, if known."""
+        account_id, group = self._client.account_id, self._client.account_group
+        self.prune_expired()
+        if account_id is None:
+            logger.debug("State resync skipped: account_id not known yet; pushes fill the mirror.")
+            return
+        data = [{"account_id": account_id, "group": group}]
+        # Independent requests: sent together, one round trip
+        balances, response = await asyncio.gather(
+            self._client.send_request(parameters.E_GET_BALANCE_REQUEST_2, data, timeout=timeout),
+            self._client.send_request(parameters.E_OPEN_TRADES_REQUEST, data, timeout=timeout),
+            return_exceptions=True)
+        for result in (balances, response):
+            if isinstance(result, BaseException) and not isinstance(result, (asyncio.TimeoutError, ConnectionError)):
+                raise result
+        if not isinstance(balances, BaseException):
+            self._load_balances((balances or {}).get("d"))
+        if isinstance(balances, BaseException) or isinstance(response, BaseException):
+            logger.warning(f"State resync incomplete: {balances if isinstance(balances, BaseException) else response}")
+            return
+        trades = (response or {}).get("d")
+        # e:31 is unverified: an empty or unexpected answer keeps the pushed state
+        if isinstance(trades, list) and trades and all(isinstance(t, dict) and "id" in t for t in trades):
+            for trade_id in [tid for tid, t in self.trades.items() if t.get("account_id") in (None, account_id)]:
+                self._remove(trade_id)
+            for trade in trades:
+                if trade.get("status") not in ("win", "loose", "draw", "closed"):
+                    self._upsert(trade)
+        self.last_resync = time.time()
+        logger.info(f"State resynced: {len(self.trades)} open trades, {len(self.balances)} balances.")
+
+    def clear(self):
+        self.trades.clear()
+        self.balances.clear()
+        self._exposure.clear()
+        self._net.clear()
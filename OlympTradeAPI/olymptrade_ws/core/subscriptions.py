@@ -0,0 +1,174 @@
+# core/subscriptions.py
+import asyncio
+import json
+import logging
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+from olymptrade_ws.olympconfig import parameters
+
+if TYPE_CHECKING:
+    from .client import OlympTradeClient
+    from .connection import Connection
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriptionManager:
+    """
+    Reference-counted subscriptions shared by everything using one client.
+
+    Tick pairs (e:12 + e:280 / e:13 + e:281) and e:98 event groups are only sent on
+    0 -> 1 (subscribe) and 1 -> 0 (unsubscribe) transitions. Pairs going through the same
+    transition in one call are batched into one e:12 and one e:280 request. A subscriber
+    that arrives while the first subscribe for a pair is still in flight waits for it
+    instead of sending again. The live set is what `restore()` re-sends after a reconnect.
+    In pool mode, pairs are sent on their tick shard: one e:12/e:280 per shard involved.
+    """
+
+    def __init__(self, client: 'OlympTradeClient'):
+        self._client = client
+        self._pair_refs: Dict[str, int] = {}
+        self._group_refs: Dict[str, int] = {}
+        self._groups: Dict[str, Any] = {}  # key -> e:98 payload, in subscription order
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    # --- Tick pairs ---
+
+    async def subscribe_ticks(self, *pairs: str):
+        new_pairs, waits = [], {}
+        for pair in dict.fromkeys(pairs):
+            refs = self._pair_refs.get(pair, 0)
+            self._pair_refs[pair] = refs + 1
+            if refs == 0:
+                new_pairs.append(pair)
+            elif pair in self._pending:
+                waits[pair] = self._pending[pair]
+        try:
+            if new_pairs:
+                await self._send_transition(new_pairs, parameters.E_SUBSCRIBE_TICKS,
+                                            parameters.E_SUBSCRIBE_TICKS_RELATED, rollback=True)
+            # Joined someone else's subscribe that is still in flight: its outcome is ours
+            for pair, wait in waits.items():
+                await asyncio.shield(wait)
+                waits[pair] = None
+        except BaseException:
+            self._release([pair for pair, wait in waits.items() if wait is not None])
+            raise
+
+    async def unsubscribe_ticks(self, *pairs: str):
+        released = []
+        for pair in dict.fromkeys(pairs):
+            refs = self._pair_refs.get(pair, 0)
+            if refs == 0:
+                logger.warning(f"unsubscribe_ticks({pair}) without a matching subscribe; ignored.")
+                continue
+            if refs == 1:
+                del self._pair_refs[pair]
+                released.append(pair)
+            else:
+                self._pair_refs[pair] = refs - 1
+        if released:
+            await self._send_transition(released, parameters.E_UNSUBSCRIBE_TICKS,
+                                        parameters.E_UNSUBSCRIBE_TICKS_RELATED, rollback=False)
+
+    async def _send_transition(self, pairs: List[str], event_code: int, related_code: int, rollback: bool):
+        future = asyncio.get_running_loop().create_future()
+        if rollback:
+            for pair in pairs:
+                self._pending[pair] = future
+        try:
+            # One e:12 then e:280 per connection the pairs live on (one connection without a pool)
+            await asyncio.gather(*(self._send_pairs(connection, shard_pairs, event_code, related_code)
+                                   for connection, shard_pairs in self._client.tick_connections(pairs).items()))
+            future.set_result(None)
+        except BaseException as e:
+            if rollback: # A failed subscribe leaves no interest behind
+                self._release(pairs)
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                future.exception() # Retrieved here; waiting subscribers re-raise it
+            else:
+                future.cancel()
+            raise
+        finally:
+            for pair in pairs:
+                if self._pending.get(pair) is future:
+                    del self._pending[pair]
+        logger.info(f"Sent e:{event_code}/{related_code} for {len(pairs)} pair(s): {', '.join(pairs)}")
+
+    async def _send_pairs(self, connection: 'Connection', pairs: List[str], event_code: int, related_code: int):
+        data = [{"pair": pair} for pair in pairs]
+        await self._client.send_request(event_code, data, requires_response=True, connection=connection)
+        await self._client.send_request(related_code, data, requires_response=True, connection=connection)
+
+    def _release(self, pairs: Iterable[str]):
+        """Drops one reference per pair without sending anything."""
+        for pair in pairs:
+            refs = self._pair_refs.get(pair, 0) - 1
+            if refs > 0:
+                self._pair_refs[pair] = refs
+            else:
+                self._pair_refs.pop(pair, None)
+
+    # --- e:98 event groups ---
+
+    async def subscribe_events(self, group: Any):
+        """Subscribes to an e:98 event group (the request payload, e.g. [55] or [[55]])."""
+        key = json.dumps(group, sort_keys=True)
+        refs = self._group_refs.get(key, 0)
+        self._group_refs[key] = refs + 1
+        if refs:
+            return
+        self._groups[key] = group
+        try:
+            await self._client.send_request(parameters.E_SUBSCRIBE_EVENTS, group, requires_response=False)
+        except BaseException:
+            del self._group_refs[key]
+            del self._groups[key]
+            raise
+
+    def unsubscribe_events(self, group: Any):
+        """
+        Drops interest in an e:98 event group. No unsubscribe event is known for e:98, so nothing
+        is sent; the group is simply not re-sent after a reconnect once no one holds it.
+        """
+        key = json.dumps(group, sort_keys=True)
+        refs = self._group_refs.get(key, 0)
+        if refs <= 1:
+            self._group_refs.pop(key, None)
+            self._groups.pop(key, None)
+        else:
+            self._group_refs[key] = refs - 1
+
+    # --- Live set ---
+
+    @property
+    def tick_pairs(self) -> Dict[str, int]:
+        """Subscribed pairs and their reference counts."""
+        return dict(self._pair_refs)
+
+    @property
+    def event_groups(self) -> List[Any]:
+        return list(self._groups.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"tick_pairs": self.tick_pairs, "event_groups": self.event_groups}
+
+    async def restore(self, connection: Optional['Connection'] = None):
+        """Re-sends the live set on a fresh connection (after a reconnect); in pool mode, what lives on `connection`."""
+        connection = connection or self._client.connection
+        requests = []
+        if self._client._route(parameters.E_SUBSCRIBE_EVENTS) is connection:
+            requests = [(parameters.E_SUBSCRIBE_EVENTS, group) for group in self.event_groups]
+        pairs = self._client.tick_connections(sorted(self._pair_refs)).get(connection)
+        if pairs:
+            data = [{"pair": pair} for pair in pairs]
+            requests += [(parameters.E_SUBSCRIBE_TICKS, data), (parameters.E_SUBSCRIBE_TICKS_RELATED, data)]
+        # Queued together so the outgoing batcher can send them as one frame
+        await asyncio.gather(*(self._client.send_request(event_code, data, requires_response=False, connection=connection)
+                               for event_code, data in requests))
+
+    def clear(self):
+        self._pair_refs.clear()
+        self._group_refs.clear()
+        self._groups.clear()
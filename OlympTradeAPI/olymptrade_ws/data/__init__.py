@@ -0,0 +1,12 @@
+# olymptrade_ws/data/__init__.py
+# In-memory market data built from the live event stream
+from .candles import Candle, CandleAggregator, CandleSeries
+from .ticks import TickRing, TickStore
+
+__all__ = [
+    "Candle",
+    "CandleAggregator",
+    "CandleSeries",
+    "TickRing",
+    "TickStore"
+]
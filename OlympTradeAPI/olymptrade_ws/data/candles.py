@@ -0,0 +1,202 @@
+# data/candles.py
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from olymptrade_ws.olympconfig import parameters
+
+if TYPE_CHECKING:
+    from olymptrade_ws.core.client import OlympTradeClient
+
+logger = logging.getLogger(__name__)
+
+BarCallback = Callable[["Candle"], Awaitable[None]]
+
+
+@dataclass
+class Candle:
+    """One OHLC bar; `time` is the bar's start (seconds), `volume` the number of ticks."""
+    pair: str
+    size: int
+    time: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: int = 0
+
+    @property
+    def end(self) -> int:
+        return self.time + self.size
+
+    def update(self, price: float):
+        if price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        self.close = price
+        self.volume += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Same shape as the candles of an e:10 response."""
+        return {"t": self.time, "open": self.open, "high": self.high, "low": self.low,
+                "close": self.close, "volume": self.volume}
+
+
+class CandleSeries:
+    """Closed bars (bounded history) plus the bar in progress, for one pair and size."""
+
+    def __init__(self, pair: str, size: int, history: int):
+        self.pair = pair
+        self.size = size
+        self.closed: Deque[Candle] = deque(maxlen=history)
+        self.current: Optional[Candle] = None
+
+    def add_tick(self, timestamp: float, price: float) -> Optional[Candle]:
+        """Applies a tick; returns the bar it closed, if any. Late ticks for closed bars are ignored."""
+        start = int(timestamp // self.size) * self.size
+        current = self.current
+        if current is not None and start == current.time:
+            current.update(price)
+            return None
+        if current is not None and start < current.time:
+            return None
+        self.current = Candle(self.pair, self.size, start, price, price, price, price, 1)
+        if current is not None:
+            self.closed.append(current)
+        return current
+
+    def close_due(self, now: float) -> Optional[Candle]:
+        """Closes the bar in progress if its period is over (for quiet markets without ticks)."""
+        current = self.current
+        if current is None or now < current.end:
+            return None
+        self.closed.append(current)
+        self.current = None
+        return current
+
+    def seed(self, candles: Iterable[Dict[str, Any]], now: float):
+        """Loads e:10 history; a bar whose period is still running becomes the bar in progress."""
+        bars = sorted((Candle(self.pair, self.size, int(c["t"]), c["open"], c["high"], c["low"], c["close"],
+                              int(c.get("volume", 0))) for c in candles), key=lambda bar: bar.time)
+        known = {bar.time for bar in self.closed}
+        for bar in bars:
+            if bar.end > now:
+                if self.current is None or self.current.time <= bar.time:
+                    self.current = bar
+            elif bar.time not in known and (self.current is None or bar.time < self.current.time):
+                self.closed.append(bar)
+        if self.closed and any(a.time > b.time for a, b in zip(self.closed, list(self.closed)[1:])):
+            self.closed = deque(sorted(self.closed, key=lambda bar: bar.time), maxlen=self.closed.maxlen)
+
+    def bars(self, n: Optional[int] = None, include_current: bool = False) -> List[Candle]:
+        bars = list(self.closed)
+        if include_current and self.current is not None:
+            bars.append(self.current)
+        return bars if n is None else bars[-n:]
+
+
+class CandleAggregator:
+    """
+    Builds live OHLC bars at several sizes at once from e:1 tick pushes.
+
+        candles = CandleAggregator(sizes=(5, 15, 60, 300))
+        candles.on_bar_close(on_m1_close, size=60)   # async callback(candle)
+        candles.attach(client)
+        await candles.seed(client, "EURUSD")         # one e:10 per size
+        await client.market.subscribe_ticks("EURUSD")
+
+    Bars close when the first tick of the next period arrives (or on close_due()).
+    Callbacks run in order, after the bar is added to the history.
+    """
+
+    def __init__(self, sizes: Iterable[int] = parameters.CANDLE_SIZES, history: int = parameters.CANDLE_HISTORY):
+        self.sizes: Tuple[int, ...] = tuple(sorted(set(sizes)))
+        self.history = history
+        self._series: Dict[str, Tuple[CandleSeries, ...]] = {}
+        self._callbacks: List[Tuple[Optional[str], Optional[int], BarCallback]] = []
+        self.bars_closed = 0
+
+    def _pair_series(self, pair: str) -> Tuple[CandleSeries, ...]:
+        series = self._series.get(pair)
+        if series is None:
+            series = self._series[pair] = tuple(CandleSeries(pair, size, self.history) for size in self.sizes)
+        return series
+
+    def series(self, pair: str, size: int) -> CandleSeries:
+        for series in self._pair_series(pair):
+            if series.size == size:
+                return series
+        raise KeyError(f"Candle size {size}s is not aggregated (sizes: {self.sizes})")
+
+    # --- Callbacks ---
+
+    def on_bar_close(self, callback: BarCallback, pair: Optional[str] = None, size: Optional[int] = None):
+        """Registers an async callback(candle) for closed bars, optionally filtered by pair and/or size."""
+        self._callbacks.append((pair, size, callback))
+
+    def remove_callback(self, callback: BarCallback):
+        self._callbacks = [entry for entry in self._callbacks if entry[2] is not callback]
+
+    async def _closed(self, bar: Candle):
+        self.bars_closed += 1
+        for pair, size, callback in self._callbacks:
+            if (pair is None or pair == bar.pair) and (size is None or size == bar.size):
+                try:
+                    await callback(bar)
+                except Exception as e:
+                    logger.exception(f"Bar-close callback failed for {bar.pair} {bar.size}s: {e}")
+
+    # --- Input ---
+
+    def attach(self, client: 'OlympTradeClient'):
+        client.register_callback(parameters.E_TICK_UPDATE, self.on_tick)
+
+    def detach(self, client: 'OlympTradeClient'):
+        client.unregister_callback(parameters.E_TICK_UPDATE, self.on_tick)
+
+    async def on_tick(self, message: Dict[str, Any]):
+        """e:1 callback: {"e":1, "d":[{"p":pair, "q":price, "t":ts}, ...]}."""
+        for tick in message.get("d") or ():
+            try:
+                pair, price, timestamp = tick["p"], tick["q"], tick["t"]
+            except (KeyError, TypeError):
+                continue
+            await self.add_tick(pair, timestamp, price)
+
+    async def add_tick(self, pair: str, timestamp: float, price: float):
+        for series in self._pair_series(pair):
+            closed = series.add_tick(timestamp, price)
+            if closed is not None and self._callbacks:
+                await self._closed(closed)
+            elif closed is not None:
+                self.bars_closed += 1
+
+    async def close_due(self, now: Optional[float] = None):
+        """Closes every bar whose period has ended, firing callbacks (call from a timer if needed)."""
+        now = time.time() if now is None else now
+        for pair_series in self._series.values():
+            for series in pair_series:
+                closed = series.close_due(now)
+                if closed is not None:
+                    await self._closed(closed)
+
+    async def seed(self, client: 'OlympTradeClient', pair: str, count: Optional[int] = None):
+        """Seeds history for `pair` with one e:10 request per size."""
+        now = time.time()
+        for series in self._pair_series(pair):
+            candles = await client.market.get_candles(pair, series.size, count or self.history)
+            if candles is None:
+                logger.warning(f"No history received for {pair} {series.size}s; starting from live ticks.")
+                continue
+            series.seed(candles[-(count or self.history):], now)
+
+    # --- Queries ---
+
+    def bars(self, pair: str, size: int, n: Optional[int] = None, include_current: bool = False) -> List[Candle]:
+        return self.series(pair, size).bars(n, include_current)
+
+    def current(self, pair: str, size: int) -> Optional[Candle]:
+        return self.series(pair, size).current
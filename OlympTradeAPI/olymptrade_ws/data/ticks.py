@@ -0,0 +1,170 @@
+# data/ticks.py
+import bisect
+import logging
+from array import array
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Tuple
+
+from olymptrade_ws.olympconfig import parameters
+
+try:
+    import numpy as np
+except ImportError: # Optional: zero-copy ndarray views (pip install numpy)
+    np = None
+
+if TYPE_CHECKING:
+    from olymptrade_ws.core.client import OlympTradeClient
+
+logger = logging.getLogger(__name__)
+
+
+class TickRing:
+    """
+    Fixed-capacity ring of (timestamp, price) float64 ticks for one pair.
+
+    Each column is an `array('d')` of 2 x capacity and every tick is written twice
+    (at i and i + capacity), 32 bytes per tick of capacity. The latest N ticks are therefore always one contiguous
+    slice, and `last()`/`window()` return views instead of copies. These are NumPy
+    arrays when numpy is installed, memoryviews otherwise.
+
+    Views share memory with the ring and are overwritten as new ticks arrive. Pass
+    copy=True, or copy them, to keep data past the next `capacity` ticks.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._times = array("d", bytes(16 * capacity))
+        self._prices = array("d", bytes(16 * capacity))
+        self._times_view = memoryview(self._times)
+        self._prices_view = memoryview(self._prices)
+        self._next = 0    # Write position in [0, capacity)
+        self.count = 0    # Ticks held (<= capacity)
+        self.total = 0    # Ticks ever appended
+
+    def append(self, timestamp: float, price: float):
+        i = self._next
+        mirror = i + self.capacity
+        self._times[i] = self._times[mirror] = timestamp
+        self._prices[i] = self._prices[mirror] = price
+        self._next = i + 1 if i + 1 < self.capacity else 0
+        if self.count < self.capacity:
+            self.count += 1
+        self.total += 1
+
+    def _span(self, n: int) -> Tuple[int, int]:
+        """Buffer indices of the contiguous slice holding the latest n ticks."""
+        n = max(0, min(n, self.count))
+        end = self._next + self.capacity
+        return end - n, end
+
+    def _views(self, start: int, end: int, copy: bool):
+        times, prices = self._times_view[start:end], self._prices_view[start:end]
+        if np is not None:
+            times, prices = np.frombuffer(times, dtype=np.float64), np.frombuffer(prices, dtype=np.float64)
+            return (times.copy(), prices.copy()) if copy else (times, prices)
+        return (times.tolist(), prices.tolist()) if copy else (times, prices)
+
+    def last(self, n: Optional[int] = None, copy: bool = False):
+        """(timestamps, prices) of the latest n ticks (all held ticks by default), oldest first."""
+        start, end = self._span(self.count if n is None else n)
+        return self._views(start, end, copy)
+
+    def window(self, start_time: float, end_time: Optional[float] = None, copy: bool = False):
+        """(timestamps, prices) of held ticks with start_time <= t < end_time (timestamps must be non-decreasing)."""
+        start, end = self._span(self.count)
+        times = self._times_view[start:end]
+        lo = start + bisect.bisect_left(times, start_time)
+        hi = end if end_time is None else start + bisect.bisect_left(times, end_time)
+        return self._views(lo, max(lo, hi), copy)
+
+    @property
+    def latest(self) -> Optional[Tuple[float, float]]:
+        if not self.count:
+            return None
+        i = self._next - 1 + self.capacity
+        return self._times[i], self._prices[i]
+
+    @property
+    def nbytes(self) -> int:
+        return self._times.itemsize * len(self._times) + self._prices.itemsize * len(self._prices)
+
+    def __len__(self) -> int:
+        return self.count
+
+
+_EMPTY = TickRing(1) # Answers queries for pairs with no ticks yet
+
+
+class TickStore:
+    """
+    Per-pair tick rings filled straight from e:1 messages.
+
+        store = TickStore(capacity=200_000)
+        store.attach(client)                       # registers the e:1 callback
+        times, prices = store.last("EURUSD", 1000)
+        print(store.memory_usage())
+    """
+
+    def __init__(self, capacity: int = parameters.TICK_STORE_CAPACITY, pairs: Optional[Iterable[str]] = None):
+        self.capacity = capacity
+        self._rings: Dict[str, TickRing] = {}
+        self.invalid_ticks = 0
+        for pair in pairs or ():
+            self.ring(pair)
+
+    def ring(self, pair: str) -> TickRing:
+        ring = self._rings.get(pair)
+        if ring is None:
+            ring = self._rings[pair] = TickRing(self.capacity)
+        return ring
+
+    def add(self, pair: str, timestamp: float, price: float):
+        self.ring(pair).append(timestamp, price)
+
+    def add_message(self, message: Dict[str, Any]):
+        """Adds every tick of an e:1 message: {"e":1, "d":[{"p":pair, "q":price, "t":ts}, ...]}."""
+        rings = self._rings
+        for tick in message.get("d") or ():
+            try:
+                pair = tick["p"]
+                ring = rings.get(pair)
+                if ring is None:
+                    ring = self.ring(pair)
+                ring.append(tick["t"], tick["q"])
+            except (KeyError, TypeError):
+                self.invalid_ticks += 1
+
+    async def on_tick(self, message: Dict[str, Any]):
+        """e:1 callback for OlympTradeClient.register_callback."""
+        self.add_message(message)
+
+    def attach(self, client: 'OlympTradeClient'):
+        client.register_callback(parameters.E_TICK_UPDATE, self.on_tick)
+
+    def detach(self, client: 'OlympTradeClient'):
+        client.unregister_callback(parameters.E_TICK_UPDATE, self.on_tick)
+
+    # --- Queries ---
+
+    def last(self, pair: str, n: Optional[int] = None, copy: bool = False):
+        return self._rings.get(pair, _EMPTY).last(n, copy)
+
+    def window(self, pair: str, start_time: float, end_time: Optional[float] = None, copy: bool = False):
+        return self._rings.get(pair, _EMPTY).window(start_time, end_time, copy)
+
+    def latest(self, pair: str) -> Optional[Tuple[float, float]]:
+        ring = self._rings.get(pair)
+        return ring.latest if ring is not None else None
+
+    @property
+    def pairs(self):
+        return list(self._rings)
+
+    def memory_usage(self) -> Dict[str, Dict[str, int]]:
+        """Per pair: bytes allocated, ticks held and ticks ever received."""
+        return {pair: {"bytes": ring.nbytes, "ticks": ring.count, "total": ring.total}
+                for pair, ring in self._rings.items()}
+
+    def __contains__(self, pair: str) -> bool:
+        return pair in self._rings
@@ -0,0 +1,11 @@
+# olymptrade_ws/fakeserver/__init__.py
+# Local stand-in for the OlympTrade WebSocket API (tests, benchmarks, failover drills)
+from .market import SyntheticMarket
+from .server import FakeOlympTradeServer, FakeServerConfig, FakeServerThread
+
+__all__ = [
+    "FakeOlympTradeServer",
+    "FakeServerConfig",
+    "FakeServerThread",
+    "SyntheticMarket"
+]
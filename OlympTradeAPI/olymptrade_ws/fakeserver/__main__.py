@@ -0,0 +1,50 @@
+# fakeserver/__main__.py
+# Run the stand-in server from the command line:
+#   python -m olymptrade_ws.fakeserver --port 8765 --latency 0.05 --jitter 0.02
+import argparse
+import asyncio
+import logging
+
+from olymptrade_ws.olympconfig import parameters
+from .server import FakeOlympTradeServer, FakeServerConfig
+
+
+def parse_args() -> FakeServerConfig:
+    parser = argparse.ArgumentParser(description="Local fake OlympTrade WebSocket server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay in seconds")
+    parser.add_argument("--tick-interval", type=float, default=0.25, help="Seconds between ticks per pair")
+    parser.add_argument("--disconnect-after", type=float, default=None, help="Drop connections after N seconds")
+    parser.add_argument("--disconnect-probability", type=float, default=0.0, help="Chance to drop on each request")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Max requests per second per connection")
+    parser.add_argument("--access-token", default=None, help="Only accept this access_token cookie")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    return FakeServerConfig(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        tick_interval=args.tick_interval,
+        disconnect_after=args.disconnect_after,
+        disconnect_probability=args.disconnect_probability,
+        rate_limit=args.rate_limit,
+        access_token=args.access_token,
+        seed=args.seed,
+    )
+
+
+async def main(config: FakeServerConfig):
+    async with FakeOlympTradeServer(config) as server:
+        print(f"Fake OlympTrade server listening on {server.uri}")
+        await asyncio.Future()  # Run until interrupted
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=parameters.LOG_LEVEL, format=parameters.LOG_FORMAT)
+    try:
+        asyncio.run(main(parse_args()))
+    except KeyboardInterrupt:
+        pass
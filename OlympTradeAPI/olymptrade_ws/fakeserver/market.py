@@ -0,0 +1,82 @@
+# fakeserver/market.py
+import math
+import zlib
+from typing import Dict, List
+
+# Base prices for the pairs seen in the logs; anything else gets a hashed base price
+DEFAULT_BASE_PRICES: Dict[str, float] = {
+    "EURUSD": 1.0850,
+    "EURUSD_OTC": 1.0850,
+    "GBPUSD": 1.2700,
+    "USDJPY": 151.20,
+    "LATAM_X": 12.500,
+    "ASIA_X": 8.250,
+}
+
+
+class SyntheticMarket:
+    """
+    Deterministic synthetic prices. The price of a pair is a pure function of time,
+    so history requests, ticks and replays all agree with each other without storing state:
+    a couple of slow sine waves for trend plus hashed noise for per-second wiggle.
+    """
+
+    def __init__(self, seed: int = 0, volatility: float = 0.0005, precision: int = 5):
+        self.seed = seed
+        self.volatility = volatility
+        self.precision = precision
+        self._base_prices = dict(DEFAULT_BASE_PRICES)
+        self._pair_hash: Dict[str, int] = {}
+
+    def _hash(self, pair: str) -> int:
+        h = self._pair_hash.get(pair)
+        if h is None:
+            h = zlib.crc32(f"{self.seed}:{pair}".encode())
+            self._pair_hash[pair] = h
+        return h
+
+    def base_price(self, pair: str) -> float:
+        base = self._base_prices.get(pair)
+        if base is None:
+            base = 1.0 + (self._hash(pair) % 10000) / 1000.0
+            self._base_prices[pair] = base
+        return base
+
+    def _noise(self, h: int, step: int) -> float:
+        """Uniform noise in [-1, 1) from an integer hash of (pair, step)."""
+        x = (h ^ (step * 2654435761)) & 0xFFFFFFFF
+        x = (x * 1103515245 + 12345) & 0x7FFFFFFF
+        return x / 0x40000000 - 1.0
+
+    def price(self, pair: str, t: float) -> float:
+        """Price of a pair at time t (seconds since epoch, fractional allowed)."""
+        h = self._hash(pair)
+        phase = (h % 628) / 100.0
+        trend = math.sin(t / 900.0 + phase) * 20 + math.sin(t / 97.0 + phase * 2) * 4
+        noise = self._noise(h, int(t * 4)) * 2
+        return round(self.base_price(pair) * (1 + self.volatility * (trend + noise)), self.precision)
+
+    def candle(self, pair: str, start: int, size: int) -> Dict[str, float]:
+        """OHLC candle for [start, start + size), sampled at up to 12 points."""
+        size = max(size, 1)
+        step = max(1, size // 12)
+        prices = [self.price(pair, t) for t in range(start, start + size, step)]
+        prices.append(self.price(pair, start + size - 1))
+        return {
+            "t": start,
+            "open": prices[0],
+            "high": max(prices),
+            "low": min(prices),
+            "close": prices[-1],
+            "volume": float(size),
+        }
+
+    def candles(self, pair: str, size: int, to_ts: int, count: int) -> List[Dict[str, float]]:
+        """The `count` candles of `size` seconds ending with the candle that contains `to_ts`."""
+        last_start = (to_ts // size) * size
+        first_start = last_start - (count - 1) * size
+        return [self.candle(pair, start, size) for start in range(first_start, last_start + 1, size)]
+
+    def tick(self, pair: str, t: float) -> Dict[str, float]:
+        """A tick in the e:1 format: {"p": pair, "q": price, "t": timestamp}."""
+        return {"p": pair, "q": self.price(pair, t), "t": round(t, 3)}
@@ -0,0 +1,456 @@
+# fakeserver/server.py
+import asyncio
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Collection, Dict, List, Optional, Set, Union
+
+from websockets.asyncio.server import ServerConnection, serve
+from websockets.exceptions import ConnectionClosed
+
+from olymptrade_ws.olympconfig import parameters
+from .market import SyntheticMarket
+
+logger = logging.getLogger(__name__)
+
+_ACCESS_TOKEN_RE = re.compile(r"access_token=([^;]+)")
+
+
+@dataclass
+class FakeServerConfig:
+    """Behaviour knobs for the stand-in server. Defaults answer instantly and never fail."""
+    host: str = "127.0.0.1"
+    port: int = 0                              # 0 = pick a free port
+    latency: float = 0.0                       # Seconds before each response is sent
+    jitter: float = 0.0                        # Extra uniform random delay in [0, jitter)
+    tick_interval: float = 0.25                # Seconds between e:1 ticks per subscribed pair
+    candles_per_request: int = 600             # Candles returned by one e:10 request
+    max_candles_per_request: Optional[int] = None  # If set, e:10 answers at most this many (newest), whatever "count" asks
+    disconnect_after: Optional[float] = None   # Drop each connection this many seconds after it opens
+    disconnect_probability: float = 0.0        # Chance of dropping the connection on each request
+    rate_limit: Optional[float] = None         # Max requests per second per connection
+    rate_limit_burst: int = 10                 # Token bucket size for rate limiting
+    rate_limit_close: bool = False             # Close the connection instead of answering with an error
+    access_token: Union[str, Collection[str], None] = None  # If set, reject handshakes with another token (or any not listed)
+    trade_win_probability: float = 0.5         # Chance that a placed trade closes as a win
+    payout: int = 82                           # Payout percentage reported for trades
+    asset_payouts: Dict[str, int] = field(default_factory=lambda: {
+        "EURUSD": 82, "GBPUSD": 80, "USDJPY": 78, "LATAM_X": 85, "ASIA_X": 84,
+    })                                         # Per-pair payouts answered to e:182 (pushed as e:183 on change)
+    demo_account_id: int = 2911220983
+    real_account_id: int = 2911220982
+    demo_balance: float = 10000.0
+    seed: int = 0
+
+
+class _Session:
+    """State of one client connection."""
+
+    def __init__(self, websocket: ServerConnection, config: FakeServerConfig):
+        self.websocket = websocket
+        self.tick_pairs: Set[str] = set()
+        self.event_groups: List[List[int]] = []
+        self.tasks: Set[asyncio.Task] = set()
+        self.tokens = float(config.rate_limit_burst)
+        self.last_refill = time.monotonic()
+
+    def spawn(self, coro: Awaitable[None]):
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def take_token(self, rate: float, burst: int) -> bool:
+        now = time.monotonic()
+        self.tokens = min(burst, self.tokens + (now - self.last_refill) * rate)
+        self.last_refill = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class FakeOlympTradeServer:
+    """
+    Local stand-in for the OlympTrade WebSocket API.
+
+    Speaks the same `[{"t":..,"e":..,"uuid":..,"d":..}]` framing as the real service and answers
+    pings (e:90), candle history (e:10), tick subscriptions (e:12/280, e:13/281), orders (e:23),
+    payouts (e:182, with e:183 pushes from set_payout) and account discovery (e:1068/1043). Ticks and candles come from a deterministic
+    SyntheticMarket. Latency, jitter, disconnects and rate limits are configurable so clients
+    and the backend can be benchmarked and failover-tested offline.
+
+    Usage:
+        async with FakeOlympTradeServer(FakeServerConfig(latency=0.05)) as server:
+            client = OlympTradeClient(access_token="test", uri=server.uri)
+    """
+
+    def __init__(self, config: Optional[FakeServerConfig] = None, market: Optional[SyntheticMarket] = None):
+        self.config = config or FakeServerConfig()
+        self.market = market or SyntheticMarket(seed=self.config.seed)
+        self.stats: Counter = Counter()
+        self._rng = random.Random(self.config.seed)
+        self._server = None
+        self._sessions: Set[_Session] = set()
+        self._next_trade_id = 1000000
+        self._open_trades: Dict[int, Dict[str, Any]] = {} # Accepted (e:22) and not yet closed
+        self._balances = {
+            self.config.demo_account_id: self.config.demo_balance,
+            self.config.real_account_id: 0.0,
+        }
+        self._handlers: Dict[int, Callable[[_Session, Dict[str, Any]], Awaitable[None]]] = {
+            parameters.E_PING: self._on_ping,
+            parameters.E_GET_CANDLES_REQUEST: self._on_get_candles,
+            parameters.E_SUBSCRIBE_TICKS: self._on_subscribe_ticks,
+            parameters.E_SUBSCRIBE_TICKS_RELATED: self._on_subscribe_ticks,
+            parameters.E_UNSUBSCRIBE_TICKS: self._on_unsubscribe_ticks,
+            parameters.E_UNSUBSCRIBE_TICKS_RELATED: self._on_unsubscribe_ticks,
+            parameters.E_SUBSCRIBE_EVENTS: self._on_subscribe_events,
+            parameters.E_PLACE_TRADE_REQUEST: self._on_place_trade,
+            parameters.E_SELECT_ASSET: self._on_select_asset,
+            parameters.E_OPEN_TRADES_REQUEST: self._on_open_trades,
+            parameters.E_GET_BALANCE_REQUEST_1: self._on_account_info,
+            parameters.E_GET_BALANCE_REQUEST_2: self._on_balance_request,
+            parameters.E_ASSET_PROFITABILITY: self._on_profitability,
+        }
+
+    # --- Lifecycle ---
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    @property
+    def uri(self) -> str:
+        return f"ws://{self.config.host}:{self.port}/otp?cid_ver=1"
+
+    async def start(self) -> "FakeOlympTradeServer":
+        self._server = await serve(
+            self._handle_connection,
+            self.config.host,
+            self.config.port,
+            process_request=self._check_token,
+            ping_interval=None,
+            max_size=None,
+        )
+        logger.info(f"Fake OlympTrade server listening on {self.uri}")
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            logger.info("Fake OlympTrade server stopped.")
+
+    async def __aenter__(self) -> "FakeOlympTradeServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    @property
+    def connection_count(self) -> int:
+        return len(self._sessions)
+
+    async def drop_connections(self, abrupt: bool = True):
+        """Drop every open connection, either abruptly (network blip) or with a close frame."""
+        for session in list(self._sessions):
+            self.stats["disconnects"] += 1
+            if abrupt:
+                session.websocket.transport.abort()
+            else:
+                await session.websocket.close(1012, "Service restart")
+
+    async def push(self, messages: List[Dict[str, Any]]):
+        """Send an unsolicited frame to every connected client."""
+        for session in list(self._sessions):
+            await self._send(session, messages)
+
+    async def set_payout(self, pair: str, payout: Optional[int]):
+        """Change (or with None, withdraw) a pair's payout and push e:183 to every client."""
+        if payout is None:
+            self.config.asset_payouts.pop(pair, None)
+        else:
+            self.config.asset_payouts[pair] = payout
+        await self.push([{"e": parameters.E_ASSET_PROFITABILITY_UPDATE, "t": 1,
+                          "d": [{"pair": pair, "profitability": payout}]}])
+
+    async def push_raw(self, frame: str):
+        """Send a pre-serialized frame verbatim to every connected client (capture replays)."""
+        for session in list(self._sessions):
+            try:
+                await session.websocket.send(frame)
+                self.stats["frames_sent"] += 1
+            except ConnectionClosed:
+                pass
+
+    # --- Connection handling ---
+
+    def _check_token(self, websocket: ServerConnection, request):
+        if self.config.access_token is None:
+            return None
+        match = _ACCESS_TOKEN_RE.search(request.headers.get("Cookie", ""))
+        accepted = self.config.access_token
+        accepted = {accepted} if isinstance(accepted, str) else set(accepted)
+        if not match or match.group(1) not in accepted:
+            self.stats["rejected_handshakes"] += 1
+            return websocket.respond(401, "Invalid access token\n")
+        return None
+
+    async def _handle_connection(self, websocket: ServerConnection):
+        session = _Session(websocket, self.config)
+        self._sessions.add(session)
+        self.stats["connections"] += 1
+        if self.config.disconnect_after is not None:
+            session.spawn(self._disconnect_later(session, self.config.disconnect_after))
+        session.spawn(self._tick_loop(session))
+        try:
+            async for raw in websocket:
+                self.stats["frames_received"] += 1
+                try:
+                    messages = json.loads(raw)
+                except json.JSONDecodeError:
+                    self.stats["invalid_frames"] += 1
+                    continue
+                for message in messages if isinstance(messages, list) else [messages]:
+                    await self._handle_message(session, message)
+        except ConnectionClosed:
+            pass
+        finally:
+            self._sessions.discard(session)
+            for task in list(session.tasks):
+                task.cancel()
+
+    async def _handle_message(self, session: _Session, message: Dict[str, Any]):
+        event_code = message.get("e")
+        self.stats[f"e:{event_code}"] += 1
+        self.stats["requests"] += 1
+
+        if self.config.rate_limit is not None and not session.take_token(self.config.rate_limit, self.config.rate_limit_burst):
+            self.stats["rate_limited"] += 1
+            if self.config.rate_limit_close:
+                await session.websocket.close(4029, "Too many requests")
+            else:
+                await self._respond(session, message, {"d": {"error": "rate_limited"}}, delay=0)
+            return
+
+        if self.config.disconnect_probability and self._rng.random() < self.config.disconnect_probability:
+            self.stats["disconnects"] += 1
+            session.websocket.transport.abort()
+            return
+
+        handler = self._handlers.get(event_code)
+        if handler is not None:
+            await handler(session, message)
+        elif message.get("uuid"):
+            await self._respond(session, message, {})
+
+    # --- Sending ---
+
+    def _delay(self) -> float:
+        return self.config.latency + (self._rng.random() * self.config.jitter if self.config.jitter else 0.0)
+
+    async def _send(self, session: _Session, messages: List[Dict[str, Any]]):
+        try:
+            await session.websocket.send(json.dumps(messages, separators=(",", ":")))
+            self.stats["frames_sent"] += 1
+        except ConnectionClosed:
+            pass
+
+    async def _respond(self, session: _Session, request: Dict[str, Any], fields: Dict[str, Any],
+                       pushes: Optional[List[Dict[str, Any]]] = None, delay: Optional[float] = None):
+        """Answer a request (t:3, same e and uuid) after the configured latency, plus optional pushes."""
+        response = {"e": request.get("e"), "t": 3, **fields}
+        if request.get("uuid"):
+            response["uuid"] = request["uuid"]
+        frame = [response] + (pushes or [])
+        delay = self._delay() if delay is None else delay
+        if delay > 0:
+            session.spawn(self._send_later(session, frame, delay))
+        else:
+            await self._send(session, frame)
+
+    async def _send_later(self, session: _Session, frame: List[Dict[str, Any]], delay: float):
+        await asyncio.sleep(delay)
+        await self._send(session, frame)
+
+    async def _disconnect_later(self, session: _Session, delay: float):
+        await asyncio.sleep(delay)
+        self.stats["disconnects"] += 1
+        session.websocket.transport.abort()
+
+    async def _tick_loop(self, session: _Session):
+        while True:
+            await asyncio.sleep(self.config.tick_interval)
+            if not session.tick_pairs:
+                continue
+            now = time.time()
+            ticks = [{"e": parameters.E_TICK_UPDATE, "t": 1, "d": [self.market.tick(pair, now)]}
+                     for pair in sorted(session.tick_pairs)]
+            self.stats["ticks_sent"] += len(ticks)
+            await self._send(session, ticks)
+
+    # --- Event handlers ---
+
+    async def _on_ping(self, session: _Session, message: Dict[str, Any]):
+        await self._respond(session, message, {"ts": int(time.time())})
+
+    async def _on_get_candles(self, session: _Session, message: Dict[str, Any]):
+        groups = []
+        for request in message.get("d") or []:
+            pair = request.get("pair")
+            size = int(request.get("size", 60))
+            to_ts = int(request.get("to", time.time()))
+            count = int(request.get("count", self.config.candles_per_request))
+            if self.config.max_candles_per_request is not None:
+                count = min(count, self.config.max_candles_per_request)
+            groups.append({"p": pair, "size": size, "candles": self.market.candles(pair, size, to_ts, count)})
+        await self._respond(session, message, {"d": groups})
+
+    async def _on_subscribe_ticks(self, session: _Session, message: Dict[str, Any]):
+        for item in message.get("d") or []:
+            if isinstance(item, dict) and item.get("pair"):
+                session.tick_pairs.add(item["pair"])
+        await self._respond(session, message, {})
+
+    async def _on_unsubscribe_ticks(self, session: _Session, message: Dict[str, Any]):
+        for item in message.get("d") or []:
+            if isinstance(item, dict):
+                session.tick_pairs.discard(item.get("pair"))
+        await self._respond(session, message, {})
+
+    async def _on_subscribe_events(self, session: _Session, message: Dict[str, Any]):
+        pushes = []
+        for group in message.get("d") or []:
+            if isinstance(group, list):
+                session.event_groups.append(group)
+                if parameters.E_BALANCE_UPDATE in group:
+                    pushes.append(self._balance_push())
+        # The server acknowledges subscriptions with the subscribed codes (see logs)
+        await self._respond(session, message, {"d": (message.get("d") or [[]])[0]}, pushes=pushes)
+
+    async def _on_open_trades(self, session: _Session, message: Dict[str, Any]):
+        accounts = {item.get("account_id") for item in message.get("d") or [] if isinstance(item, dict)}
+        trades = [dict(trade) for trade in self._open_trades.values() if trade.get("account_id") in accounts]
+        await self._respond(session, message, {"d": trades})
+
+    async def _on_select_asset(self, session: _Session, message: Dict[str, Any]):
+        # The strikes/payout push (e:80) follows the e:95 response, here in the same frame
+        assets = [{"p": item.get("pair"), "cat": item.get("cat", "digital"), "payout": self.config.payout}
+                  for item in message.get("d") or [] if isinstance(item, dict)]
+        await self._respond(session, message, {"d": []},
+                            pushes=[{"e": parameters.E_ASSET_STRIKES, "t": 1, "d": assets}] if assets else None)
+
+    async def _on_profitability(self, session: _Session, message: Dict[str, Any]):
+        accounts = [item.get("account_id") for item in message.get("d") or [] if isinstance(item, dict)]
+        payouts = [{"pair": pair, "account_id": account_id, "profitability": payout}
+                   for account_id in accounts for pair, payout in self.config.asset_payouts.items()]
+        await self._respond(session, message, {"d": payouts})
+
+    async def _on_account_info(self, session: _Session, message: Dict[str, Any]):
+        accounts = []
+        for request in message.get("d") or []:
+            group = request.get("group", "demo")
+            account_id = self.config.demo_account_id if group == "demo" else self.config.real_account_id
+            accounts.append({"account_id": account_id, "group": group})
+        await self._respond(session, message, {"d": accounts})
+
+    async def _on_balance_request(self, session: _Session, message: Dict[str, Any]):
+        await self._respond(session, message, {"d": self._balance_push()["d"]}, pushes=[self._balance_push()])
+
+    def _balance_push(self) -> Dict[str, Any]:
+        accounts = []
+        for account_id, amount in self._balances.items():
+            group = "demo" if account_id == self.config.demo_account_id else "real"
+            accounts.append({
+                "amount": amount, "amount_bonus": 0, "amount_bonus_free": 0, "amount_free": amount,
+                "amount_real": amount, "account_id": account_id, "group": group, "holds": {"payout": 0},
+            })
+        return {"d": accounts, "e": parameters.E_BALANCE_UPDATE, "t": 1}
+
+    async def _on_place_trade(self, session: _Session, message: Dict[str, Any]):
+        now = time.time()
+        results = []
+        for order in message.get("d") or []:
+            self._next_trade_id += 1
+            duration = int(order.get("duration", 60))
+            trade = {
+                "id": self._next_trade_id,
+                "pair": order.get("pair"),
+                "amount": order.get("amount"),
+                "dir": order.get("dir"),
+                "duration": duration,
+                "account_id": order.get("account_id"),
+                "group": order.get("group"),
+                "cat": order.get("cat"),
+                "status": "wait",
+                "payout": self.config.payout,
+                "open_time": int(now),
+                "close_time": int(now) + duration,
+                "curs_open": self.market.price(order.get("pair") or "", now),
+            }
+            results.append(trade)
+            session.spawn(self._run_trade(session, dict(trade)))
+        await self._respond(session, message, {"d": results})
+
+    async def _run_trade(self, session: _Session, trade: Dict[str, Any]):
+        """Push e:22 once the trade is open, then e:26 with the result once it expires."""
+        await asyncio.sleep(self._delay())
+        trade["status"] = "open"
+        self._open_trades[trade["id"]] = trade
+        await self._send(session, [{"e": parameters.E_TRADE_ACCEPTED, "t": 1, "d": [dict(trade)]}])
+
+        await asyncio.sleep(max(0.0, trade["close_time"] - time.time()))
+        win = self._rng.random() < self.config.trade_win_probability
+        amount = float(trade.get("amount") or 0)
+        balance_change = round(amount * trade["payout"] / 100, 2) if win else -amount
+        if trade.get("account_id") in self._balances:
+            self._balances[trade["account_id"]] += balance_change
+        self._open_trades.pop(trade["id"], None)
+        trade.update({
+            "status": "win" if win else "loose",
+            "balance_change": balance_change,
+            "curs_close": self.market.price(trade.get("pair") or "", time.time()),
+        })
+        await self._send(session, [{"e": parameters.E_TRADE_CLOSED, "t": 1, "d": [trade]}, self._balance_push()])
+
+
+class FakeServerThread:
+    """
+    Runs a FakeOlympTradeServer on its own event loop in a background thread,
+    for synchronous callers such as the backend's SimpleOlympTradeClient or a separate process.
+    """
+
+    def __init__(self, config: Optional[FakeServerConfig] = None):
+        self.server = FakeOlympTradeServer(config)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="fake-olymptrade", daemon=True)
+
+    @property
+    def uri(self) -> str:
+        return self.server.uri
+
+    def call(self, coro: Awaitable[Any], timeout: Optional[float] = 10) -> Any:
+        """Run a coroutine (e.g. server.drop_connections()) on the server loop and wait for it."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    def start(self) -> "FakeServerThread":
+        self._thread.start()
+        self.call(self.server.start())
+        return self
+
+    def stop(self):
+        self.call(self.server.stop())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+    def __enter__(self) -> "FakeServerThread":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -3,14 +3,13 @@ import asyncio
 import logging
 import os
 import signal
-from typing import Dict, Any # Added for type hinting
 
 from olymptrade_ws.olympconfig import parameters
 import olymptrade_ws.olympconfig.parameters as settings
-import time
 
 # Imports assuming main.py is run from the olymptrade_ws directory
 from olymptrade_ws.core.client import OlympTradeClient
+from olymptrade_ws.core.loop import run
 # core/client.py - Line 6 (Corrected)
 from olymptrade_ws.api.utils import timestamp_to_datetime
 
@@ -18,11 +17,6 @@ from olymptrade_ws.api.utils import timestamp_to_datetime
 logging.basicConfig(level=parameters.LOG_LEVEL, format=parameters.LOG_FORMAT)
 logger = logging.getLogger(__name__)
 
-# --- Global variable to store results if needed (or use a class) ---
-# This is a simple way for the callback to share data with the main flow
-# A more robust solution might involve passing a shared state object or using queues.
-trade_results: Dict[int, Dict[str, Any]] = {} # Store results keyed by trade ID
-
 # --- Callback Functions ---
 async def on_tick(message: dict):
     """Callback for processing tick updates (Event 1)."""
@@ -45,9 +39,7 @@ async def on_balance_update(message: dict):
     # You could update external state or trigger other logic here
 
 async def on_trade_update(message: dict):
-    """Callback for processing trade updates (Events 21, 22, 26)."""
-    global trade_results # Allow modifying the global dictionary
-
+    """Callback for logging trade updates (Events 22, 26). Results are awaited on the place_order handle."""
     event_code = message.get("e")
     trade_data_list = message.get("d", [])
     if isinstance(trade_data_list, list) and len(trade_data_list) > 0:
@@ -59,29 +51,13 @@ async def on_trade_update(message: dict):
             return
 
         status = trade_info.get("status")
-        interim_status = trade_info.get("interim_status")
 
         if event_code == settings.E_TRADE_ACCEPTED: # 22
              logger.info(f"TRADE ACCEPTED >> ID: {trade_id}, Status: {status}")
-             # Store initial info if needed
-             trade_results[trade_id] = {"status": status, "accepted_data": trade_info}
-        elif event_code == settings.E_TRADE_UPDATE_INTERIM: # 21
-             # logger.info(f"TRADE INTERIM >> ID: {trade_id}, Status: {interim_status}, PnL: {trade_info.get('interim_balance_change')}")
-             # Update existing record
-             if trade_id in trade_results:
-                 trade_results[trade_id]["interim_status"] = interim_status
-                 trade_results[trade_id]["interim_pnl"] = trade_info.get('interim_balance_change')
-                 trade_results[trade_id]["last_update_time"] = timestamp_to_datetime(time.time())
-             else:
-                 logger.warning(f"Received interim update for unknown trade ID: {trade_id}")
         elif event_code == settings.E_TRADE_CLOSED: # 26
              pnl = trade_info.get('balance_change')
              close_price = trade_info.get('curs_close')
              logger.info(f"TRADE CLOSED >> ID: {trade_id}, Status: {status}, PnL: {pnl}, ClosePrice: {close_price}")
-             # Store the final result
-             trade_results[trade_id] = {"status": status, "pnl": pnl, "closed_data": trade_info}
-             # Optionally notify another part of your application that this trade is done
-             # e.g., by setting an asyncio.Event if you were waiting specifically for this ID.
         else:
              logger.warning(f"Unhandled trade event {event_code}: {trade_info}")
 
@@ -109,7 +85,6 @@ async def run_client():
     client.register_callback(parameters.E_BALANCE_UPDATE, on_balance_update)
     # Register the single handler for all relevant trade events
     client.register_callback(parameters.E_TRADE_ACCEPTED, on_trade_update)
-    client.register_callback(parameters.E_TRADE_UPDATE_INTERIM, on_trade_update)
     client.register_callback(parameters.E_TRADE_CLOSED, on_trade_update)
     # Register callbacks for other events as needed (e.g., profitability updates E_ASSET_PROFITABILITY_UPDATE)
 
@@ -129,6 +104,8 @@ async def run_client():
              logger.warning(f"Signal handler for {sig} not supported on this platform.")
 
 
+    report_task = None # Reports the demo trade's result; finished before the client stops
+
     try:
         await client.start()
         logger.info("Client started. Press Ctrl+C to stop.")
@@ -161,13 +138,13 @@ async def run_client():
             await client.market.subscribe_ticks(pair_to_watch)
 
             # Example: Place a demo trade
-            placed_trade_id = None
+            trade_handle = None
             if demo_account_id:
                  logger.info("Attempting to place a demo trade...")
                  trade_duration_seconds = 60 # Example: 1 minute trade
                  trade_amount = 1 # Example amount
 
-                 initial_response = await client.trade.place_trade(
+                 trade_handle = await client.trade.place_trade(
                      pair=pair_to_watch,
                      amount=trade_amount,
                      direction="up", # Or "down"
@@ -176,26 +153,25 @@ async def run_client():
                      group="demo"
                  )
 
-                 if initial_response and initial_response.get("id"):
-                      placed_trade_id = initial_response.get("id")
-                      logger.info(f"Demo trade placed, ID: {placed_trade_id}. Waiting for result via callback...")
+                 if trade_handle and trade_handle.id:
+                      logger.info(f"Demo trade placed, ID: {trade_handle.id}. Its result is awaited on the handle...")
+
+                      async def report(handle):
+                          result = await handle # Resolved from dispatch when e:26 arrives
+                          logger.info(f"Final result for trade {handle.id}: {result.get('status')} "
+                                      f"PnL {result.get('balance_change')}, stage timings (ms): {handle.timings}")
+                      report_task = asyncio.create_task(report(trade_handle))
                  else:
-                      logger.error(f"Demo trade placement failed or did not return an ID. Response: {initial_response}")
+                      logger.error(f"Demo trade placement failed or did not return an ID. Response: {trade_handle}")
             else:
                  logger.warning("Cannot place demo trade, demo account ID unknown.")
 
-            # --- Wait for the trade result (or timeout/shutdown) ---
-            # The result will arrive asynchronously and be handled by `on_trade_update`
-            # We just keep the client running here.
+            # --- Keep running; the trade result is reported by its handle ---
             logger.info("Client running, waiting for events or stop signal...")
             await stop_event.wait() # Wait indefinitely until Ctrl+C or SIGTERM
 
-            # --- After stopping, check the result (if the trade completed) ---
-            if placed_trade_id and placed_trade_id in trade_results:
-                final_result = trade_results[placed_trade_id]
-                logger.info(f"Final result for trade {placed_trade_id}: {final_result}")
-            elif placed_trade_id:
-                logger.warning(f"Trade {placed_trade_id} was placed, but no final result received before shutdown.")
+            if trade_handle and not trade_handle.done:
+                logger.warning(f"Trade {trade_handle.id} was placed, but no final result received before shutdown.")
 
 
         except ConnectionError:
@@ -205,12 +181,15 @@ async def run_client():
 
     finally:
         logger.info("Cleaning up...")
+        if report_task is not None:
+            report_task.cancel()
+            await asyncio.gather(report_task, return_exceptions=True)
         await client.stop()
         logger.info("Client shutdown complete.")
 
 
 if __name__ == "__main__":
     try:
-        asyncio.run(run_client())
+        run(run_client()) # uvloop when USE_UVLOOP is set
     except KeyboardInterrupt:
         logger.info("KeyboardInterrupt received.")
@@ -12,6 +12,80 @@ DEFAULT_CONNECT_TIMEOUT = 10
 DEFAULT_RESPONSE_TIMEOUT = 15
 PING_INTERVAL = 25 # Interval to send keep-alive pings (e.g., e:90)
 
+# Auto-reconnect (jittered exponential backoff)
+RECONNECT_INITIAL_DELAY = 0.5 # Delay before the first reconnect attempt
+RECONNECT_MAX_DELAY = 30      # Upper bound for the backoff delay
+RECONNECT_BACKOFF_FACTOR = 2  # Delay multiplier per failed attempt
+RECONNECT_JITTER = 0.5        # Up to this fraction of each delay is randomized away
+RECONNECT_MAX_ATTEMPTS = None # None = keep trying until stop()
+
+# Connection health (connection.health) from e:90 pongs, and proactive failover
+PING_TIMEOUT = 5                  # Seconds before a pong counts as missed
+HEALTH_RTT_WINDOW = 50            # Recent pong RTTs kept per connection
+HEALTH_RTT_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500) # RTT histogram bucket bounds
+HEALTH_RTT_GOOD_MS = 250          # p90 RTT at or below this scores 1.0 ...
+HEALTH_RTT_BAD_MS = 2000          # ... and at or above this 0.0
+HEALTH_MAX_MISSED = 2             # Consecutive missed pongs that score 0.0
+HEALTH_GAP_GOOD = 30              # Seconds without any frame that still score 1.0 (pongs come every PING_INTERVAL)
+HEALTH_GAP_BAD = 90               # Seconds without any frame that score 0.0
+HEALTH_FAILOVER = True            # Replace a connection whose score drops below HEALTH_FAILOVER_SCORE
+HEALTH_FAILOVER_SCORE = 0.25
+HEALTH_FAILOVER_COOLDOWN = 120    # Seconds before the same connection role can fail over again
+HEALTH_DRAIN_TIMEOUT = 5          # Seconds the replaced connection stays open for its pending responses
+
+# Fast receive: decode frames in the receiver task and resolve responses there, skipping the
+# queue hop (pushes still go through the ingress queue). Uses orjson when installed.
+# Always on in pool dispatch mode, so a full callback queue never holds back a response.
+FAST_RECEIVE = False
+# Use uvloop for the event loop in olymptrade_ws entry points (olymptrade_ws.core.loop.run)
+USE_UVLOOP = False
+
+# Outgoing frame batching: messages sent in the same event-loop tick, or within
+# SEND_BATCH_WINDOW seconds of the first, are written as one multi-message frame
+SEND_BATCHING = False # Opt-in: merged client frames are only verified against the fake server
+SEND_BATCH_WINDOW = 0.0            # 0 = same loop tick only; e.g. 0.0002 waits up to 200 µs
+SEND_BATCH_MAX_BYTES = 64 * 1024   # Merged frames are split above this size
+SEND_BATCH_MAX_MESSAGES = 50       # ... or this many messages
+
+# Raw-message logbook (log_raw_messages=True)
+RAW_LOG_FILE = "logs/message_logbook.md"
+RAW_LOG_MAX_BYTES = 50 * 1024 * 1024 # Rotate when the logbook grows past this (0 = never)
+RAW_LOG_ROTATE_SECONDS = None        # Also rotate after this many seconds (None = never)
+RAW_LOG_COMPRESS = True              # gzip rotated logbooks
+RAW_LOG_QUEUE_SIZE = 10000           # Frames buffered for the writer thread; beyond this they are dropped
+
+# Tick store (olymptrade_ws.data.TickStore): ticks kept per pair, 32 bytes each (mirrored ring)
+TICK_STORE_CAPACITY = 100_000
+
+# Candle aggregator (olymptrade_ws.data.CandleAggregator)
+CANDLE_SIZES = (5, 15, 60, 300) # Bar sizes built from ticks, in seconds
+CANDLE_HISTORY = 500            # Closed bars kept per pair and size
+
+# Trade lifecycle tracking (TradeAPI.place_order handles)
+TRADE_TIMINGS_HISTORY = 1000 # Closed trades whose stage timings are kept for latency_summary()
+TRADE_EARLY_EVENTS = 1000    # Trade pushes kept for ids not (yet) placed through this client
+
+# Open-trade / balance mirror (client.state)
+STATE_RESYNC_TIMEOUT = 5   # Seconds per e:1043 / e:31 request when resyncing on (re)connect
+STATE_EXPIRED_GRACE = 30   # Open trades this long past close_time without an e:26 are dropped
+
+# Session bootstrap (initialize_session): account discovery cached across restarts by token subject
+BOOTSTRAP_CACHE_FILE = None # Opt-in: a path (e.g. under the user cache dir) to reuse discovered accounts
+BOOTSTRAP_CACHE_MAX_AGE = 7 * 24 * 3600         # Seconds before a cached account is rediscovered
+
+# Payout cache (client.profitability)
+PROFITABILITY_SEED_TIMEOUT = 5  # Seconds for the e:182 that seeds an account's payout table
+
+# Candle history fetch (MarketAPI.get_candle_range)
+CANDLE_PAGE_SIZE = 500          # Candles requested per e:10 page
+CANDLE_MAX_INFLIGHT = 4         # e:10 pages outstanding at once on the connection
+CANDLE_GAP_MAX_ROUNDS = 10      # Re-request rounds for candles missing after paging (server ignored or capped "count")
+
+# Event callback dispatch
+DISPATCH_MODE = "pool"      # "pool": bounded worker queues, "task": one task per callback, "inline": await in the receive loop
+CALLBACK_WORKERS = 2        # Worker tasks in pool mode (events are sharded by event code)
+CALLBACK_QUEUE_SIZE = 1000  # Per-worker queue bound; a full queue applies backpressure
+
 # Logging configuration
 LOG_LEVEL = "INFO" # e.g., DEBUG, INFO, WARNING, ERROR
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -53,4 +127,36 @@ E_SENTIMENT_UPDATE = 73
 E_USER_INFO = 110 # Contains email confirmed status etc.
 E_OPEN_TRADES_REQUEST = 31 # Needs confirmation
 
+# Requests that are safe to send twice; these are re-sent (same uuid) after a reconnect
+# instead of failing. Orders (e:23) are deliberately absent.
+IDEMPOTENT_EVENTS = frozenset({
+    E_PING, E_GET_CANDLES_REQUEST, E_SUBSCRIBE_TICKS, E_UNSUBSCRIBE_TICKS,
+    E_SUBSCRIBE_TICKS_RELATED, E_UNSUBSCRIBE_TICKS_RELATED, E_SUBSCRIBE_EVENTS,
+    E_GET_BALANCE_REQUEST_1, E_GET_BALANCE_REQUEST_2, E_ASSET_PROFITABILITY,
+    E_SELECT_ASSET, E_OPEN_TRADES_REQUEST,
+})
+
+# Connection pool (connections=N, see core/pool.py): primary + dedicated trade connection + N-2 tick shards
+POOL_CONNECTIONS = 1 # 1 = one connection carries everything
+POOL_TRADE_EVENTS = frozenset({E_PLACE_TRADE_REQUEST, E_PING}) # Sent on the dedicated trade connection
+
+# Multi-account manager (see core/manager.py): many account clients on one event loop
+MANAGER_START_CONCURRENCY = 10 # Accounts connecting at once in AccountManager.start()
+MANAGER_FEED_CHECK_INTERVAL = 5 # Seconds between checks that the shared market-data feed is still running
+
+# Receive queue (ingress) between the socket and message processing
+INGRESS_CAPACITY = 1000          # Max queued frames; KEEP events wait for room beyond this
+INGRESS_COALESCE_FRACTION = 0.5  # Start coalescing COALESCE events once the queue is this full
+INGRESS_COALESCE_MAX_HOLD = 0.25 # Seconds a coalesced buffer may grow before it is queued behind earlier frames
+# Policy per event code when processing falls behind: "keep" (default, never dropped),
+# "coalesce" (latest per pair) or "drop" (while full). Responses (with a uuid) are always kept.
+INGRESS_POLICIES = {
+    E_TICK_UPDATE: "coalesce",
+    E_SENTIMENT_UPDATE: "drop",
+    E_TRADE_UPDATE_INTERIM: "keep",
+    E_TRADE_ACCEPTED: "keep",
+    E_TRADE_CLOSED: "keep",
+    E_BALANCE_UPDATE: "keep",
+}
+
 # Add other identified event codes here...
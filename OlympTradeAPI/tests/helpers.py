@@ -0,0 +1,22 @@
+import asyncio
+from typing import Any, Callable, Dict, List
+from olymptrade_ws.olympconfig import parameters
+
+# Shared by the fake-server tests: `from helpers import ACCESS_TOKEN, collect_ticks, wait_until`
+ACCESS_TOKEN = "test-access-token"
+
+async def wait_until(predicate: Callable[[], Any], timeout: float = 5.0) -> bool:
+    """Polls `predicate` every 20 ms; its last value once `timeout` seconds have passed."""
+    for _ in range(int(timeout / 0.02)):
+        if predicate():
+            return True
+        await asyncio.sleep(0.02)
+    return predicate()
+
+def collect_ticks(register: Callable[[int, Callable], None]) -> List[Dict[str, Any]]:
+    """Registers an e:1 callback with `register` (a client's or manager's); returns the list it fills."""
+    ticks: List[Dict[str, Any]] = []
+    async def on_tick(message):
+        ticks.extend(message["d"])
+    register(parameters.E_TICK_UPDATE, on_tick)
+    return ticks
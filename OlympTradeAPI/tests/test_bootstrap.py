@@ -0,0 +1,47 @@
+import asyncio
+import base64
+import json
+from olymptrade_ws import OlympTradeClient
+from olymptrade_ws.core.bootstrap import AccountCache, token_subject
+from olymptrade_ws.fakeserver import FakeOlympTradeServer, FakeServerConfig
+
+# Session bootstrap: concurrent startup steps and account discovery cached by token subject
+def jwt(claims: dict) -> str:
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).decode().rstrip("=")
+    return f"eyJhbGciOiJSUzI1NiJ9.{payload}.signature"
+
+def test_token_subject():
+    assert token_subject(jwt({"user_id": 128751040, "exp": 1})) == "user:128751040"
+    assert token_subject(jwt({"user_id": 1, "exp": 2})) == token_subject(jwt({"user_id": 1, "exp": 3}))
+    assert token_subject("opaque").startswith("token:")
+
+def test_discovery_is_cached_across_restarts(tmp_path):
+    cache_path = str(tmp_path / "accounts.json")
+    token = jwt({"user_id": 42})
+
+    async def session(server, **kwargs):
+        client = OlympTradeClient(access_token=token, uri=server.uri, account_cache=cache_path, **kwargs)
+        await client.start()
+        await client.initialize_session()
+        await client.stop()
+        return client
+
+    async def run():
+        async with FakeOlympTradeServer(FakeServerConfig(latency=0.02, tick_interval=3600)) as server:
+            cold = await session(server)
+            cold_1068 = server.stats["e:1068"]
+            warm = await session(server)
+            warm_1068 = server.stats["e:1068"]
+            # A cached account the server does not list is rediscovered
+            AccountCache(cache_path).put(token_subject(token), 1234, "demo")
+            stale = await session(server)
+            return cold, cold_1068, warm, warm_1068, stale, server.stats["e:1068"]
+
+    cold, cold_1068, warm, warm_1068, stale, stale_1068 = asyncio.run(run())
+    assert cold.bootstrap_stats.discovery_source == "server" and cold_1068 == 2 # demo and real at once
+    assert warm.bootstrap_stats.discovery_source == "cache" and warm_1068 == cold_1068
+    assert warm.account_id == cold.account_id == 2911220983
+    assert warm.bootstrap_stats.discovery < cold.bootstrap_stats.discovery # No e:1068 round trip
+    assert warm.bootstrap_stats.connect_to_ready is not None
+    assert stale.account_id == 2911220983 and stale_1068 == cold_1068 + 2
+    assert AccountCache(cache_path).get(token_subject(token))["account_id"] == 2911220983
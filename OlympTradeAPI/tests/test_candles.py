@@ -0,0 +1,90 @@
+import asyncio
+import time
+from olymptrade_ws import OlympTradeClient, CandleAggregator
+from olymptrade_ws.fakeserver import FakeOlympTradeServer, FakeServerConfig
+
+# Live bars from ticks at several sizes; history seeded from the fake server's e:10
+def tick(pair: str, price: float, ts: float) -> str:
+    return f'[{{"e":1,"t":1,"d":[{{"p":"{pair}","q":{price},"t":{ts}}}]}}]'
+
+def test_bars_close_at_every_size():
+    async def run():
+        client = OlympTradeClient(access_token="test", dispatch_mode="inline")
+        candles = CandleAggregator(sizes=(5, 15))
+        candles.attach(client)
+        closed = []
+        async def on_close(bar):
+            closed.append((bar.size, bar.time, bar.open, bar.high, bar.low, bar.close, bar.volume))
+        candles.on_bar_close(on_close, pair="EURUSD")
+        for i, price in enumerate([1.0, 1.3, 0.9, 1.1, 1.2, 1.5, 1.4, 1.0, 1.1, 1.2, 1.3, 1.4, 1.5, 1.6, 1.7, 1.8]):
+            await client.process_raw_message(tick("EURUSD", price, 1000 + i * 1.0))
+        return candles, closed
+    candles, closed = asyncio.run(run())
+    # 1000..1004 -> 5s bar at 1000; 1005..1009 -> bar at 1005; 1010..1014 -> bar at 1010; 15s bar at 990 (1000..1004)
+    assert (5, 1000, 1.0, 1.3, 0.9, 1.2, 5) in closed
+    assert (5, 1005, 1.5, 1.5, 1.0, 1.2, 5) in closed
+    assert (15, 990, 1.0, 1.3, 0.9, 1.2, 5) in closed
+    assert [bar.time for bar in candles.bars("EURUSD", 5)] == [1000, 1005, 1010]
+    assert candles.current("EURUSD", 5).as_dict() == {"t": 1015, "open": 1.8, "high": 1.8, "low": 1.8, "close": 1.8, "volume": 1}
+
+def test_seed_from_history():
+    async def run():
+        async with FakeOlympTradeServer(FakeServerConfig()) as server:
+            client = OlympTradeClient(access_token="test", uri=server.uri)
+            await client.start()
+            candles = CandleAggregator(sizes=(5, 60), history=50)
+            await candles.seed(client, "EURUSD")
+            await client.stop()
+            return candles, server.stats
+    candles, stats = asyncio.run(run())
+    assert stats["e:10"] == 2
+    for size in (5, 60):
+        bars = candles.bars("EURUSD", size)
+        assert 48 <= len(bars) <= 50
+        assert all(b.time - a.time == size for a, b in zip(bars, bars[1:]))
+        assert bars[-1].end <= time.time()
+
+def test_candle_range_is_fetched_in_pages():
+    async def run():
+        async with FakeOlympTradeServer(FakeServerConfig(access_token="test", tick_interval=3600, latency=0.05)) as server:
+            client = OlympTradeClient(access_token="test", uri=server.uri)
+            await client.start()
+            started = time.perf_counter()
+            candles = await client.market.get_candle_range("EURUSD", 60, 1500, end_time=1_700_000_000,
+                                                           page_size=400, max_inflight=4)
+            elapsed = time.perf_counter() - started
+            columns = await client.market.get_candle_range("EURUSD", 60, start_time=1_699_990_000,
+                                                           end_time=1_700_000_000, as_numpy=True)
+            await client.stop()
+            return server.stats, candles, elapsed, columns
+
+    stats, candles, elapsed, columns = asyncio.run(run())
+    times = [candle["t"] for candle in candles]
+    assert len(candles) == 1500 and times[-1] == 1_700_000_000 // 60 * 60
+    assert all(b - a == 60 for a, b in zip(times, times[1:]))
+    assert stats["e:10"] == 4 + 1
+    assert elapsed < 4 * 0.05 # All four pages were in flight together
+    assert columns["t"][0] >= 1_699_990_000 and columns["t"][-1] == times[-1]
+    assert len(columns["t"]) == len(columns["close"]) == (times[-1] - columns["t"][0]) // 60 + 1
+
+def test_short_pages_are_re_requested_or_reported():
+    async def run():
+        # The server ignores most of "count": every page comes back with at most 150 candles
+        config = FakeServerConfig(access_token="test", tick_interval=3600, max_candles_per_request=150)
+        async with FakeOlympTradeServer(config) as server:
+            client = OlympTradeClient(access_token="test", uri=server.uri)
+            await client.start()
+            candles = await client.market.get_candle_range("EURUSD", 60, 1000, end_time=1_700_000_000, page_size=400)
+            requests = server.stats["e:10"]
+            config.max_candles_per_request = 0 # Nothing to fill the gaps with
+            gapped = await client.market.get_candle_range("EURUSD", 60, 300, end_time=1_700_000_000, page_size=100)
+            partial = await client.market.get_candle_range("EURUSD", 60, 300, end_time=1_700_000_000, page_size=100,
+                                                           allow_gaps=True)
+            await client.stop()
+            return candles, requests, gapped, partial
+
+    candles, requests, gapped, partial = asyncio.run(run())
+    times = [candle["t"] for candle in candles]
+    assert len(candles) == 1000 and all(b - a == 60 for a, b in zip(times, times[1:]))
+    assert requests > 3 # The three pages, then the missing runs
+    assert gapped is None and partial == []
@@ -0,0 +1,58 @@
+import asyncio
+from olymptrade_ws import OlympTradeClient
+from olymptrade_ws.capture import CaptureReader, Replayer, RECEIVED, SENT
+from olymptrade_ws.fakeserver import FakeOlympTradeServer, FakeServerConfig
+from helpers import ACCESS_TOKEN, collect_ticks, wait_until
+
+# Record a session against the fake server, then replay it without a network
+
+async def record_session(path: str):
+    config = FakeServerConfig(access_token=ACCESS_TOKEN, tick_interval=0.02)
+    async with FakeOlympTradeServer(config) as server:
+        client = OlympTradeClient(access_token=ACCESS_TOKEN, uri=server.uri, capture_path=path)
+        ticks = collect_ticks(client.register_callback)
+        await client.start()
+        await client.market.subscribe_ticks("EURUSD")
+        await wait_until(lambda: len(ticks) >= 5, timeout=1)
+        await client.stop()
+        return ticks
+
+async def replay_session(path: str, speed):
+    client = OlympTradeClient(access_token=ACCESS_TOKEN)
+    ticks = collect_ticks(client.register_callback)
+    stats = await Replayer(path, speed=speed).into_client(client)
+    return ticks, stats
+
+def test_record_and_replay(tmp_path):
+    path = str(tmp_path / "session.jsonl.gz")
+    recorded = asyncio.run(record_session(path))
+    frames = CaptureReader(path).frames()
+    assert any(frame.direction == SENT for frame in frames)
+    assert any(frame.direction == RECEIVED for frame in frames)
+
+    replayed, stats = asyncio.run(replay_session(path, speed=None))
+    assert replayed[:len(recorded)] == recorded
+    assert stats.frames == len([frame for frame in frames if frame.received])
+
+def test_replay_keeps_pacing(tmp_path):
+    path = str(tmp_path / "session.jsonl")
+    asyncio.run(record_session(path))
+    frames = CaptureReader(path).frames(RECEIVED)
+    span = frames[-1].ts - frames[0].ts
+    _, stats = asyncio.run(replay_session(path, speed=2.0))
+    assert stats.elapsed >= span / 2 * 0.9
+
+def test_replay_to_server(tmp_path):
+    path = str(tmp_path / "session.jsonl")
+    recorded = asyncio.run(record_session(path))
+
+    async def run():
+        async with FakeOlympTradeServer(FakeServerConfig()) as server:
+            client = OlympTradeClient(access_token=ACCESS_TOKEN, uri=server.uri)
+            ticks = collect_ticks(client.register_callback)
+            await client.start()
+            await Replayer(path, speed=None).into_server(server)
+            await wait_until(lambda: len(ticks) >= len(recorded), timeout=1)
+            await client.stop()
+            return ticks
+    assert asyncio.run(run())[:len(recorded)] == recorded
@@ -0,0 +1,105 @@
+import asyncio
+from olymptrade_ws import OlympTradeClient
+from olymptrade_ws.core.dispatcher import EventDispatcher
+from olymptrade_ws.fakeserver import FakeOlympTradeServer, FakeServerConfig
+from helpers import ACCESS_TOKEN, wait_until
+
+# Callback dispatch without a connection: frames go straight into the receive path
+def tick_frame(i: int) -> str:
+    return f'[{{"e":1,"t":1,"d":[{{"p":"EURUSD","q":{1 + i / 1000},"t":{i}}}]}}]'
+
+def test_pool_keeps_order_and_reports_errors():
+    async def run():
+        errors = []
+        client = OlympTradeClient(access_token="test", dispatch_mode="pool", callback_workers=3,
+                                  on_callback_error=lambda e, cb, exc: errors.append((e, str(exc))))
+        seen = []
+        async def on_tick(message):
+            seen.append(message["d"][0]["t"])
+        async def broken(message):
+            raise ValueError("boom")
+        client.register_callback(1, on_tick)
+        client.register_callback(2, broken)
+        for i in range(200):
+            await client.process_raw_message(tick_frame(i))
+        await client.process_raw_message('[{"e":2,"t":1,"d":[]}]')
+        await client.flush_callbacks()
+        await client._dispatcher.stop()
+        return seen, errors, client.callback_errors
+    seen, errors, error_count = asyncio.run(run())
+    assert seen == list(range(200))
+    assert errors == [(2, "boom")] and error_count == 1
+
+def test_inline_and_unregister():
+    async def run():
+        client = OlympTradeClient(access_token="test", dispatch_mode="inline")
+        seen = []
+        async def on_tick(message):
+            seen.append(message["d"][0]["t"])
+        client.register_callback(1, on_tick)
+        await client.process_raw_message(tick_frame(1))
+        client.unregister_callback(1, on_tick)
+        await client.process_raw_message(tick_frame(2))
+        return seen
+    assert asyncio.run(run()) == [1]
+
+def test_dispatch_table_is_rebuilt():
+    dispatcher = EventDispatcher()
+    async def a(message): pass
+    async def b(message): pass
+    dispatcher.register(1, a)
+    dispatcher.register(1, b)
+    assert dispatcher.callbacks_for(1) == (a, b)
+    assert dispatcher.unregister(1, a)
+    assert dispatcher.callbacks_for(1) == (b,)
+    assert dispatcher.unregister(1, b) and dispatcher.callbacks_for(1) == ()
+    assert not dispatcher.unregister(1, b)
+
+def test_task_mode_callbacks_can_wait_on_responses():
+    async def run():
+        client = OlympTradeClient(access_token="test", dispatch_mode="task")
+        answered = []
+        async def on_tick(message):
+            # Waits for a response that only the receive path can deliver
+            future = asyncio.get_running_loop().create_future()
+            client._response_futures[f"u{message['d'][0]['t']}"] = future
+            answered.append(await future)
+        client.register_callback(1, on_tick)
+        for i in range(50):
+            await client.process_raw_message(tick_frame(i))
+        await asyncio.sleep(0) # The callbacks are now all waiting; the receive path is not
+        for i in range(50):
+            await client.process_raw_message(f'[{{"e":90,"t":3,"uuid":"u{i}","d":[]}}]')
+        await asyncio.wait_for(client.flush_callbacks(), 2)
+        await client._dispatcher.stop()
+        return answered
+    assert len(asyncio.run(run())) == 50
+
+def test_callback_stopping_the_dispatcher_ends_its_worker():
+    async def run():
+        client = OlympTradeClient(access_token="test", dispatch_mode="pool", callback_workers=1)
+        async def on_tick(message):
+            await client._dispatcher.stop()
+        client.register_callback(1, on_tick)
+        await client.process_raw_message(tick_frame(1))
+        await asyncio.sleep(0.05)
+        return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    assert asyncio.run(run()) == []
+
+def test_default_pool_callbacks_can_wait_on_responses_with_a_full_queue():
+    async def run():
+        async with FakeOlympTradeServer(FakeServerConfig(access_token=ACCESS_TOKEN, tick_interval=0.005, latency=0.02)) as server:
+            client = OlympTradeClient(access_token=ACCESS_TOKEN, uri=server.uri) # Default dispatch mode
+            client._dispatcher.queue_size = 2 # Ticks fill it while a callback waits for its pong
+            pongs = []
+            async def on_tick(message):
+                pongs.append(await client.send_request(90, {}))
+            client.register_callback(1, on_tick)
+            await client.start()
+            await client.market.subscribe_ticks("EURUSD", "GBPUSD")
+            waited = await wait_until(lambda: len(pongs) >= 20)
+            mode = client._dispatcher.mode
+            await client.stop()
+            return waited, mode
+    waited, mode = asyncio.run(run())
+    assert mode == "pool" and waited
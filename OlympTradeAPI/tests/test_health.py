@@ -0,0 +1,81 @@
+import asyncio
+from olymptrade_ws import OlympTradeClient
+from olymptrade_ws.core.health import ConnectionHealth
+from olymptrade_ws.fakeserver import FakeOlympTradeServer, FakeServerConfig
+from olymptrade_ws.olympconfig import parameters
+from helpers import ACCESS_TOKEN, collect_ticks, wait_until
+
+# Ping RTT health scoring and make-before-break failover of degraded connections
+def test_score_combines_rtt_missed_pongs_and_histogram():
+    health = ConnectionHealth(window=10)
+    health.on_frame()
+    assert health.score == 1.0 # No pongs yet is not a reason to fail over
+    for rtt in (20, 40, 90, 300, 3000):
+        health.record_rtt(rtt)
+    assert health.histogram([50, 500]) == {"50": 2, "500": 2, "+Inf": 1}
+    assert health.percentile(0.5) == 90
+    assert health.degraded # p90 is 3000 ms
+    health.rtts.clear()
+    health.record_rtt(30)
+    assert health.score == 1.0
+    health.record_miss()
+    assert 0 < health.score < 1
+    health.record_miss()
+    assert health.degraded and health.missed == 2
+    health.record_rtt(30) # A pong resets the run of misses
+    assert not health.degraded and health.snapshot()["pongs"] == 7
+
+def test_degraded_connection_is_replaced_without_losing_ticks_or_requests(monkeypatch):
+    monkeypatch.setattr(parameters, "PING_INTERVAL", 0.05)
+    monkeypatch.setattr(parameters, "HEALTH_DRAIN_TIMEOUT", 2)
+
+    async def run():
+        config = FakeServerConfig(access_token=ACCESS_TOKEN, tick_interval=0.02, latency=0.1)
+        async with FakeOlympTradeServer(config) as server:
+            client = OlympTradeClient(access_token=ACCESS_TOKEN, uri=server.uri,
+                                      account_id=config.demo_account_id)
+            ticks = collect_ticks(client.register_callback)
+            await client.start()
+            await client.market.subscribe_ticks("EURUSD")
+            assert await wait_until(lambda: len(ticks) >= 2)
+            old = client.connection
+
+            # A request in flight on the degraded socket is answered there before it closes
+            pending = asyncio.create_task(client.send_request(parameters.E_GET_BALANCE_REQUEST_1, [{"group": "demo"}]))
+            await asyncio.sleep(0.02)
+            old.health.rtts.extend([5000] * 10)
+            assert await wait_until(lambda: client.reconnect_stats.failovers == 1)
+            response = await pending
+            assert await wait_until(lambda: not old.is_connected)
+            before = len(ticks)
+            assert await wait_until(lambda: len(ticks) >= before + 2)
+            assert await wait_until(lambda: client.connection.health.pongs >= 1)
+            health = client.connection_health
+            connections = server.connection_count
+            await client.stop()
+            return server.stats, response, client, old, health, connections
+
+    stats, response, client, old, health, connections = asyncio.run(run())
+    assert client.connection is not old
+    assert connections == 1 # The old socket is closed once drained
+    assert stats["connections"] == 2
+    assert stats["e:12"] == 2 # Ticks re-subscribed on the replacement
+    assert response["d"][0]["account_id"] == 2911220983
+    assert client.reconnect_stats.failed_requests == 0 and client.reconnect_stats.reconnects == 0
+    assert health["primary"]["pongs"] >= 1 and health["primary"]["score"] > 0.5
+
+def test_failover_keeps_the_connection_when_the_replacement_cannot_connect():
+    async def run():
+        config = FakeServerConfig(access_token=ACCESS_TOKEN, tick_interval=3600)
+        async with FakeOlympTradeServer(config) as server:
+            client = OlympTradeClient(access_token=ACCESS_TOKEN, uri=server.uri, failover=False)
+            await client.start()
+            old = client.connection
+            client.uri = "ws://127.0.0.1:1"
+            replaced = await client.replace_connection()
+            alive = client.connection is old and old.is_connected
+            await client.stop()
+            return replaced, alive, client.reconnect_stats.failovers
+
+    replaced, alive, failovers = asyncio.run(run())
+    assert replaced is False and alive and failovers == 0
@@ -0,0 +1,70 @@
+import asyncio
+import json
+from olymptrade_ws.core.ingress import IngressQueue, COALESCE, DROP, KEEP
+
+# Ingress policies when processing falls behind the socket
+def tick(pair: str, price: float) -> str:
+    return json.dumps([{"e": 1, "t": 1, "d": [{"p": pair, "q": price, "t": price}]}])
+
+def trade(trade_id: int) -> str:
+    return json.dumps([{"e": 26, "t": 1, "d": [{"id": trade_id}]}])
+
+POLICIES = {1: COALESCE, 73: DROP, 26: KEEP}
+
+def test_ticks_coalesce_under_pressure():
+    async def run():
+        queue = IngressQueue(capacity=10, coalesce_at=4, policies=POLICIES)
+        for i in range(100):
+            await queue.put(tick("EURUSD" if i % 2 else "GBPUSD", i))
+        items = [await queue.get() for _ in range(5)]
+        return queue, items
+    queue, items = asyncio.run(run())
+    assert queue.max_depth == 4
+    assert sum(queue.coalesced.values()) == 100 - 4 - 2
+    assert [item.messages[0]["d"][0]["q"] for item in items[:4]] == [0, 1, 2, 3]
+    latest = items[-1].messages[0]["d"]
+    assert {item["p"]: item["q"] for item in latest} == {"GBPUSD": 98, "EURUSD": 99}
+    assert queue.stats()["depth"] == 0
+
+def test_trades_and_responses_are_never_dropped():
+    async def run():
+        queue = IngressQueue(capacity=3, coalesce_at=2, policies=POLICIES)
+        for i in range(3):
+            await queue.put(trade(i))
+        # Full: a trade must wait for room, a droppable event is discarded
+        await queue.put(json.dumps([{"e": 73, "t": 1, "d": {}}]))
+        blocked = asyncio.create_task(queue.put(trade(3)))
+        response = asyncio.create_task(queue.put(json.dumps([{"e": 1, "t": 3, "uuid": "ABCD-ef", "d": []}])))
+        await asyncio.sleep(0.05)
+        assert not blocked.done()
+        received = []
+        while len(received) < 5:
+            received.extend((await queue.get()).messages)
+        await blocked
+        await response
+        return queue, received
+    queue, received = asyncio.run(run())
+    assert [m["d"][0]["id"] for m in received if m["e"] == 26] == [0, 1, 2, 3]
+    assert any(m.get("uuid") == "ABCD-ef" for m in received)
+    assert queue.dropped == {73: 1}
+    assert queue.blocked_puts >= 1
+
+def test_coalesced_ticks_are_not_held_back_by_steady_traffic():
+    async def run():
+        queue = IngressQueue(capacity=100, coalesce_at=2, policies=POLICIES, max_hold=0.05)
+        await queue.put(trade(0))
+        await queue.put(trade(1))
+        ticks = []
+        # One trade in, one frame out: the queue never empties, so only max_hold lets ticks through
+        for i in range(2, 20):
+            await queue.put(tick("EURUSD", i))
+            await queue.put(trade(i))
+            item = await queue.get()
+            ticks.extend(m["d"][0]["q"] for m in item.messages if m["e"] == 1)
+            await asyncio.sleep(0.01)
+        return queue, ticks
+    queue, ticks = asyncio.run(run())
+    assert queue.depth > 0
+    assert len(ticks) >= 2
+    assert ticks == sorted(ticks) and sum(queue.coalesced.values()) > 0
+    assert queue.max_lag < 0.5
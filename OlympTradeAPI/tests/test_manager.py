@@ -0,0 +1,95 @@
+import asyncio
+from olymptrade_ws import AccountManager
+from olymptrade_ws.fakeserver import FakeOlympTradeServer, FakeServerConfig
+from olymptrade_ws.olympconfig import parameters
+from helpers import collect_ticks, wait_until
+
+# Many accounts on one loop: per-account tokens, shared ticks, account pushes routed to their owner
+TOKENS = {"alice": "token-alice", "bob": "token-bob"}
+
+def test_ticks_are_shared_and_trade_pushes_reach_their_owner():
+    async def run():
+        config = FakeServerConfig(access_token=set(TOKENS.values()), tick_interval=0.02)
+        async with FakeOlympTradeServer(config) as server:
+            manager = AccountManager(uri=server.uri)
+            for key, token in TOKENS.items():
+                manager.add_account(key, token)
+            ticks, trades = [], []
+            async def on_tick(message):
+                ticks.extend(message["d"])
+            async def on_trade(key, message):
+                trades.append(key)
+            manager.register_market_callback(parameters.E_TICK_UPDATE, on_tick)
+            manager.register_callback(parameters.E_TRADE_ACCEPTED, on_trade)
+            failures = await manager.start()
+
+            # Both accounts want EURUSD: one subscription, one stream
+            await manager.subscribe_ticks("EURUSD")
+            await manager.subscribe_ticks("EURUSD", "GBPUSD")
+            assert await wait_until(lambda: {"EURUSD", "GBPUSD"} <= {tick["p"] for tick in ticks})
+            bob = manager["bob"]
+            handle = await bob.trade.place_order("EURUSD", 1, "up", 60, bob.account_id, "demo")
+            await asyncio.wait_for(handle.accepted(), 2)
+            assert await wait_until(lambda: trades)
+            await manager.unsubscribe_ticks("EURUSD")
+            refs = manager.tick_pairs
+            stats = manager.stats()
+            await manager.stop()
+            return failures, server.stats, trades, refs, stats
+
+    failures, server_stats, trades, refs, stats = asyncio.run(run())
+    assert failures == {}
+    assert server_stats["connections"] == 2
+    assert server_stats["e:12"] == 2 # EURUSD, then GBPUSD: never twice for one pair
+    assert server_stats["e:13"] == 0 # EURUSD still has a subscriber
+    assert trades == ["bob"]
+    assert refs == {"EURUSD": 1, "GBPUSD": 1}
+    assert stats["alice"]["feed"] and not stats["bob"]["feed"]
+
+def test_tokens_come_from_the_provider_and_are_refreshed_when_refused():
+    store = {"alice": "token-alice", "bob": "expired-bob"}
+    asked = []
+
+    async def provider(key, refresh):
+        asked.append((key, refresh))
+        if refresh and key == "bob":
+            store[key] = "token-bob"
+        return store[key]
+
+    async def run():
+        config = FakeServerConfig(access_token=set(TOKENS.values()), tick_interval=3600)
+        async with FakeOlympTradeServer(config) as server:
+            manager = AccountManager(uri=server.uri, token_provider=provider)
+            manager.add_account("alice")
+            manager.add_account("bob")
+            failures = await manager.start()
+            running = {key: client.is_running for key, client in manager.clients.items()}
+            await manager.stop()
+            return failures, running, server.stats
+
+    failures, running, server_stats = asyncio.run(run())
+    assert failures == {} and running == {"alice": True, "bob": True}
+    assert sorted(asked) == [("alice", False), ("bob", False), ("bob", True)]
+    assert server_stats["rejected_handshakes"] == 1
+
+def test_removing_the_feed_account_moves_the_ticks():
+    async def run():
+        config = FakeServerConfig(access_token=set(TOKENS.values()), tick_interval=0.02)
+        async with FakeOlympTradeServer(config) as server:
+            manager = AccountManager(uri=server.uri, market_account="alice")
+            for key, token in TOKENS.items():
+                manager.add_account(key, token)
+            ticks = collect_ticks(manager.register_market_callback)
+            await manager.start()
+            await manager.subscribe_ticks("EURUSD")
+            assert await wait_until(lambda: len(ticks) >= 2)
+            await manager.remove_account("alice")
+            before = len(ticks)
+            assert await wait_until(lambda: len(ticks) >= before + 2)
+            feed = manager.feed_account
+            await manager.stop()
+            return feed, server.stats
+
+    feed, server_stats = asyncio.run(run())
+    assert feed == "bob"
+    assert server_stats["e:12"] == 2 # Once per feed
@@ -0,0 +1,69 @@
+import asyncio
+import json
+from olymptrade_ws import OlympTradeClient
+from olymptrade_ws.core.outbox import FrameBatcher
+from olymptrade_ws.fakeserver import FakeOlympTradeServer, FakeServerConfig
+
+# Outgoing micro-batching: merged frames, caps, ordering and uuid correlation
+def message(i: int) -> str:
+    return json.dumps([{"t": 2, "e": 90, "d": {"i": i}}])
+
+def test_same_tick_sends_share_a_frame():
+    async def run():
+        written = []
+        async def write(frame):
+            written.append(frame)
+        batcher = FrameBatcher(write, window=0, max_bytes=10_000, max_messages=4)
+        await asyncio.gather(*(batcher.submit(message(i)) for i in range(10)))
+        await batcher.submit("not-a-list")
+        return written, batcher.stats()
+
+    written, stats = asyncio.run(run())
+    frames = [json.loads(frame) for frame in written[:-1]]
+    assert [len(frame) for frame in frames] == [4, 4, 2]
+    assert [m["d"]["i"] for frame in frames for m in frame] == list(range(10)) # Order kept
+    assert written[-1] == "not-a-list"
+    assert stats["messages"] == 11 and stats["frames"] == 4 and stats["largest_batch"] == 4
+
+def test_window_and_size_cap():
+    async def run():
+        written = []
+        async def write(frame):
+            written.append(frame)
+        batcher = FrameBatcher(write, window=0.02, max_bytes=len(message(0)) * 2 + 1, max_messages=50)
+        async def later(i):
+            await asyncio.sleep(0.005)
+            await batcher.submit(message(i))
+        await asyncio.gather(batcher.submit(message(0)), later(1), later(2))
+        return written
+
+    written = asyncio.run(run())
+    assert [len(json.loads(frame)) for frame in written] == [2, 1] # Same window, split by the byte cap
+
+def test_write_errors_reach_every_sender():
+    async def run():
+        async def write(frame):
+            raise ConnectionError("closed")
+        batcher = FrameBatcher(write, window=0)
+        return await asyncio.gather(*(batcher.submit(message(i)) for i in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+def test_batched_requests_keep_uuid_correlation():
+    async def run():
+        async with FakeOlympTradeServer(FakeServerConfig(access_token="test", tick_interval=3600, jitter=0.05)) as server:
+            client = OlympTradeClient(access_token="test", uri=server.uri, batch_sends=True)
+            await client.start()
+            frames_before = server.stats["frames_received"]
+            pairs = [f"PAIR{i}" for i in range(20)]
+            responses = await asyncio.gather(*(client.send_request(10, [{"pair": pair, "size": 60, "count": 1}])
+                                               for pair in pairs))
+            frames = server.stats["frames_received"] - frames_before
+            await client.stop()
+            return pairs, responses, frames, client.send_stats
+
+    pairs, responses, frames, stats = asyncio.run(run())
+    assert frames == 1
+    assert [response["d"][0]["p"] for response in responses] == pairs
+    assert stats["largest_batch"] >= 20
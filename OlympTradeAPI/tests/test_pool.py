@@ -0,0 +1,66 @@
+import asyncio
+from olymptrade_ws import OlympTradeClient
+from olymptrade_ws.fakeserver import FakeOlympTradeServer, FakeServerConfig
+from olymptrade_ws.olympconfig import parameters
+from helpers import ACCESS_TOKEN, collect_ticks, wait_until
+
+# Pool mode: primary + trade connection + tick shards behind one client API
+PAIRS = ["EURUSD", "GBPUSD", "USDJPY", "AUDUSD", "LATAM_X", "ASIA_X"]
+
+def test_pairs_are_sharded_and_orders_use_the_trade_connection():
+    async def run():
+        config = FakeServerConfig(access_token=ACCESS_TOKEN, tick_interval=0.02)
+        async with FakeOlympTradeServer(config) as server:
+            client = OlympTradeClient(access_token=ACCESS_TOKEN, uri=server.uri, connections=4,
+                                      account_id=config.demo_account_id, batch_sends=True)
+            seen = set()
+            async def on_tick(message):
+                seen.update(tick["p"] for tick in message["d"])
+            client.register_callback(1, on_tick)
+            await client.start()
+            connections = server.connection_count
+            await client.market.subscribe_ticks(*PAIRS)
+            assert await wait_until(lambda: seen == set(PAIRS))
+            handle = await client.trade.place_order("EURUSD", 1, "up", 1, client.account_id, "demo")
+            accepted = await asyncio.wait_for(handle.accepted(), 2)
+            shards = {client.pool.for_pair(pair).name for pair in PAIRS}
+            stats = client.pool_stats
+            await client.stop()
+            return connections, server.stats, shards, stats, accepted
+
+    connections, server_stats, shards, stats, accepted = asyncio.run(run())
+    assert connections == 4
+    assert shards == {"ticks-0", "ticks-1"}
+    assert server_stats["e:12"] == 2 and server_stats["e:280"] == 2 # One per shard
+    assert stats["trade"]["messages"] == 1 # The order, nothing else
+    assert stats["ticks-0"]["messages"] == stats["ticks-1"]["messages"] == 2 # e:12 + e:280
+    assert accepted["status"] == "open"
+
+def test_a_lost_shard_reconnects_alone(monkeypatch):
+    monkeypatch.setattr(parameters, "RECONNECT_INITIAL_DELAY", 0.05)
+
+    async def run():
+        config = FakeServerConfig(access_token=ACCESS_TOKEN, tick_interval=0.02, latency=0.2)
+        async with FakeOlympTradeServer(config) as server:
+            client = OlympTradeClient(access_token=ACCESS_TOKEN, uri=server.uri, connections=3)
+            ticks = collect_ticks(client.register_callback)
+            await client.start()
+            await client.market.subscribe_ticks("EURUSD")
+            assert await wait_until(lambda: len(ticks) >= 2)
+
+            # A request in flight on the primary connection is not affected by the tick shard dropping
+            pending = asyncio.create_task(client.send_request(parameters.E_GET_BALANCE_REQUEST_1, [{"group": "demo"}]))
+            await asyncio.sleep(0.05)
+            client.pool.for_pair("EURUSD").websocket.transport.abort()
+            assert await wait_until(lambda: client.reconnect_stats.reconnects == 1)
+            before = len(ticks)
+            assert await wait_until(lambda: len(ticks) >= before + 2)
+            response = await pending
+            await client.stop()
+            return server.stats, response, client.reconnect_stats
+
+    stats, response, recovery = asyncio.run(run())
+    assert stats["connections"] == 4 # 3 + the shard's reconnect
+    assert stats["e:12"] == 2 and stats["e:98"] == 0
+    assert response["d"][0]["account_id"] == 2911220983
+    assert recovery.failed_requests == 0
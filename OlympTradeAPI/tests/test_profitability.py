@@ -0,0 +1,41 @@
+import asyncio
+from olymptrade_ws import OlympTradeClient
+from olymptrade_ws.core.profitability import _payout_items
+from olymptrade_ws.fakeserver import FakeOlympTradeServer, FakeServerConfig
+from helpers import ACCESS_TOKEN
+
+# Payout cache: one e:182 seed, e:183 updates, sorted view and change callbacks
+ACCOUNT_ID = 2911220983
+
+def test_payload_spellings():
+    assert _payout_items([{"p": "EURUSD", "payout": 82}, {"pair": "GBPUSD", "profitability": {"digital": 80}}]) == \
+        [(None, "EURUSD", 82.0), (None, "GBPUSD", 80.0)]
+    assert _payout_items({"USDJPY": 78}) == [(None, "USDJPY", 78.0)]
+    assert _payout_items([{"pair": "X", "account_id": 1, "profitability": None}, "junk"]) == [(1, "X", None)]
+
+def test_seed_once_then_pushes_keep_it_current():
+    async def run():
+        async with FakeOlympTradeServer(FakeServerConfig(access_token=ACCESS_TOKEN, tick_interval=3600)) as server:
+            client = OlympTradeClient(access_token=ACCESS_TOKEN, uri=server.uri, account_id=ACCOUNT_ID)
+            await client.start()
+            changes = []
+            client.profitability.on_change(lambda *change: changes.append(change))
+            # Concurrent callers share one e:182
+            tables = await asyncio.gather(*(client.profitability.ensure() for _ in range(5)))
+            await client.profitability.ensure()
+            seeded_best = client.profitability.best(2)
+
+            await server.set_payout("GBPUSD", 90)
+            await server.set_payout("LATAM_X", None)
+            await client.wait_for(183, lambda message: message["d"][0]["pair"] == "LATAM_X", timeout=2)
+            await client.stop()
+            return server.stats, tables, seeded_best, client.profitability, changes
+
+    stats, tables, seeded_best, cache, changes = asyncio.run(run())
+    assert stats["e:182"] == 1
+    assert all(table == tables[0] for table in tables) and tables[0]["EURUSD"] == 82
+    assert seeded_best == [("LATAM_X", 85.0), ("ASIA_X", 84.0)]
+    assert cache.best(2) == [("GBPUSD", 90.0), ("ASIA_X", 84.0)]
+    assert cache.best(min_payout=80, pairs=["EURUSD", "USDJPY", "GBPUSD"]) == [("GBPUSD", 90.0), ("EURUSD", 82.0)]
+    assert cache.payout("LATAM_X") is None and cache.best_pair() == "GBPUSD"
+    assert changes[-2:] == [(ACCOUNT_ID, "GBPUSD", 80.0, 90.0), (ACCOUNT_ID, "LATAM_X", 85.0, None)]
@@ -0,0 +1,30 @@
+import glob
+import os
+from olymptrade_ws.capture import iter_logbook
+from olymptrade_ws.core.rawlog import RawLogWriter
+
+# The raw logbook writer runs in a thread; close() flushes everything queued
+def frame(i: int) -> str:
+    return f'[{{"e":1,"t":1,"d":[{{"p":"EURUSD","q":1.1,"t":{i}}}]}}]'
+
+def test_batches_rotate_and_compress(tmp_path):
+    path = str(tmp_path / "logs" / "message_logbook.md")
+    writer = RawLogWriter(path, max_bytes=4096, compress=True, queue_size=100000)
+    for i in range(500):
+        writer.write("📥 RECEIVED", frame(i))
+    writer.close()
+
+    rotated = sorted(glob.glob(str(tmp_path / "logs" / "message_logbook.*.md.gz")))
+    assert writer.written == 500 and writer.dropped == 0
+    assert writer.rotations == len(rotated) > 0
+    frames = [f for rotated_file in rotated for f in iter_logbook(rotated_file)]
+    if os.path.exists(path):
+        frames += list(iter_logbook(path))
+    assert len(frames) == 500
+
+def test_drops_instead_of_blocking(tmp_path):
+    writer = RawLogWriter(str(tmp_path / "logbook.md"), queue_size=10)
+    for i in range(5000):
+        writer.write("📤 SENT", frame(i))
+    writer.close()
+    assert writer.written + writer.dropped == 5000
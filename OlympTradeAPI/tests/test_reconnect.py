@@ -0,0 +1,70 @@
+import asyncio
+from olymptrade_ws import OlympTradeClient
+from olymptrade_ws.core.reconnect import Backoff
+from olymptrade_ws.fakeserver import FakeOlympTradeServer, FakeServerConfig
+from olymptrade_ws.olympconfig import parameters
+from helpers import ACCESS_TOKEN, collect_ticks, wait_until
+
+# Network blips against the local fake server: the client should recover on its own
+def test_backoff_grows_and_caps():
+    backoff = Backoff(initial=1, maximum=5, factor=2, jitter=0)
+    assert [backoff.next_delay() for _ in range(5)] == [1, 2, 4, 5, 5]
+    backoff.reset()
+    assert backoff.next_delay() == 1
+    assert all(0.5 <= Backoff(initial=1, jitter=0.5).next_delay() <= 1 for _ in range(20))
+
+def test_reconnect_restores_subscriptions(monkeypatch):
+    monkeypatch.setattr(parameters, "RECONNECT_INITIAL_DELAY", 0.05)
+
+    async def run():
+        config = FakeServerConfig(access_token=ACCESS_TOKEN, tick_interval=0.02)
+        async with FakeOlympTradeServer(config) as server:
+            client = OlympTradeClient(access_token=ACCESS_TOKEN, uri=server.uri)
+            ticks = collect_ticks(client.register_callback)
+            await client.start()
+            await client.balance.subscribe_balance_updates()
+            await client.market.subscribe_ticks("EURUSD")
+            assert await wait_until(lambda: len(ticks) >= 2)
+
+            # Reject the first attempts so the backoff path runs too
+            config.access_token = "rotated"
+            await server.drop_connections()
+            assert await wait_until(lambda: client.reconnect_stats.failed_attempts >= 1)
+            config.access_token = ACCESS_TOKEN
+
+            before = len(ticks)
+            assert await wait_until(lambda: len(ticks) >= before + 2)
+            await client.stop()
+            return server.stats, client.reconnect_stats
+
+    stats, recovery = asyncio.run(run())
+    assert stats["connections"] == 2
+    assert stats["e:12"] == 2 and stats["e:98"] == 2
+    assert recovery.disconnects == 1 and recovery.reconnects == 1
+    assert recovery.last_time_to_recover > 0
+    assert recovery.last_message_gap >= recovery.last_time_to_recover
+
+def test_idempotent_requests_are_replayed(monkeypatch):
+    monkeypatch.setattr(parameters, "RECONNECT_INITIAL_DELAY", 0.05)
+
+    async def run():
+        async with FakeOlympTradeServer(FakeServerConfig(latency=0.3)) as server:
+            client = OlympTradeClient(access_token=ACCESS_TOKEN, uri=server.uri)
+            await client.start()
+            ping = asyncio.create_task(client.send_request(90, {}))
+            order = asyncio.create_task(client.send_request(23, [{"pair": "EURUSD", "amount": 1}]))
+            await asyncio.sleep(0.1)
+            await server.drop_connections()
+            pong = await ping
+            try:
+                await order
+                order_error = None
+            except ConnectionError as e:
+                order_error = e
+            await client.stop()
+            return pong, order_error, client.reconnect_stats
+
+    pong, order_error, recovery = asyncio.run(run())
+    assert "ts" in pong
+    assert isinstance(order_error, ConnectionError)
+    assert recovery.replayed_requests == 1 and recovery.failed_requests == 1
@@ -0,0 +1,49 @@
+import asyncio
+from olymptrade_ws import OlympTradeClient
+from olymptrade_ws.fakeserver import FakeOlympTradeServer, FakeServerConfig
+
+# client.state: open trades and balances mirrored from pushes
+def test_mirror_follows_trade_and_balance_pushes():
+    async def run():
+        client = OlympTradeClient(access_token="test", dispatch_mode="inline")
+        await client.process_raw_message('[{"e":22,"t":1,"d":[{"id":1,"pair":"EURUSD","amount":5,"dir":"up","status":"open"},'
+                                         '{"id":2,"pair":"EURUSD","amount":3,"dir":"down","status":"open"}]}]')
+        await client.process_raw_message('[{"e":21,"t":1,"d":[{"id":2,"interim_status":"win"}]}]')
+        exposure, net = client.state.exposure("EURUSD"), client.state.exposure("EURUSD", net=True)
+        await client.process_raw_message('[{"e":26,"t":1,"d":[{"id":1,"status":"win"}]}]')
+        await client.process_raw_message('[{"e":55,"t":1,"d":[{"account_id":7,"group":"demo","amount":100},'
+                                         '{"account_id":8,"group":"real","amount":0}]}]')
+        return client.state, exposure, net
+
+    state, exposure, net = asyncio.run(run())
+    assert (exposure, net) == (8.0, 2.0)
+    assert [t["id"] for t in state.open_trades()] == [2] and state.trade(2)["interim_status"] == "win"
+    assert state.exposure("EURUSD") == 3.0 and state.closed == 1
+    assert state.amount(7, "demo") == 100 and state.balance(group="real")["account_id"] == 8
+
+def test_resync_on_connect_loads_open_trades():
+    async def run():
+        config = FakeServerConfig(access_token="test", tick_interval=3600)
+        async with FakeOlympTradeServer(config) as server:
+            trader = OlympTradeClient(access_token="test", uri=server.uri)
+            await trader.start()
+            await trader.balance.get_balance()
+            handle = await trader.trade.place_order("EURUSD", 4, "up", 30, account_id=trader.account_id)
+            await handle.accepted(timeout=2)
+            local = trader.state.open_trades("EURUSD")
+
+            # A second session for the same account learns about the trade from the resync
+            observer = OlympTradeClient(access_token="test", uri=server.uri,
+                                        account_id=trader.account_id, account_group=trader.account_group)
+            await observer.start()
+            await observer.state._resync_task
+            mirrored = observer.state.open_trades()
+            balance = observer.balance.get_account_balance()
+            await observer.stop()
+            await trader.stop()
+            return handle, local, mirrored, balance, server.stats
+
+    handle, local, mirrored, balance, stats = asyncio.run(run())
+    assert [t["id"] for t in local] == [handle.id]
+    assert [t["id"] for t in mirrored] == [handle.id] and mirrored[0]["amount"] == 4
+    assert balance["group"] == "demo" and stats["e:31"] == 2
@@ -0,0 +1,48 @@
+import asyncio
+from olymptrade_ws import OlympTradeClient
+from olymptrade_ws.fakeserver import FakeOlympTradeServer, FakeServerConfig
+from helpers import ACCESS_TOKEN
+
+# Reference-counted subscriptions against the local fake server
+
+def test_tick_subscriptions_are_reference_counted():
+    async def run():
+        async with FakeOlympTradeServer(FakeServerConfig(access_token=ACCESS_TOKEN, tick_interval=3600)) as server:
+            client = OlympTradeClient(access_token=ACCESS_TOKEN, uri=server.uri)
+            await client.start()
+            # Two concurrent subscribers for EURUSD and one more for GBPUSD: one e:12 and one e:280
+            await asyncio.gather(client.market.subscribe_ticks("EURUSD", "GBPUSD"),
+                                 client.market.subscribe_ticks("EURUSD"))
+            sent_after_subscribe = dict(server.stats)
+            live = client.subscriptions.tick_pairs
+
+            await client.market.unsubscribe_ticks("EURUSD", "GBPUSD") # EURUSD still held once
+            sent_after_first_release = server.stats["e:13"]
+            await client.market.unsubscribe_ticks("EURUSD")
+            await client.stop()
+            return sent_after_subscribe, live, sent_after_first_release, server.stats, client.subscriptions.tick_pairs
+
+    subscribed, live, first_release, stats, remaining = asyncio.run(run())
+    assert subscribed["e:12"] == 1 and subscribed["e:280"] == 1
+    assert live == {"EURUSD": 2, "GBPUSD": 1}
+    assert first_release == 1 # GBPUSD released, EURUSD kept
+    assert stats["e:13"] == 2 and stats["e:281"] == 2
+    assert remaining == {}
+
+def test_event_groups_are_sent_once():
+    async def run():
+        async with FakeOlympTradeServer(FakeServerConfig(access_token=ACCESS_TOKEN, tick_interval=3600)) as server:
+            client = OlympTradeClient(access_token=ACCESS_TOKEN, uri=server.uri)
+            await client.start()
+            await client.balance.subscribe_balance_updates()
+            await client.balance.subscribe_balance_updates()
+            await asyncio.sleep(0.05)
+            snapshot = client.subscriptions.snapshot()
+            client.subscriptions.unsubscribe_events([[55]])
+            await client.stop()
+            return server.stats, snapshot, client.subscriptions.event_groups
+
+    stats, snapshot, groups = asyncio.run(run())
+    assert stats["e:98"] == 1
+    assert snapshot["event_groups"] == [[[55]]]
+    assert groups == [[[55]]] # Still held by the second subscriber
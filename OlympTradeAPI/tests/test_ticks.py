@@ -0,0 +1,41 @@
+import asyncio
+import numpy as np
+from olymptrade_ws import OlympTradeClient, TickStore
+from olymptrade_ws.data import TickRing
+
+# Tick rings: mirrored buffers, so the latest ticks are always one contiguous view
+def test_ring_wraps_and_returns_latest_in_order():
+    ring = TickRing(4)
+    for i in range(10):
+        ring.append(float(i), 100.0 + i)
+    times, prices = ring.last()
+    assert list(times) == [6, 7, 8, 9] and list(prices) == [106, 107, 108, 109]
+    assert list(ring.last(2)[0]) == [8, 9]
+    assert ring.latest == (9.0, 109.0)
+    assert len(ring) == 4 and ring.total == 10 and ring.nbytes == 4 * 32
+
+def test_views_are_zero_copy_and_windows():
+    ring = TickRing(8)
+    for i in range(5):
+        ring.append(float(i), float(i))
+    times, _ = ring.last()
+    assert isinstance(times, np.ndarray) and not times.flags.owndata
+    window_times, window_prices = ring.window(1.0, 3.0)
+    assert list(window_times) == [1, 2] and list(window_prices) == [1, 2]
+    assert list(ring.window(3.5)[0]) == [4]
+    copied, _ = ring.last(copy=True)
+    assert copied.flags.owndata
+
+def test_store_fills_from_tick_messages():
+    store = TickStore(capacity=100)
+    async def run():
+        client = OlympTradeClient(access_token="test", dispatch_mode="inline")
+        store.attach(client)
+        await client.process_raw_message('[{"e":1,"t":1,"d":[{"p":"EURUSD","q":1.1,"t":1},{"p":"GBPUSD","q":1.3,"t":1}]}]')
+        await client.process_raw_message('[{"e":1,"t":1,"d":[{"p":"EURUSD","q":1.2,"t":2}]}]')
+    asyncio.run(run())
+    assert store.latest("EURUSD") == (2.0, 1.2)
+    assert list(store.last("EURUSD")[1]) == [1.1, 1.2]
+    assert len(store.last("USDJPY")[0]) == 0 and "USDJPY" not in store
+    usage = store.memory_usage()
+    assert usage["GBPUSD"] == {"bytes": 3200, "ticks": 1, "total": 1}
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import time
+from decimal import Decimal
+import numpy as np
+import pytest
+from olymptrade_ws import OlympTradeClient
+from olymptrade_ws.api.trade import OrderTemplate, TradeHandle
+from olymptrade_ws.fakeserver import FakeOlympTradeServer, FakeServerConfig
+
+# place_order handles resolved from dispatch, with per-stage timings
+def test_concurrent_orders_resolve_their_own_handles():
+    async def run():
+        config = FakeServerConfig(access_token="test", tick_interval=3600, latency=0.02, trade_win_probability=1.0)
+        async with FakeOlympTradeServer(config) as server:
+            client = OlympTradeClient(access_token="test", uri=server.uri)
+            await client.start()
+            account_id = config.demo_account_id
+            handles = await asyncio.gather(*(client.trade.place_order(pair, 5, "up", 1, account_id=account_id)
+                                             for pair in ("EURUSD", "GBPUSD", "USDJPY")))
+            accepted = [await handle.accepted(timeout=2) for handle in handles]
+            results = [await handle for handle in handles]
+            summary = client.trade.latency_summary()
+            open_after = client.trade.open_handles
+            await client.stop()
+            return handles, accepted, results, summary, open_after
+
+    handles, accepted, results, summary, open_after = asyncio.run(run())
+    assert len({handle.id for handle in handles}) == 3
+    assert [a["status"] for a in accepted] == ["open"] * 3
+    assert [r["pair"] for r in results] == ["EURUSD", "GBPUSD", "USDJPY"]
+    assert all(r["status"] == "win" and handle["status"] == "win" for r, handle in zip(results, handles))
+    for handle in handles:
+        timings = handle.timings
+        assert timings["ack"] >= 20 and timings["accept"] is not None and timings["close"] is not None
+    assert summary["ack"]["count"] == 3 and open_after == []
+
+def test_push_before_ack_is_applied_to_the_handle():
+    async def run():
+        client = OlympTradeClient(access_token="test", dispatch_mode="inline")
+        await client.process_raw_message('[{"e":22,"t":1,"d":[{"id":7,"status":"open"}]}]')
+        now = time.perf_counter()
+        handle = client.trade._track(TradeHandle({"id": 7, "status": "wait"}, now, now))
+        accepted = await handle.accepted(timeout=1)
+        await client.process_raw_message('[{"e":26,"t":1,"d":[{"id":7,"status":"loose","balance_change":-5}]}]')
+        return accepted, await handle.closed(timeout=1)
+
+    accepted, result = asyncio.run(run())
+    assert accepted["status"] == "open" and result["balance_change"] == -5
+
+def test_order_template_matches_the_dict_payload():
+    template = OrderTemplate("EURUSD", 60, 123, "demo")
+    frame = json.loads(template.render("abc", 2.5, "down", 1_700_000_000_000))
+    assert frame == [{"t": 2, "e": 23, "uuid": "abc", "d": [template.order(2.5, "down", 1_700_000_000_000)]}]
+    assert frame[0]["d"][0]["pair"] == "EURUSD" and frame[0]["d"][0]["is_flex"] is False
+
+def test_order_template_renders_numpy_amounts_as_json_numbers():
+    template = OrderTemplate("EURUSD", 60, 123, "demo")
+    for amount, expected in ((np.float64(1.5), 1.5), (np.float32(2.5), 2.5), (np.int64(3), 3),
+                             (Decimal("1.25"), 1.25), ("10", 10.0), ("2.5", 2.5)):
+        frame = json.loads(template.render("abc", amount, "up", 1_700_000_000_000))
+        sent = frame[0]["d"][0]["amount"]
+        assert sent == expected and type(sent) is type(expected)
+    for amount, error in ((True, TypeError), (None, TypeError), ("ten", ValueError), (float("nan"), ValueError)):
+        with pytest.raises(error):
+            template.render("abc", amount, "up", 0)
+
+def test_invalid_amounts_raise_before_anything_is_sent():
+    async def run():
+        client = OlympTradeClient(access_token="test") # Not connected: a send would fail differently
+        with pytest.raises(TypeError):
+            await client.trade.place_order("EURUSD", None, "up", 60, 123)
+        with pytest.raises(ValueError):
+            await client.trade.place_orders([{"pair": "EURUSD", "amount": 1, "direction": "up"},
+                                             {"pair": "GBPUSD", "amount": "inf", "direction": "up"}], account_id=123)
+    asyncio.run(run())
+
+def test_place_orders_sends_one_frame():
+    async def run():
+        config = FakeServerConfig(access_token="test", tick_interval=3600, latency=0.05)
+        async with FakeOlympTradeServer(config) as server:
+            client = OlympTradeClient(access_token="test", uri=server.uri, batch_sends=True)
+            await client.start()
+            frames_before = server.stats["frames_received"]
+            pairs = ["EURUSD", "GBPUSD", "USDJPY", "AUDUSD", "ASIA_X"]
+            started = time.perf_counter()
+            handles = await client.trade.place_orders(
+                [{"pair": pair, "amount": 1 + i, "direction": "up" if i % 2 else "down"} for i, pair in enumerate(pairs)]
+                + [{"pair": "EURUSD", "amount": 1, "direction": "sideways"}],
+                duration=60, account_id=config.demo_account_id)
+            elapsed = time.perf_counter() - started
+            frames = server.stats["frames_received"] - frames_before
+            await client.stop()
+            return pairs, handles, elapsed, frames
+
+    pairs, handles, elapsed, frames = asyncio.run(run())
+    assert [handle["pair"] for handle in handles[:-1]] == pairs and handles[-1] is None
+    assert [handle["amount"] for handle in handles[:-1]] == [1, 2, 3, 4, 5]
+    assert frames == 1 and elapsed < 2 * 0.05 # Concurrent, not five round trips
+    assert all(handle.timings["ack"] >= 50 for handle in handles[:-1])
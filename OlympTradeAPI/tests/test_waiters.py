@@ -0,0 +1,44 @@
+import asyncio
+import time
+from olymptrade_ws import OlympTradeClient
+from olymptrade_ws.fakeserver import FakeOlympTradeServer, FakeServerConfig
+
+# client.wait_for: one-shot waiters resolved as the frame is dispatched
+def test_wait_for_matches_predicate_and_cleans_up():
+    async def run():
+        client = OlympTradeClient(access_token="test", dispatch_mode="inline")
+        waiter = asyncio.create_task(client.wait_for(80, lambda m: m["d"][0]["p"] == "GBPUSD", timeout=1))
+        await asyncio.sleep(0)
+        await client.process_raw_message('[{"e":80,"t":1,"d":[{"p":"EURUSD"}]}]')
+        await client.process_raw_message('[{"e":80,"t":1,"d":[{"p":"GBPUSD","payout":80}]}]')
+        message = await waiter
+        try:
+            await client.wait_for(80, timeout=0.05)
+            timed_out = False
+        except asyncio.TimeoutError:
+            timed_out = True
+        await asyncio.sleep(0)
+        return message, timed_out, dict(client._waiters)
+
+    message, timed_out, waiters = asyncio.run(run())
+    assert message["d"][0]["payout"] == 80
+    assert timed_out and waiters == {}
+
+def test_balance_asset_and_trade_waits():
+    async def run():
+        async with FakeOlympTradeServer(FakeServerConfig(access_token="test", tick_interval=3600, trade_win_probability=1.0)) as server:
+            client = OlympTradeClient(access_token="test", uri=server.uri)
+            await client.start()
+            started = time.perf_counter()
+            balance = await client.balance.get_balance()
+            balance_wait = time.perf_counter() - started
+            strikes = await client.market.select_asset("EURUSD")
+            trade = await client.trade.place_order("EURUSD", 10, "up", 1, account_id=balance["d"][0]["account_id"])
+            result = await client.trade.wait_for_result(trade)
+            await client.stop()
+            return balance, balance_wait, strikes, trade, result
+
+    balance, balance_wait, strikes, trade, result = asyncio.run(run())
+    assert balance["d"] and balance_wait < 0.5 # No 0.5 s polling step
+    assert strikes["p"] == "EURUSD" and strikes["payout"] == 82
+    assert result["id"] == trade["id"] and result["status"] == "win"
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from fastapi.responses import StreamingResponse
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from fastapi.responses import StreamingResponse, JSONResponse
+from typing import Dict, List, Optional
 from datetime import datetime, timezone
+from time import perf_counter
 import logging
+import secrets
+import threading
 import io
 import csv
 
@@ -12,12 +15,18 @@ from app.models import (
 from app.services.simple_olymptrade_client import SimpleOlympTradeClient, get_simple_client
 from app.services.redis_cache import redis_cache
 from app.services.token_service import get_token_service
+from app.services.metrics import observe_stage, observe_request, record_cache_result
 from app.config import config
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/ea", tags=["Expert Advisor"])
 
+ADMIN_HEADER = "X-Fluxia-Admin"
+
+# Single flight for payout cache misses: one upstream e:182 at a time, the rest re-read the cache
+_payouts_lock = threading.Lock()
+
 @router.get("/candlesticks")
 async def get_candlesticks(
     currency_pair: str = Query(..., description="Currency pair (e.g., EURUSD_OTC)"),
@@ -31,18 +40,20 @@ async def get_candlesticks(
     - For EA requests with time: Returns only the searched result
     - For regular requests: Returns default amount of candles
     """
+    request_start = perf_counter()
+    # Check if this is an EA request (has time parameter)
+    is_ea_request = time is not None
+
+    # Determine count based on request type
+    if download:
+        request_type = "file_download"
+    elif is_ea_request:
+        request_type = "ea_request"
+    else:
+        request_type = "regular_request"
+
+    outcome = "server_error"
     try:
-        # Check if this is an EA request (has time parameter)
-        is_ea_request = time is not None
-        
-        # Determine count based on request type
-        if download:
-            request_type = "file_download"
-        elif is_ea_request:
-            request_type = "ea_request"
-        else:
-            request_type = "regular_request"
-            
         logger.info(f"Fetching candles: {currency_pair}, type={request_type}, time={time}, download={download}, EA_request={is_ea_request}")
         
         # Parse specific time if provided
@@ -56,7 +67,11 @@ async def get_candlesticks(
         # For EA requests (with time parameter), check Redis cache first
         candles: Optional[List[CandlestickData]] = None
         if is_ea_request:
-            candles = redis_cache.get_cached_candle(currency_pair, end_time)
+            with observe_stage("cache"):
+                candles = redis_cache.get_cached_candle(currency_pair, end_time)
+            record_cache_result(request_type, "hit" if candles is not None else "miss")
+        else:
+            record_cache_result(request_type, "bypass")
             
         if candles is None:
             # Cache miss or not EA request - fetch from OlympTrade
@@ -79,7 +94,8 @@ async def get_candlesticks(
                     candles = [selected] if selected else []
                     if selected:
                         # Cache the selected candle as CandlestickData (cache layer will serialize)
-                        redis_cache.cache_candles(currency_pair, end_time, candles)
+                        with observe_stage("cache"):
+                            redis_cache.cache_candles(currency_pair, end_time, candles)
                     
             finally:
                 simple_client.disconnect()
@@ -94,35 +110,94 @@ async def get_candlesticks(
                 utc_datetime = datetime.fromtimestamp(candle.timestamp, tz=timezone.utc)
                 candle.utc_time = utc_datetime.strftime("%Y-%m-%d %H:%M:%S UTC")
         
-        # Return CSV file if download=true
-        if download:
-            return generate_metatrader_csv(candles, currency_pair)
-        
-        # Return JSON response
-        total_count = len(candles)
-        
-        return {
-            "success": True,
-            "candles": [
-                {
-                    "timestamp": candle.timestamp,
-                    "utc_time": candle.utc_time,
-                    "open": candle.open,
-                    "high": candle.high,
-                    "low": candle.low,
-                    "close": candle.close,
-                    "volume": candle.volume
-                } for candle in candles
-            ],
-            "total_count": total_count
-        }
-        
+        with observe_stage("encode"):
+            # Return CSV file if download=true
+            if download:
+                response = generate_metatrader_csv(candles, currency_pair)
+            else:
+                # Return JSON response
+                response = JSONResponse({
+                    "success": True,
+                    "candles": [
+                        {
+                            "timestamp": candle.timestamp,
+                            "utc_time": candle.utc_time,
+                            "open": candle.open,
+                            "high": candle.high,
+                            "low": candle.low,
+                            "close": candle.close,
+                            "volume": candle.volume
+                        } for candle in candles
+                    ],
+                    "total_count": len(candles)
+                })
+
+        outcome = "ok"
+        return response
+
+    except HTTPException as e:
+        # Keep deliberate HTTP errors (e.g. 400 for a bad time) instead of turning them into a 500
+        if e.status_code < 500:
+            outcome = "client_error"
+        raise
     except Exception as e:
         logger.error(f"Error fetching candles: {e}")
         raise HTTPException(
             status_code=500,
             detail=f"Failed to get candles: {str(e)}"
         )
+    finally:
+        observe_request(request_type, outcome, perf_counter() - request_start)
+
+@router.get("/payouts")
+def get_payouts(
+    currency_pair: Optional[str] = Query(None, description="Only this pair (e.g., EURUSD)"),
+    top: Optional[int] = Query(None, ge=1, description="Only the N highest payouts"),
+    group: str = Query("demo", description="Account group: demo or real"),
+    simple_client: SimpleOlympTradeClient = Depends(get_simple_client)
+):
+    """
+    GET endpoint for current payouts per pair, highest first.
+    Served from Redis; upstream is asked (one e:182) at most once per PAYOUT_CACHE_TTL seconds.
+    A plain def: the blocking upstream client runs in FastAPI's threadpool, not on the event loop.
+    """
+    with observe_stage("cache"):
+        payouts = redis_cache.get_cached_payouts(group)
+    record_cache_result("payouts", "hit" if payouts is not None else "miss")
+
+    if payouts is None:
+        with _payouts_lock:
+            # Another request may have filled the cache while this one waited
+            with observe_stage("cache"):
+                payouts = redis_cache.get_cached_payouts(group)
+            if payouts is None:
+                payouts = _fetch_payouts(simple_client, group)
+
+    ranked = sorted(payouts.items(), key=lambda item: (-item[1], item[0]))
+    if currency_pair:
+        ranked = [item for item in ranked if item[0] == currency_pair]
+    if top:
+        ranked = ranked[:top]
+    return {
+        "success": True,
+        "group": group,
+        "payouts": [{"currency_pair": pair, "payout": payout} for pair, payout in ranked],
+        "total_count": len(ranked)
+    }
+
+def _fetch_payouts(simple_client: SimpleOlympTradeClient, group: str) -> Dict[str, float]:
+    """One upstream e:182 for the group, stored in Redis for PAYOUT_CACHE_TTL seconds."""
+    if not simple_client.connect():
+        raise HTTPException(status_code=500, detail="Failed to connect to OlympTrade")
+    try:
+        payouts = simple_client.get_profitability(group)
+    finally:
+        simple_client.disconnect()
+    if not payouts:
+        raise HTTPException(status_code=502, detail="No payouts received from OlympTrade")
+    with observe_stage("cache"):
+        redis_cache.cache_payouts(group, payouts)
+    return payouts
 
 def generate_metatrader_csv(candles: List[CandlestickData], currency_pair: str) -> StreamingResponse:
     """Generate MetaTrader compatible CSV file"""
@@ -164,13 +239,13 @@ def generate_metatrader_csv(candles: List[CandlestickData], currency_pair: str)
 
 # Token management endpoints
 @router.post("/token/refresh")
-async def refresh_access_token():
+async def refresh_access_token(account: Optional[str] = Query(None, description="Named account (default: the single default account)")):
     """
     Manually refresh the access token using stored refresh token.
     This endpoint can be called by a cron job to refresh tokens daily.
     """
     try:
-        token_service = get_token_service()
+        token_service = get_token_service(account)
         result = token_service.refresh_access_token()
         
         if result["success"]:
@@ -194,7 +269,7 @@ async def refresh_access_token():
         )
 
 @router.post("/token/initialize")
-async def initialize_token_service(refresh_token: str):
+async def initialize_token_service(refresh_token: str, account: Optional[str] = Query(None, description="Named account (default: the single default account)")):
     """
     Initialize the token service with a refresh token.
     This should be called once to set up the refresh token.
@@ -203,7 +278,7 @@ async def initialize_token_service(refresh_token: str):
         if not refresh_token:
             raise HTTPException(status_code=400, detail="refresh_token is required")
         
-        token_service = get_token_service()
+        token_service = get_token_service(account)
         result = token_service.initialize_from_refresh_token(refresh_token)
         
         if result["success"]:
@@ -227,12 +302,12 @@ async def initialize_token_service(refresh_token: str):
         )
 
 @router.get("/token/status")
-async def get_token_status():
+async def get_token_status(account: Optional[str] = Query(None, description="Named account (default: the single default account)")):
     """
     Get current token status - whether we have a valid access token.
     """
     try:
-        token_service = get_token_service()
+        token_service = get_token_service(account)
         return {
             "access_token_available": token_service.is_access_token_available(),
             "refresh_token_available": token_service.get_refresh_token() is not None
@@ -243,4 +318,59 @@ async def get_token_status():
         raise HTTPException(
             status_code=500,
             detail=f"Token status error: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.get("/token/accounts")
+async def get_token_accounts():
+    """
+    List named accounts with a stored refresh token, and whether each has an access token.
+    """
+    try:
+        accounts = get_token_service().list_accounts()
+        return {
+            "accounts": [
+                {"account": account, "access_token_available": get_token_service(account).is_access_token_available()}
+                for account in accounts
+            ]
+        }
+        
+    except Exception as e:
+        logger.error(f"Error listing token accounts: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Token accounts error: {str(e)}"
+        )
+
+# Cache management endpoints
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Get candle cache statistics: key counts and hit/miss/set/eviction counters
+    per key class and currency pair. Served from maintained counters (no keyspace scan).
+    """
+    stats = redis_cache.get_cache_stats()
+    if stats.get("status") == "error":
+        raise HTTPException(
+            status_code=500,
+            detail=f"Cache stats error: {stats.get('error')}"
+        )
+    return stats
+
+@router.post("/cache/reindex")
+def rebuild_cache_index(admin_token: Optional[str] = Header(None, alias=ADMIN_HEADER)):
+    """
+    Rebuild the cache key indexes from Redis using SCAN.
+    Maintenance endpoint - only needed after restoring Redis or upgrading the cache layout.
+    Requires the X-Fluxia-Admin header to match CACHE_ADMIN_TOKEN. A plain def: the full
+    keyspace walk runs in the threadpool, not on the event loop.
+    """
+    if not config.CACHE_ADMIN_TOKEN or not admin_token or \
+            not secrets.compare_digest(admin_token, config.CACHE_ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+    result = redis_cache.rebuild_index()
+    if result.get("status") != "ok":
+        raise HTTPException(
+            status_code=500,
+            detail=f"Cache reindex failed: {result.get('error', result.get('status'))}"
+        )
+    return result
@@ -14,13 +14,33 @@ class Config:
     API_PORT: int = int(os.getenv("API_PORT", "8000"))
     DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    EVENT_LOOP: str = os.getenv("EVENT_LOOP", "auto")  # uvicorn loop: auto (uvloop if installed), asyncio, uvloop
     
     # OlympTrade WebSocket URI with proper parameters
-    OLYMPTRADE_WS_URI: str = "wss://ws.olymptrade.com/otp?cid_ver=1&cid_app=web%40OlympTrade%402025.3.27106%4027106&cid_device=%40%40desktop&cid_os=windows%4010"
+    # (override to point at a local fake server: python -m olymptrade_ws.fakeserver)
+    OLYMPTRADE_WS_URI: str = os.getenv(
+        "OLYMPTRADE_WS_URI",
+        "wss://ws.olymptrade.com/otp?cid_ver=1&cid_app=web%40OlympTrade%402025.3.27106%4027106&cid_device=%40%40desktop&cid_os=windows%4010"
+    )
     
     # Candlestick configuration
     CANDLE_SIZE_SECONDS: int = 60  # M1 chart
     
+    # Payouts (/ea/payouts): one upstream e:182 per TTL, shared by every EA
+    PAYOUT_CACHE_TTL: int = int(os.getenv("PAYOUT_CACHE_TTL", "30"))
+    
+    # Metrics (Prometheus /metrics endpoint)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    EVENT_LOOP_LAG_INTERVAL: float = float(os.getenv("EVENT_LOOP_LAG_INTERVAL", "0.5"))
+    
+    # Per-request profiling (span trees written as JSON for offline analysis)
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))  # 0.0 - 1.0
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_ADMIN_TOKEN: Optional[str] = os.getenv("PROFILE_ADMIN_TOKEN")  # X-Fluxia-Profile header value
+    
+    # Cache maintenance (POST /ea/cache/reindex); unset disables the endpoint
+    CACHE_ADMIN_TOKEN: Optional[str] = os.getenv("CACHE_ADMIN_TOKEN")  # X-Fluxia-Admin header value
+    
     # Redis keys
     REDIS_CANDLES_PREFIX: str = "candles:"
     REDIS_SUBSCRIPTION_PREFIX: str = "sub:"
@@ -1,5 +1,7 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import logging
 import sys
 
@@ -7,14 +9,29 @@ logger = logging.getLogger(__name__)
 
 from app.config import config
 from app.api.ea_endpoints import router as ea_router
+from app.services import metrics
+from app.services.request_timing import server_timing_middleware
 
 logger.info("Starting Fluxia Backend...")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background monitors on startup and stop them on shutdown"""
+    lag_monitor = metrics.start_event_loop_monitor()
+    yield
+    if lag_monitor:
+        lag_monitor.cancel()
+        try:
+            await lag_monitor
+        except asyncio.CancelledError:
+            pass
+
 # Create FastAPI app
 app = FastAPI(
     title="Fluxia EA Backend",
     description="Backend for Fluxia Expert Advisor",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -26,6 +43,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Server-Timing header and opt-in profiling for /ea/* requests
+app.middleware("http")(server_timing_middleware)
+
 # Include routers
 app.include_router(ea_router)
 
@@ -44,6 +64,13 @@ async def health_check():
         logger.error(f"Health check failed: {e}")
         raise HTTPException(status_code=500, detail=f"Health check failed: {str(e)}")
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus metrics"""
+    if not config.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(content=metrics.render_latest(), media_type=metrics.CONTENT_TYPE_LATEST)
+
 if __name__ == "__main__":
     import uvicorn
     
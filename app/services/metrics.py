@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+
+from app.config import config
+from app.services.request_timing import record_stage
+
+logger = logging.getLogger(__name__)
+
+# Stages of the /ea/candlesticks path, in the order a cache miss goes through them
+CANDLE_STAGES = ("cache", "token", "connect", "upstream", "encode")
+
+# Latency buckets (seconds) from sub-millisecond Redis hits up to the 10s upstream timeout
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CANDLE_STAGE_SECONDS = Histogram(
+    "fluxia_candle_stage_seconds",
+    "Time spent in each stage of the candle request path",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+CANDLE_REQUEST_SECONDS = Histogram(
+    "fluxia_candle_request_seconds",
+    "End-to-end /ea/candlesticks handler time by request type and outcome (ok, client_error, server_error)",
+    ["request_type", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+CANDLE_CACHE_TOTAL = Counter(
+    "fluxia_candle_cache_total",
+    "Candle cache lookups by request type and result (hit, miss, bypass)",
+    ["request_type", "result"],
+)
+UPSTREAM_CONNECTIONS = Gauge(
+    "fluxia_upstream_connections",
+    "Currently open OlympTrade WebSocket connections",
+)
+UPSTREAM_CONNECTS_TOTAL = Counter(
+    "fluxia_upstream_connects_total",
+    "OlympTrade WebSocket connection attempts by result",
+    ["result"],
+)
+UPSTREAM_REQUESTS_TOTAL = Counter(
+    "fluxia_upstream_requests_total",
+    "Requests sent to OlympTrade by event code",
+    ["event"],
+)
+UPSTREAM_PING_RTT_SECONDS = Histogram(
+    "fluxia_upstream_ping_rtt_seconds",
+    "Round trip of an e:90 ping on a fresh OlympTrade connection",
+    buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_PONGS_TOTAL = Counter(
+    "fluxia_upstream_pongs_total",
+    "e:90 pings sent to OlympTrade by result (ok, missed)",
+    ["result"],
+)
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "fluxia_event_loop_lag_seconds",
+    "How late the event loop woke up a sleeping probe task",
+    buckets=LATENCY_BUCKETS,
+)
+
+# Resolve label children once so the hot path is a dict lookup plus observe()
+_stage_histograms = {stage: CANDLE_STAGE_SECONDS.labels(stage) for stage in CANDLE_STAGES}
+
+
+@contextmanager
+def observe_stage(stage: str):
+    """
+    Time the enclosed block and record it under the given candle path stage,
+    both in the aggregate histogram and on the current request's Server-Timing.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        _stage_histograms[stage].observe(duration)
+        record_stage(stage, start, duration)
+
+
+def observe_request(request_type: str, outcome: str, seconds: float):
+    """Record the end-to-end handler time of a candle request, failed ones included."""
+    CANDLE_REQUEST_SECONDS.labels(request_type, outcome).observe(seconds)
+
+
+def record_cache_result(request_type: str, result: str):
+    """Count a cache lookup result ("hit", "miss" or "bypass") for a request type."""
+    CANDLE_CACHE_TOTAL.labels(request_type, result).inc()
+
+
+def record_upstream_ping(rtt_seconds: Optional[float]):
+    """Record a ping round trip, or a missed pong when `rtt_seconds` is None."""
+    if rtt_seconds is None:
+        UPSTREAM_PONGS_TOTAL.labels("missed").inc()
+        return
+    UPSTREAM_PONGS_TOTAL.labels("ok").inc()
+    UPSTREAM_PING_RTT_SECONDS.observe(rtt_seconds)
+
+
+def render_latest() -> bytes:
+    """Render all metrics in the Prometheus text exposition format."""
+    return generate_latest()
+
+
+async def monitor_event_loop_lag(interval: float = config.EVENT_LOOP_LAG_INTERVAL):
+    """
+    Measure event loop lag by sleeping for a fixed interval and recording how late we wake up.
+    A blocking call on the loop (e.g. synchronous Redis or WebSocket I/O) shows up here directly.
+    """
+    logger.info(f"Event loop lag monitor started (interval={interval}s)")
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG_SECONDS.observe(max(0.0, loop.time() - expected))
+
+
+def start_event_loop_monitor() -> Optional[asyncio.Task]:
+    """Start the lag monitor on the running loop if metrics are enabled."""
+    if not config.METRICS_ENABLED:
+        return None
+    return asyncio.create_task(monitor_event_loop_lag())
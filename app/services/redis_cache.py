@@ -1,7 +1,8 @@
 import redis
 import json
 import logging
-from typing import Optional, List
+import time as time_module
+from typing import Optional, List, Dict, Any
 from datetime import datetime, timezone
 import hashlib
 
@@ -10,11 +11,56 @@ from app.config import config
 
 logger = logging.getLogger(__name__)
 
+# GET the cached value and count the lookup as a hit or miss in one round-trip.
+# KEYS[1]=cache key, KEYS[2]=stats hash; ARGV[1]=currency pair
+_GET_AND_COUNT_SCRIPT = """
+local value = redis.call('GET', KEYS[1])
+if value then
+    redis.call('HINCRBY', KEYS[2], ARGV[1] .. ':hits', 1)
+else
+    redis.call('HINCRBY', KEYS[2], ARGV[1] .. ':misses', 1)
+end
+return value
+"""
+
+# SETEX the value and keep the per-pair key index in sync. The index is a sorted
+# set of cache keys scored by expiry time, so live key counts are a ZCOUNT and
+# expired keys are pruned (and counted as evictions) without touching the keyspace.
+# The index has no TTL of its own: entries of pairs that stop being written are
+# pruned and counted by get_cache_stats, and an index left empty is gone.
+# KEYS[1]=cache key, KEYS[2]=stats hash, KEYS[3]=pair index, KEYS[4]=pairs set
+# ARGV[1]=payload, ARGV[2]=ttl, ARGV[3]=now, ARGV[4]=currency pair
+_SET_AND_INDEX_SCRIPT = """
+local now = tonumber(ARGV[3])
+local ttl = tonumber(ARGV[2])
+local evicted = redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', now)
+redis.call('SETEX', KEYS[1], ttl, ARGV[1])
+redis.call('ZADD', KEYS[3], now + ttl, KEYS[1])
+redis.call('SADD', KEYS[4], ARGV[4])
+redis.call('HINCRBY', KEYS[2], ARGV[4] .. ':sets', 1)
+if evicted > 0 then
+    redis.call('HINCRBY', KEYS[2], ARGV[4] .. ':evictions', evicted)
+end
+return evicted
+"""
+
 class RedisCandleCache:
     """Redis cache for candlestick data with 5-minute expiration"""
+
+    CACHE_TTL_SECONDS = 300  # 5 minutes
+    KEY_CLASSES = ("ea_candle", "regular_candle")
+    COUNTERS = ("hits", "misses", "sets", "evictions")
+
+    # Accounting keys (maintained incrementally, never derived from KEYS/SCAN on the request path)
+    STATS_KEY_PREFIX = "cache_stats:"   # hash per key class: "<pair>:<counter>" -> count
+    INDEX_KEY_PREFIX = "cache_index:"   # zset per key class and pair: cache key -> expiry timestamp
+    PAIRS_KEY_PREFIX = "cache_pairs:"   # set per key class: pairs that have been cached
+    PAYOUTS_KEY_PREFIX = "payouts:"     # JSON {pair: payout} per account group
     
     def __init__(self):
         self.redis_client = None
+        self._get_script = None
+        self._set_script = None
         self._connect()
     
     def _connect(self):
@@ -23,6 +69,8 @@ class RedisCandleCache:
             self.redis_client = redis.from_url(config.REDIS_URL)
             # Test connection
             self.redis_client.ping()
+            self._get_script = self.redis_client.register_script(_GET_AND_COUNT_SCRIPT)
+            self._set_script = self.redis_client.register_script(_SET_AND_INDEX_SCRIPT)
             logger.info("Connected to Redis successfully")
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
@@ -38,6 +86,20 @@ class RedisCandleCache:
         else:
             # For regular requests without time (not from EA)
             return f"regular_candle:{currency_pair}:latest"
+
+    @staticmethod
+    def _key_class(time: Optional[datetime]) -> str:
+        """Key class ("ea_candle" or "regular_candle") for a request"""
+        return "ea_candle" if time else "regular_candle"
+
+    def _stats_key(self, key_class: str) -> str:
+        return f"{self.STATS_KEY_PREFIX}{key_class}"
+
+    def _index_key(self, key_class: str, currency_pair: str) -> str:
+        return f"{self.INDEX_KEY_PREFIX}{key_class}:{currency_pair}"
+
+    def _pairs_key(self, key_class: str) -> str:
+        return f"{self.PAIRS_KEY_PREFIX}{key_class}"
     
     def get_cached_candle(self, currency_pair: str, time: Optional[datetime]) -> Optional[List[CandlestickData]]:
         """Get cached candlestick data"""
@@ -46,7 +108,8 @@ class RedisCandleCache:
         
         try:
             cache_key = self._generate_cache_key(currency_pair, time)
-            cached_data = self.redis_client.get(cache_key)
+            stats_key = self._stats_key(self._key_class(time))
+            cached_data = self._get_script(keys=[cache_key, stats_key], args=[currency_pair])
             
             if cached_data:
                 logger.info(f"Cache HIT for {cache_key}")
@@ -102,42 +165,176 @@ class RedisCandleCache:
                 else:
                     logger.warning(f"Unsupported candle type for caching: {type(c)}")
 
-            # Cache with 5-minute expiration (300 seconds)
-            success = self.redis_client.setex(
-                cache_key,
-                300,  # 5 minutes
-                json.dumps(payload)
+            # Cache with 5-minute expiration and update the accounting keys atomically
+            key_class = self._key_class(time)
+            evicted = self._set_script(
+                keys=[
+                    cache_key,
+                    self._stats_key(key_class),
+                    self._index_key(key_class, currency_pair),
+                    self._pairs_key(key_class),
+                ],
+                args=[json.dumps(payload), self.CACHE_TTL_SECONDS, int(time_module.time()), currency_pair]
             )
 
-            if success:
-                logger.info(f"Cached candle for {cache_key} (5min TTL)")
-                return True
-            else:
-                logger.warning(f"Failed to cache candle for {cache_key}")
-                return False
+            logger.info(f"Cached candle for {cache_key} (5min TTL, {evicted} expired keys pruned)")
+            return True
 
         except Exception as e:
             logger.error(f"Error caching candle: {e}")
             return False
 
+    def get_cached_payouts(self, group: str) -> Optional[Dict[str, float]]:
+        """Get the cached payout table for an account group"""
+        if not self.redis_client:
+            return None
+
+        try:
+            cached_data = self.redis_client.get(f"{self.PAYOUTS_KEY_PREFIX}{group}")
+            return json.loads(cached_data) if cached_data else None
+        except Exception as e:
+            logger.error(f"Error getting cached payouts: {e}")
+            return None
+
+    def cache_payouts(self, group: str, payouts: Dict[str, float]) -> bool:
+        """Cache the payout table for an account group (PAYOUT_CACHE_TTL expiration)"""
+        if not self.redis_client or not payouts:
+            return False
+
+        try:
+            self.redis_client.setex(f"{self.PAYOUTS_KEY_PREFIX}{group}", config.PAYOUT_CACHE_TTL, json.dumps(payouts))
+            return True
+        except Exception as e:
+            logger.error(f"Error caching payouts: {e}")
+            return False
+
     def get_cache_stats(self) -> dict:
-        """Get cache statistics"""
+        """
+        Get cache statistics from the incrementally maintained counters and key indexes.
+        Cost depends on the number of cached pairs, not on the number of cached keys.
+        Expired index entries are pruned and counted as evictions first, so pairs that
+        are no longer written still report theirs.
+        """
         if not self.redis_client:
             return {"status": "disconnected"}
         
         try:
-            info = self.redis_client.info()
-            keys = self.redis_client.keys("ea_candle:*") + self.redis_client.keys("regular_candle:*")
+            now = int(time_module.time())
+            classes = {}
+            for key_class in self.KEY_CLASSES:
+                pairs = sorted(p.decode() for p in self.redis_client.smembers(self._pairs_key(key_class)))
+                self._count_evictions(key_class, pairs, now)
+                counters = self.redis_client.hgetall(self._stats_key(key_class))
+                for pair in (k.decode().rsplit(":", 1)[0] for k in counters):
+                    if pair not in pairs:
+                        pairs.append(pair)
+
+                pipe = self.redis_client.pipeline(transaction=False)
+                for pair in pairs:
+                    pipe.zcount(self._index_key(key_class, pair), f"({now}", "+inf")
+                key_counts = pipe.execute()
+
+                pair_stats = {}
+                for pair, key_count in zip(pairs, key_counts):
+                    stats = {"keys": key_count}
+                    for counter in self.COUNTERS:
+                        stats[counter] = int(counters.get(f"{pair}:{counter}".encode(), 0))
+                    stats["hit_ratio"] = self._hit_ratio(stats)
+                    pair_stats[pair] = stats
+
+                class_stats = self._sum_stats(pair_stats.values())
+                class_stats["pairs"] = pair_stats
+                classes[key_class] = class_stats
+
+            totals = self._sum_stats(classes.values())
+            info = self.redis_client.info("memory")
             
             return {
                 "status": "connected",
-                "total_keys": len(keys),
-                "ea_keys": len([k for k in keys if k.decode().startswith("ea_candle:")]),
-                "regular_keys": len([k for k in keys if k.decode().startswith("regular_candle:")]),
+                "total_keys": totals["keys"],
+                "ea_keys": classes["ea_candle"]["keys"],
+                "regular_keys": classes["regular_candle"]["keys"],
+                **{counter: totals[counter] for counter in self.COUNTERS},
+                "hit_ratio": totals["hit_ratio"],
+                "classes": classes,
                 "memory_used": info.get('used_memory_human', 'unknown')
             }
         except Exception as e:
             return {"status": "error", "error": str(e)}
 
+    def _count_evictions(self, key_class: str, pairs: List[str], now: int):
+        """Prune expired entries from the pairs' indexes and add them to the eviction counters"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        for pair in pairs:
+            pipe.zremrangebyscore(self._index_key(key_class, pair), "-inf", now)
+        evicted = pipe.execute()
+        for pair, count in zip(pairs, evicted):
+            if count:
+                pipe.hincrby(self._stats_key(key_class), f"{pair}:evictions", count)
+        pipe.execute()
+
+    def rebuild_index(self) -> dict:
+        """
+        Rebuild the per-pair key indexes from the keys actually present in Redis.
+        Maintenance only (e.g. after a Redis restore or upgrading from the old layout):
+        walks the keyspace incrementally with SCAN and is never called on the request path.
+        """
+        if not self.redis_client:
+            return {"status": "disconnected"}
+
+        try:
+            indexed = {}
+            for key_class in self.KEY_CLASSES:
+                batch = []
+                indexed[key_class] = 0
+                for raw_key in self.redis_client.scan_iter(match=f"{key_class}:*", count=500):
+                    batch.append(raw_key)
+                    if len(batch) >= 500:
+                        indexed[key_class] += self._index_keys(key_class, batch)
+                        batch = []
+                if batch:
+                    indexed[key_class] += self._index_keys(key_class, batch)
+
+            logger.info(f"Rebuilt cache key indexes: {indexed}")
+            return {"status": "ok", "indexed_keys": indexed}
+        except Exception as e:
+            logger.error(f"Error rebuilding cache index: {e}")
+            return {"status": "error", "error": str(e)}
+
+    def _index_keys(self, key_class: str, keys: List[bytes]) -> int:
+        """Add a batch of existing cache keys to their pair indexes, using their remaining TTL"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.ttl(key)
+        ttls = pipe.execute()
+
+        now = int(time_module.time())
+        count = 0
+        for key, ttl in zip(keys, ttls):
+            if ttl is None or ttl < 0:
+                continue
+            key = key.decode()
+            currency_pair = key.split(":")[1]
+            index_key = self._index_key(key_class, currency_pair)
+            pipe.zadd(index_key, {key: now + ttl})
+            pipe.sadd(self._pairs_key(key_class), currency_pair)
+            count += 1
+        pipe.execute()
+        return count
+
+    def _sum_stats(self, stats_list) -> Dict[str, Any]:
+        """Sum per-pair (or per-class) stats dicts into one"""
+        total = {"keys": 0, **{counter: 0 for counter in self.COUNTERS}}
+        for stats in stats_list:
+            for field in total:
+                total[field] += stats[field]
+        total["hit_ratio"] = self._hit_ratio(total)
+        return total
+
+    @staticmethod
+    def _hit_ratio(stats: Dict[str, Any]) -> Optional[float]:
+        lookups = stats["hits"] + stats["misses"]
+        return round(stats["hits"] / lookups, 4) if lookups else None
+
 # Global cache instance
 redis_cache = RedisCandleCache()
\ No newline at end of file
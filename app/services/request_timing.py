@@ -0,0 +1,115 @@
+import json
+import logging
+import os
+import random
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+
+from fastapi import Request
+from starlette.background import BackgroundTask, BackgroundTasks
+
+from app.config import config
+
+logger = logging.getLogger(__name__)
+
+# Requests under this prefix get a Server-Timing header
+TIMED_PATH_PREFIX = "/ea/"
+PROFILE_HEADER = "X-Fluxia-Profile"
+
+_current_timing: ContextVar[Optional["RequestTiming"]] = ContextVar("request_timing", default=None)
+
+
+class RequestTiming:
+    """
+    Per-request stage durations. Feeds the Server-Timing header and, when the request
+    is profiled, records every stage as a span (start offset + duration) for offline analysis.
+    """
+
+    def __init__(self, profile: bool = False):
+        self.start = perf_counter()
+        self.profile = profile
+        self.stages: Dict[str, float] = {}
+        self.spans: List[Dict[str, Any]] = []
+
+    def record(self, stage: str, started: float, duration: float):
+        """Add a finished stage. Repeated stages (e.g. cache read + write) accumulate."""
+        self.stages[stage] = self.stages.get(stage, 0.0) + duration
+        if self.profile:
+            self.spans.append({
+                "name": stage,
+                "start_ms": round((started - self.start) * 1000, 3),
+                "duration_ms": round(duration * 1000, 3),
+            })
+
+    def elapsed(self) -> float:
+        return perf_counter() - self.start
+
+    def server_timing_header(self) -> str:
+        """Render recorded stages plus the total as a Server-Timing header value (milliseconds)."""
+        parts = [f"{stage};dur={duration * 1000:.3f}" for stage, duration in self.stages.items()]
+        parts.append(f"total;dur={self.elapsed() * 1000:.3f}")
+        return ", ".join(parts)
+
+    def to_profile(self, request: Request, status_code: int) -> Dict[str, Any]:
+        """Span tree for one request: the request as root with its stages as children."""
+        return {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "method": request.method,
+            "path": request.url.path,
+            "query": request.url.query,
+            "status_code": status_code,
+            "name": "request",
+            "duration_ms": round(self.elapsed() * 1000, 3),
+            "stages_ms": {stage: round(duration * 1000, 3) for stage, duration in self.stages.items()},
+            "children": self.spans,
+        }
+
+
+def record_stage(stage: str, started: float, duration: float):
+    """Record a stage on the current request, if there is one being timed."""
+    timing = _current_timing.get()
+    if timing is not None:
+        timing.record(stage, started, duration)
+
+
+def _should_profile(request: Request) -> bool:
+    """Profile if the admin header carries the configured token, otherwise sample by rate."""
+    admin_token = request.headers.get(PROFILE_HEADER)
+    if admin_token and config.PROFILE_ADMIN_TOKEN and admin_token == config.PROFILE_ADMIN_TOKEN:
+        return True
+    return config.PROFILE_SAMPLE_RATE > 0 and random.random() < config.PROFILE_SAMPLE_RATE
+
+
+def _write_profile(profile: Dict[str, Any]):
+    """Write one profile as JSON into PROFILE_DIR (a background task, after the response is sent)."""
+    try:
+        os.makedirs(config.PROFILE_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S_%f")
+        slug = profile["path"].strip("/").replace("/", "_") or "root"
+        path = os.path.join(config.PROFILE_DIR, f"{stamp}_{slug}.json")
+        with open(path, "w") as f:
+            json.dump(profile, f, indent=2)
+    except Exception as e:
+        logger.error(f"Failed to write request profile: {e}")
+
+
+async def server_timing_middleware(request: Request, call_next):
+    """Time /ea/* requests, add a Server-Timing header and write sampled profiles."""
+    if not request.url.path.startswith(TIMED_PATH_PREFIX):
+        return await call_next(request)
+
+    timing = RequestTiming(profile=_should_profile(request))
+    token = _current_timing.set(timing)
+    try:
+        response = await call_next(request)
+    finally:
+        _current_timing.reset(token)
+
+    response.headers["Server-Timing"] = timing.server_timing_header()
+    if timing.profile:
+        # Written once the response has gone out, so profiling adds no disk I/O to the request
+        write = BackgroundTask(_write_profile, timing.to_profile(request, response.status_code))
+        response.background = write if response.background is None else BackgroundTasks([response.background, write])
+    return response
@@ -9,10 +9,40 @@ import websocket
 import ssl
 from typing import Any, Dict, List, Optional
 from app.models import CandlestickData
+from app.config import config
 from app.services.token_service import get_token_service
+from app.services.metrics import (
+    observe_stage, record_upstream_ping, UPSTREAM_CONNECTIONS, UPSTREAM_CONNECTS_TOTAL, UPSTREAM_REQUESTS_TOTAL
+)
 
 logger = logging.getLogger(__name__)
 
+# e:182 payloads are not documented: accept the spellings olymptrade_ws core/profitability.py accepts
+PAYOUT_PAIR_KEYS = ("pair", "p", "asset", "id")
+PAYOUT_VALUE_KEYS = ("profitability", "profit", "payout", "value", "percent")
+
+
+def parse_payouts(data: Any) -> Dict[str, float]:
+    """{pair: payout} from an e:182 payload: a list of asset dicts, or a {pair: payout} dict."""
+    if isinstance(data, dict):
+        data = [data] if any(key in data for key in PAYOUT_PAIR_KEYS) else \
+            [{"pair": pair, "payout": value} for pair, value in data.items()]
+    payouts = {}
+    for item in data if isinstance(data, list) else []:
+        if not isinstance(item, dict):
+            continue
+        pair = next((item[key] for key in PAYOUT_PAIR_KEYS if isinstance(item.get(key), str)), None)
+        value = next((item[key] for key in PAYOUT_VALUE_KEYS if key in item), None)
+        if isinstance(value, dict): # e.g. {"digital": 82}
+            value = max((v for v in value.values() if isinstance(v, (int, float))), default=None)
+        try:
+            payout = float(value) if value is not None else None
+        except (TypeError, ValueError):
+            continue
+        if pair is not None and payout is not None:
+            payouts[pair] = payout
+    return payouts
+
 class SimpleOlympTradeClient:
     """
     Simplified OlympTrade client that uses token service for authentication.
@@ -26,7 +56,7 @@ class SimpleOlympTradeClient:
         self.ws = None
         self._is_connected = False
         self.candle_responses = []
-        self.ws_url = "wss://ws.olymptrade.com/otp?cid_ver=1&cid_app=web%40OlympTrade%402025.3.27106%4027106&cid_device=%40%40desktop&cid_os=windows%4010"
+        self.ws_url = config.OLYMPTRADE_WS_URI
         
     def ensure_access_token(self) -> bool:
         """Ensure we have a valid access token, refresh if needed"""
@@ -40,24 +70,27 @@ class SimpleOlympTradeClient:
     def connect(self) -> bool:
         """Connect to OlympTrade WebSocket for historical data only"""
         try:
-            # Ensure we have a valid access token
-            if not self.ensure_access_token():
-                logger.error("Failed to obtain access token")
-                return False
-            
-            # Get full cookie string from token service
-            full_cookie = self.token_service.get_full_cookie_string()
-            if not full_cookie:
-                logger.error("Failed to generate cookie string")
-                return False
+            with observe_stage("token"):
+                # Ensure we have a valid access token
+                if not self.ensure_access_token():
+                    logger.error("Failed to obtain access token")
+                    UPSTREAM_CONNECTS_TOTAL.labels("no_token").inc()
+                    return False
+                
+                # Get full cookie string from token service
+                full_cookie = self.token_service.get_full_cookie_string()
+                if not full_cookie:
+                    logger.error("Failed to generate cookie string")
+                    UPSTREAM_CONNECTS_TOTAL.labels("no_token").inc()
+                    return False
             
             # WebSocket connection
             logger.info("Connecting to OlympTrade WebSocket...")
             logger.info(f"URL: {self.ws_url}")
             
-            # Create WebSocket with proper headers
+            # Create WebSocket with proper headers (Origin is passed separately so
+            # websocket-client doesn't add a second, host-derived Origin header)
             headers = [
-                "Origin: https://olymptrade.com",
                 "User-Agent: Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
                 "Pragma: no-cache",
                 "Cache-Control: no-cache",
@@ -66,18 +99,25 @@ class SimpleOlympTradeClient:
                 f"Cookie: {full_cookie}"
             ]
             
-            # Setup WebSocket callbacks
-            self.ws = websocket.WebSocket(sslopt={"cert_reqs": ssl.CERT_NONE})
-            self.ws.connect(self.ws_url, header=headers)
-            self._is_connected = True
-            
-            # Wait for authentication
-            time.sleep(2)
+            with observe_stage("connect"):
+                # Setup WebSocket callbacks
+                self.ws = websocket.WebSocket(sslopt={"cert_reqs": ssl.CERT_NONE})
+                self.ws.connect(self.ws_url, header=headers, origin="https://olymptrade.com")
+                self._is_connected = True
+                UPSTREAM_CONNECTIONS.inc()
+                
+                # Wait for authentication; the first part of the wait measures the ping RTT
+                ready_at = time.monotonic() + 2
+                self.ping(timeout=1)
+                time.sleep(max(0.0, ready_at - time.monotonic()))
+            UPSTREAM_CONNECTS_TOTAL.labels("success").inc()
             logger.info("Client connected - ready for historical data only")
             return True
                 
         except Exception as e:
             logger.error(f"Error connecting client: {e}")
+            UPSTREAM_CONNECTS_TOTAL.labels("failure").inc()
+            self.disconnect() # Callers only disconnect after a successful connect
             return False
     
     def disconnect(self):
@@ -85,6 +125,7 @@ class SimpleOlympTradeClient:
         if self.ws and self._is_connected:
             self.ws.close()
             self._is_connected = False
+            UPSTREAM_CONNECTIONS.dec()
             logger.info("Client disconnected")
     
     def generate_uuid(self) -> str:
@@ -151,57 +192,121 @@ class SimpleOlympTradeClient:
             request_uuid = self.generate_uuid()
             message = self.format_message(event_code_req, data, request_uuid)
             
-            # Send request
-            self.ws.send(message)
-            logger.info(f"Sent candle request (uuid={request_uuid}) for {currency_pair}")
-
-            # Wait for response
-            timeout = 10
-            start = time.time()
-
-            while time.time() - start < timeout:
-                try:
-                    response = self.ws.recv()
-                    if response:
-                        logger.debug(f"Received raw response: {response[:2000]}")
-
-                        # Response is a JSON array of dicts
-                        messages = json.loads(response)
-                        if not isinstance(messages, list):
-                            logger.debug(f"Response is not list")
-                            continue
-
-                        for msg in messages:
-                            # Check for matching uuid and event
-                            if msg.get("uuid") == request_uuid and msg.get("e") == event_code_req:
-                                candle_data = msg.get("d", [])
-                                candles = []
-                                for group in candle_data:
-                                    if isinstance(group, dict) and group.get('p') == currency_pair:
-                                        raw_candles = group.get('candles', [])
-                                        for c in raw_candles:
-                                            candles.append(CandlestickData(
-                                                timestamp=c['t'],
-                                                open=c['open'],
-                                                high=c['high'],
-                                                low=c['low'],
-                                                close=c['close'],
-                                                volume=c.get('volume', 0.0)
-                                            ))
-                                logger.info(f"Successfully parsed {len(candles)} candles for {currency_pair}")
-                                return candles
-
-                except Exception as e:
-                    logger.error(f"Error receiving/parsing response: {e}")
-                    break
+            with observe_stage("upstream"):
+                # Send request
+                self.ws.send(message)
+                UPSTREAM_REQUESTS_TOTAL.labels(str(event_code_req)).inc()
+                logger.info(f"Sent candle request (uuid={request_uuid}) for {currency_pair}")
+
+                # Wait for response
+                timeout = 10
+                start = time.time()
+
+                while time.time() - start < timeout:
+                    try:
+                        response = self._recv(start + timeout)
+                        if response:
+                            logger.debug(f"Received raw response: {response[:2000]}")
+
+                            # Response is a JSON array of dicts
+                            messages = json.loads(response)
+                            if not isinstance(messages, list):
+                                logger.debug(f"Response is not list")
+                                continue
+
+                            for msg in messages:
+                                # Check for matching uuid and event
+                                if msg.get("uuid") == request_uuid and msg.get("e") == event_code_req:
+                                    candle_data = msg.get("d", [])
+                                    candles = []
+                                    for group in candle_data:
+                                        if isinstance(group, dict) and group.get('p') == currency_pair:
+                                            raw_candles = group.get('candles', [])
+                                            for c in raw_candles:
+                                                candles.append(CandlestickData(
+                                                    timestamp=c['t'],
+                                                    open=c['open'],
+                                                    high=c['high'],
+                                                    low=c['low'],
+                                                    close=c['close'],
+                                                    volume=c.get('volume', 0.0)
+                                                ))
+                                    logger.info(f"Successfully parsed {len(candles)} candles for {currency_pair}")
+                                    return candles
+
+                    except Exception as e:
+                        logger.error(f"Error receiving/parsing response: {e}")
+                        break
             
-            logger.warning(f"Timeout waiting for candle response for {currency_pair}")
-            return []
+                logger.warning(f"Timeout waiting for candle response for {currency_pair}")
+                return []
 
         except Exception as e:
             logger.error(f"Error fetching candles for {currency_pair}: {e}")
             return []
     
+    def _request(self, event_code: int, data: Any, timeout: float = 10) -> Optional[Dict[str, Any]]:
+        """Send one request and return the response with the same uuid and event code, or None on timeout."""
+        request_uuid = self.generate_uuid()
+        self.ws.send(self.format_message(event_code, data, request_uuid))
+        UPSTREAM_REQUESTS_TOTAL.labels(str(event_code)).inc()
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            try:
+                response = self._recv(deadline)
+            except websocket.WebSocketTimeoutException:
+                return None
+            if not response:
+                continue
+            messages = json.loads(response)
+            for msg in messages if isinstance(messages, list) else []:
+                if msg.get("uuid") == request_uuid and msg.get("e") == event_code:
+                    return msg
+        return None
+
+    def _recv(self, deadline: float) -> str:
+        """ws.recv() that raises WebSocketTimeoutException at `deadline` (time.time()) instead of blocking."""
+        self.ws.settimeout(max(deadline - time.time(), 0.001))
+        try:
+            return self.ws.recv()
+        finally:
+            self.ws.settimeout(None)
+
+    def ping(self, timeout: float = 5) -> Optional[float]:
+        """Send an e:90 ping and return its round trip in seconds (None if no pong in time or on error)."""
+        start = time.perf_counter()
+        try:
+            response = self._request(90, {}, timeout=timeout)
+        except Exception as e:
+            logger.warning(f"Ping failed: {e}")
+            response = None
+        rtt = time.perf_counter() - start if response else None
+        record_upstream_ping(rtt)
+        return rtt
+
+    def get_profitability(self, group: str = "demo") -> Dict[str, float]:
+        """Payout per pair (e:182) for the first account of the group, found through e:1068."""
+        if not self.ws or not self._is_connected:
+            logger.error("Not connected")
+            return {}
+
+        try:
+            with observe_stage("upstream"):
+                account = self._request(1068, [{"group": group}])
+                accounts = (account or {}).get("d") or []
+                if not accounts or not isinstance(accounts[0], dict) or accounts[0].get("account_id") is None:
+                    logger.warning(f"No {group} account found for profitability request")
+                    return {}
+                response = self._request(182, [{"account_id": accounts[0]["account_id"]}])
+
+            payouts = parse_payouts((response or {}).get("d") or [])
+            logger.info(f"Received payouts for {len(payouts)} pairs")
+            return payouts
+
+        except Exception as e:
+            logger.error(f"Error fetching profitability: {e}")
+            return {}
+
     @property
     def is_connected(self) -> bool:
         """Check if client is connected"""
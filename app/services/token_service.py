@@ -1,7 +1,7 @@
 import logging
 import json
 import re
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import requests
 from datetime import datetime, timedelta
 import redis
@@ -13,10 +13,15 @@ class TokenService:
     """
     Manages OlympTrade access tokens using refresh tokens.
     Stores access tokens in Redis and refreshes them as needed.
+    With an `account`, tokens live under that account's own keys, so many accounts
+    can be refreshed independently (see get_token_service(account)).
     """
     
     REDIS_ACCESS_TOKEN_KEY = "olymptrade:access_token"
     REDIS_REFRESH_TOKEN_KEY = "olymptrade:refresh_token"
+    # Named accounts: olymptrade:account:<account>:access_token / :refresh_token, listed in a set
+    REDIS_ACCOUNT_KEY_PREFIX = "olymptrade:account:"
+    REDIS_ACCOUNTS_KEY = "olymptrade:accounts"
     
     # Fixed cookie template - only access_token will change
     COOKIE_TEMPLATE = (
@@ -31,9 +36,17 @@ class TokenService:
         "access_token={access_token}"
     )
     
-    def __init__(self):
-        self.redis_client = None
-        self._connect()
+    def __init__(self, account: Optional[str] = None, redis_client=None):
+        self.account = account
+        if account is None:
+            self.access_token_key = self.REDIS_ACCESS_TOKEN_KEY
+            self.refresh_token_key = self.REDIS_REFRESH_TOKEN_KEY
+        else:
+            self.access_token_key = f"{self.REDIS_ACCOUNT_KEY_PREFIX}{account}:access_token"
+            self.refresh_token_key = f"{self.REDIS_ACCOUNT_KEY_PREFIX}{account}:refresh_token"
+        self.redis_client = redis_client
+        if self.redis_client is None:
+            self._connect()
     
     def _connect(self):
         """Connect to Redis"""
@@ -52,11 +65,14 @@ class TokenService:
             return False
         try:
             # Store refresh token with 3-year expiration (refresh tokens are long-lived)
-            return self.redis_client.setex(
-                self.REDIS_REFRESH_TOKEN_KEY, 
+            stored = self.redis_client.setex(
+                self.refresh_token_key, 
                 3 * 365 * 24 * 60 * 60,  # 3 years
                 refresh_token
             )
+            if stored and self.account is not None:
+                self.redis_client.sadd(self.REDIS_ACCOUNTS_KEY, self.account)
+            return stored
         except Exception as e:
             logger.error(f"Error storing refresh token: {e}")
             return False
@@ -66,7 +82,7 @@ class TokenService:
         if not self.redis_client:
             return None
         try:
-            result = self.redis_client.get(self.REDIS_REFRESH_TOKEN_KEY)
+            result = self.redis_client.get(self.refresh_token_key)
             return result.decode('utf-8') if result else None
         except Exception as e:
             logger.error(f"Error getting refresh token: {e}")
@@ -80,7 +96,7 @@ class TokenService:
             # Set access token to expire in 3 days (259200 seconds)
             three_days_seconds = 3 * 24 * 60 * 60  # 259200 seconds
             return self.redis_client.setex(
-                self.REDIS_ACCESS_TOKEN_KEY, 
+                self.access_token_key, 
                 three_days_seconds,
                 access_token
             )
@@ -93,7 +109,7 @@ class TokenService:
         if not self.redis_client:
             return None
         try:
-            result = self.redis_client.get(self.REDIS_ACCESS_TOKEN_KEY)
+            result = self.redis_client.get(self.access_token_key)
             return result.decode('utf-8') if result else None
         except Exception as e:
             logger.error(f"Error getting access token: {e}")
@@ -109,7 +125,7 @@ class TokenService:
             return {"success": False, "message": "No refresh token available"}
         
         try:
-            logger.info("Refreshing access token using OlympTrade API...")
+            logger.info(f"Refreshing access token{self._label} using OlympTrade API...")
             
             # Correct OlympTrade refresh endpoint
             url = "https://gw.olymptrade.com/api/token/renew/web/v1"
@@ -186,6 +202,20 @@ class TokenService:
             logger.error(f"Error refreshing token: {e}")
             return {"success": False, "message": str(e)}
     
+    @property
+    def _label(self) -> str:
+        return f" for account {self.account}" if self.account is not None else ""
+
+    def list_accounts(self) -> List[str]:
+        """Named accounts with a stored refresh token."""
+        if not self.redis_client:
+            return []
+        try:
+            return sorted(member.decode('utf-8') for member in self.redis_client.smembers(self.REDIS_ACCOUNTS_KEY))
+        except Exception as e:
+            logger.error(f"Error listing token accounts: {e}")
+            return []
+
     def get_full_cookie_string(self) -> Optional[str]:
         """Generate full cookie string with current access token"""
         access_token = self.get_access_token()
@@ -210,12 +240,17 @@ class TokenService:
         # Get initial access token
         return self.refresh_access_token()
 
-# Singleton instance
+# Singleton instance (default account), plus one per named account sharing its Redis client
 token_service = None
+_account_token_services: Dict[str, TokenService] = {}
 
-def get_token_service() -> TokenService:
-    """Get token service instance"""
+def get_token_service(account: Optional[str] = None) -> TokenService:
+    """Get token service instance (for a named account if given)"""
     global token_service
     if token_service is None:
         token_service = TokenService()
-    return token_service
\ No newline at end of file
+    if account is None:
+        return token_service
+    if account not in _account_token_services:
+        _account_token_services[account] = TokenService(account, redis_client=token_service.redis_client)
+    return _account_token_services[account]
@@ -0,0 +1,300 @@
+"""
+Thundering-herd load test: N Fluxia EAs hitting one backend at :03.
+
+Each simulated EA follows Fluxia_v2.0.mq5: a /health check on start, then once per
+minute at :03 one `/ea/candlesticks?currency_pair=..&time=<previous minute>` request
+for its chart symbol, and occasionally a `download=true` history request.
+Minutes are virtual (rounds run back-to-back), so a 10-round run takes seconds, not
+10 minutes; every round is still a burst where all N EAs fire within `--skew-ms`.
+
+By default the harness starts a local fake OlympTrade server and a backend
+(uvicorn subprocess) pointed at it, seeding an access token into Redis.
+A reachable Redis (REDIS_URL) is required.
+
+    python benchmarks/ea_herd.py --clients 1,5,10,25 --rounds 5 --upstream-latency 0.05
+    python benchmarks/ea_herd.py --compare benchmarks/results/<previous>.json
+
+Results are written to benchmarks/results/ as JSON so versions can be compared.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import aiohttp
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "OlympTradeAPI"))
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+BENCH_ACCESS_TOKEN = "bench-access-token"
+
+
+@dataclass
+class RequestResult:
+    kind: str        # "candles" | "download" | "health"
+    latency: float   # seconds
+    status: int      # HTTP status, 0 for transport errors/timeouts
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200
+
+
+class SimulatedEA:
+    """One EA terminal on one chart symbol."""
+
+    def __init__(self, session: aiohttp.ClientSession, base_url: str, symbol: str,
+                 download_probability: float, rng: random.Random):
+        self.session = session
+        self.base_url = base_url
+        self.symbol = symbol
+        self.download_probability = download_probability
+        self.rng = rng
+
+    async def _get(self, kind: str, path: str, params: Optional[Dict[str, str]] = None) -> RequestResult:
+        start = time.perf_counter()
+        try:
+            async with self.session.get(self.base_url + path, params=params) as response:
+                await response.read()
+                return RequestResult(kind, time.perf_counter() - start, response.status)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return RequestResult(kind, time.perf_counter() - start, 0)
+
+    async def health_check(self) -> RequestResult:
+        return await self._get("health", "/health")
+
+    async def on_minute(self, minute: datetime, skew: float) -> List[RequestResult]:
+        """The :03 OnTimer tick: request the previous minute's candle, maybe download history."""
+        await asyncio.sleep(self.rng.uniform(0, skew))
+        request_time = minute - timedelta(seconds=60)
+        results = [await self._get("candles", "/ea/candlesticks", {
+            "currency_pair": self.symbol,
+            "time": request_time.strftime("%Y-%m-%d %H:%M:%S"),
+        })]
+        if self.rng.random() < self.download_probability:
+            results.append(await self._get("download", "/ea/candlesticks", {
+                "currency_pair": self.symbol,
+                "count": "5",
+                "download": "true",
+            }))
+        return results
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+async def fetch_cache_stats(session: aiohttp.ClientSession, base_url: str) -> Dict[str, int]:
+    try:
+        async with session.get(base_url + "/ea/cache/stats") as response:
+            stats = await response.json()
+            return {"hits": stats.get("hits", 0), "misses": stats.get("misses", 0)}
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        return {"hits": 0, "misses": 0}
+
+
+async def run_level(base_url: str, clients: int, args, base_minute: datetime, upstream) -> Dict:
+    """Run `args.rounds` :03 bursts with `clients` EAs and summarize them."""
+    rng = random.Random(args.seed + clients)
+    symbols = args.symbols.split(",")
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        eas = [SimulatedEA(session, base_url, symbols[i % len(symbols)], args.download_probability, rng)
+               for i in range(clients)]
+
+        health = await asyncio.gather(*(ea.health_check() for ea in eas))
+        cache_before = await fetch_cache_stats(session, base_url)
+        upstream_before = dict(upstream.stats) if upstream else {}
+
+        results: List[RequestResult] = []
+        started = time.perf_counter()
+        for round_index in range(args.rounds):
+            minute = base_minute + timedelta(minutes=round_index)
+            bursts = await asyncio.gather(*(ea.on_minute(minute, args.skew_ms / 1000) for ea in eas))
+            for burst in bursts:
+                results.extend(burst)
+        elapsed = time.perf_counter() - started
+
+        cache_after = await fetch_cache_stats(session, base_url)
+
+    upstream_after = dict(upstream.stats) if upstream else {}
+    candle_latencies = [r.latency for r in results if r.kind == "candles"]
+    errors = sum(1 for r in results if not r.ok)
+    hits = cache_after["hits"] - cache_before["hits"]
+    misses = cache_after["misses"] - cache_before["misses"]
+
+    def ms(value):
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        "clients": clients,
+        "rounds": args.rounds,
+        "requests": len(results),
+        "health_errors": sum(1 for r in health if not r.ok),
+        "p50_ms": ms(percentile(candle_latencies, 50)),
+        "p95_ms": ms(percentile(candle_latencies, 95)),
+        "p99_ms": ms(percentile(candle_latencies, 99)),
+        "max_ms": ms(max(candle_latencies) if candle_latencies else None),
+        "error_rate": round(errors / len(results), 4) if results else None,
+        "throughput_rps": round(len(results) / elapsed, 2) if elapsed else None,
+        "upstream_requests": (upstream_after.get("e:10", 0) - upstream_before.get("e:10", 0)) if upstream else None,
+        "upstream_connections": (upstream_after.get("connections", 0) - upstream_before.get("connections", 0)) if upstream else None,
+        "cache_hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def seed_access_token(redis_url: str):
+    """Store the token the fake upstream expects where TokenService looks for it."""
+    import redis
+    from app.services.token_service import TokenService
+    redis.from_url(redis_url).setex(TokenService.REDIS_ACCESS_TOKEN_KEY, 3600, BENCH_ACCESS_TOKEN)
+
+
+def start_backend(port: int, upstream_uri: str, redis_url: str) -> subprocess.Popen:
+    env = dict(os.environ, OLYMPTRADE_WS_URI=upstream_uri, REDIS_URL=redis_url,
+               API_HOST="127.0.0.1", API_PORT=str(port), DEBUG="false")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+
+
+async def wait_for_backend(base_url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(base_url + "/health") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Backend at {base_url} did not become healthy within {timeout}s")
+
+
+def version_info() -> Dict[str, Optional[str]]:
+    from app.main import app
+    try:
+        git = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        git = None
+    return {"app": app.version, "git": git}
+
+
+def print_table(levels: List[Dict], baseline: Optional[Dict] = None):
+    columns = ["clients", "p50_ms", "p95_ms", "p99_ms", "error_rate", "upstream_requests", "cache_hit_ratio", "throughput_rps"]
+    print(" | ".join(f"{c:>17}" for c in columns))
+    baseline_levels = {level["clients"]: level for level in (baseline or {}).get("levels", [])}
+    for level in levels:
+        cells = []
+        old = baseline_levels.get(level["clients"], {})
+        for column in columns:
+            value = level.get(column)
+            previous = old.get(column)
+            if column != "clients" and isinstance(value, (int, float)) and isinstance(previous, (int, float)):
+                cells.append(f"{value:>9} ({value - previous:+.4g})")
+            else:
+                cells.append(f"{str(value):>17}")
+        print(" | ".join(f"{c:>17}" for c in cells))
+
+
+async def main(args) -> Dict:
+    upstream_thread = None
+    backend = None
+    base_url = args.backend_url
+    try:
+        if base_url is None:
+            from olymptrade_ws.fakeserver import FakeServerConfig, FakeServerThread
+            upstream_thread = FakeServerThread(FakeServerConfig(
+                latency=args.upstream_latency,
+                jitter=args.upstream_jitter,
+                access_token=BENCH_ACCESS_TOKEN,
+                seed=args.seed,
+            )).start()
+            seed_access_token(args.redis_url)
+            port = free_port()
+            backend = start_backend(port, upstream_thread.uri, args.redis_url)
+            base_url = f"http://127.0.0.1:{port}"
+        await wait_for_backend(base_url)
+
+        # Unique virtual minutes per run and level so earlier runs never warm the cache
+        now = datetime.now(timezone.utc).replace(second=3, microsecond=0)
+        levels = []
+        for index, clients in enumerate(int(n) for n in args.clients.split(",")):
+            base_minute = now - timedelta(days=1) + timedelta(minutes=index * (args.rounds + 10))
+            level = await run_level(base_url, clients, args, base_minute,
+                                    upstream_thread.server if upstream_thread else None)
+            levels.append(level)
+            print(f"N={clients}: p50={level['p50_ms']}ms p95={level['p95_ms']}ms p99={level['p99_ms']}ms "
+                  f"errors={level['error_rate']} upstream={level['upstream_requests']} hit_ratio={level['cache_hit_ratio']}")
+
+        return {
+            "benchmark": "ea_herd",
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "version": version_info(),
+            "config": {k: v for k, v in vars(args).items() if k not in ("compare", "output")},
+            "levels": levels,
+        }
+    finally:
+        if backend is not None:
+            backend.terminate()
+            backend.wait(timeout=10)
+        if upstream_thread is not None:
+            upstream_thread.stop()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Simulate N Fluxia EAs bursting at :03 against one backend")
+    parser.add_argument("--clients", default="1,5,10,25", help="Comma-separated EA counts to test")
+    parser.add_argument("--rounds", type=int, default=5, help="Virtual minutes (:03 bursts) per level")
+    parser.add_argument("--symbols", default="EURUSD_OTC,GBPUSD_OTC,USDJPY_OTC", help="Chart symbols, assigned round-robin")
+    parser.add_argument("--download-probability", type=float, default=0.02, help="Chance per EA per minute of a download=true request")
+    parser.add_argument("--skew-ms", type=float, default=250, help="Spread of EA clocks within a burst")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-request timeout (seconds)")
+    parser.add_argument("--upstream-latency", type=float, default=0.05, help="Fake upstream response latency (seconds)")
+    parser.add_argument("--upstream-jitter", type=float, default=0.02, help="Fake upstream latency jitter (seconds)")
+    parser.add_argument("--redis-url", default=os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    parser.add_argument("--backend-url", default=None, help="Use an already running backend instead of starting one")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=None, help="Result file (default: benchmarks/results/ea_herd_<git>_<time>.json)")
+    parser.add_argument("--compare", default=None, help="Previous result file to print deltas against")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    result = asyncio.run(main(args))
+
+    output = Path(args.output) if args.output else RESULTS_DIR / (
+        f"ea_herd_{result['version']['git'] or 'local'}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(f"Results saved to {output}")
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_table(result["levels"], baseline)
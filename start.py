@@ -20,6 +20,7 @@ def main():
     print(f"📡 Host: {config.API_HOST}")
     print(f"🔌 Port: {config.API_PORT}")
     print(f"🐛 Debug: {config.DEBUG}")
+    print(f"🔁 Event loop: {config.EVENT_LOOP}")
     print(f"📊 Redis: {config.REDIS_URL}")
     print(f"🌐 OlympTrade WS: {config.OLYMPTRADE_WS_URI}")
     print("=" * 50)
@@ -36,6 +37,7 @@ def main():
             port=config.API_PORT,
             reload=config.DEBUG,
             log_level=config.LOG_LEVEL.lower(),
+            loop=config.EVENT_LOOP,
             access_log=True
         )
     except KeyboardInterrupt:
@@ -0,0 +1,35 @@
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services import redis_cache as redis_cache_module
+from app.services import token_service as token_service_module
+from app.services.redis_cache import redis_cache
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """The global candle cache, backed by an in-process fake Redis (scripts included)."""
+    client = fakeredis.FakeRedis()
+    client.info = lambda section=None: {"used_memory_human": "0B"} # INFO is not emulated
+    monkeypatch.setattr(redis_cache, "redis_client", client)
+    monkeypatch.setattr(redis_cache, "_get_script", client.register_script(redis_cache_module._GET_AND_COUNT_SCRIPT))
+    monkeypatch.setattr(redis_cache, "_set_script", client.register_script(redis_cache_module._SET_AND_INDEX_SCRIPT))
+    return client
+
+
+@pytest.fixture
+def token_redis(monkeypatch):
+    """Fresh token services (default and per account) over an in-process fake Redis."""
+    client = fakeredis.FakeRedis()
+    monkeypatch.setattr(token_service_module, "token_service", token_service_module.TokenService(redis_client=client))
+    monkeypatch.setattr(token_service_module, "_account_token_services", {})
+    return client
+
+
+@pytest.fixture
+def api():
+    """TestClient over the backend app, lifespan (event loop monitor) included."""
+    from app.main import app
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,37 @@
+from datetime import datetime, timezone
+
+from app.config import config
+from app.models import CandlestickData
+from app.services import redis_cache as redis_cache_module
+from app.services.redis_cache import redis_cache
+
+CANDLE = CandlestickData(timestamp=1_700_000_040, open=1.1, high=1.2, low=1.0, close=1.15, volume=10)
+EA_TIME = datetime(2023, 11, 14, 22, 14, tzinfo=timezone.utc)
+
+
+def test_reindex_requires_the_admin_token(api, fake_redis, monkeypatch):
+    monkeypatch.setattr(config, "CACHE_ADMIN_TOKEN", None)
+    assert api.post("/ea/cache/reindex", headers={"X-Fluxia-Admin": "anything"}).status_code == 403
+
+    monkeypatch.setattr(config, "CACHE_ADMIN_TOKEN", "secret")
+    assert api.post("/ea/cache/reindex").status_code == 403
+    assert api.post("/ea/cache/reindex", headers={"X-Fluxia-Admin": "wrong"}).status_code == 403
+
+    redis_cache.cache_candles("EURUSD", EA_TIME, [CANDLE])
+    response = api.post("/ea/cache/reindex", headers={"X-Fluxia-Admin": "secret"})
+    assert response.status_code == 200
+    assert response.json()["indexed_keys"]["ea_candle"] == 1
+
+
+def test_evictions_of_pairs_no_longer_written_are_counted_on_stats_read(fake_redis, monkeypatch):
+    redis_cache.cache_candles("EURUSD", EA_TIME, [CANDLE])
+    assert redis_cache.get_cache_stats()["classes"]["ea_candle"]["pairs"]["EURUSD"]["keys"] == 1
+
+    # Past the TTL, with no further writes for the pair
+    later = redis_cache_module.time_module.time() + redis_cache.CACHE_TTL_SECONDS + 1
+    monkeypatch.setattr(redis_cache_module.time_module, "time", lambda: later)
+    stats = redis_cache.get_cache_stats()
+    assert stats["evictions"] == 1
+    assert stats["classes"]["ea_candle"]["pairs"]["EURUSD"] == {
+        "keys": 0, "hits": 0, "misses": 0, "sets": 1, "evictions": 1, "hit_ratio": None}
+    assert redis_cache.get_cache_stats()["evictions"] == 1 # Counted once
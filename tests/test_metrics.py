@@ -0,0 +1,59 @@
+import asyncio
+from datetime import datetime, timezone
+
+from prometheus_client.parser import text_string_to_metric_families
+
+from app.config import config
+from app.models import CandlestickData
+from app.services import metrics
+from app.services.redis_cache import redis_cache
+
+CANDLE = CandlestickData(timestamp=1_700_000_040, open=1.1, high=1.2, low=1.0, close=1.15, volume=10)
+EA_TIME = datetime(2023, 11, 14, 22, 14, tzinfo=timezone.utc)
+
+
+def scrape(api, name, **labels):
+    """Value of one sample from the /metrics endpoint (0.0 when not exported yet)."""
+    response = api.get("/metrics")
+    assert response.status_code == 200
+    for family in text_string_to_metric_families(response.text):
+        for sample in family.samples:
+            if sample.name == name and all(sample.labels.get(k) == v for k, v in labels.items()):
+                return sample.value
+    return 0.0
+
+
+def test_candle_request_histogram_is_scraped_for_every_outcome(api, fake_redis):
+    ok = dict(request_type="ea_request", outcome="ok")
+    client_error = dict(request_type="ea_request", outcome="client_error")
+    ok_before = scrape(api, "fluxia_candle_request_seconds_count", **ok)
+    error_before = scrape(api, "fluxia_candle_request_seconds_count", **client_error)
+    hits_before = scrape(api, "fluxia_candle_cache_total", request_type="ea_request", result="hit")
+
+    response = api.get("/ea/candlesticks", params={"currency_pair": "EURUSD", "time": "yesterday"})
+    assert response.status_code == 400 # Not swallowed into a 500
+
+    redis_cache.cache_candles("EURUSD", EA_TIME, [CANDLE])
+    response = api.get("/ea/candlesticks", params={"currency_pair": "EURUSD", "time": "2023-11-14 22:14:00"})
+    assert response.status_code == 200 and response.json()["total_count"] == 1
+
+    assert scrape(api, "fluxia_candle_request_seconds_count", **client_error) == error_before + 1
+    assert scrape(api, "fluxia_candle_request_seconds_count", **ok) == ok_before + 1
+    assert scrape(api, "fluxia_candle_cache_total", request_type="ea_request", result="hit") == hits_before + 1
+
+
+def test_metrics_endpoint_can_be_disabled(api, monkeypatch):
+    monkeypatch.setattr(config, "METRICS_ENABLED", False)
+    assert api.get("/metrics").status_code == 404
+
+
+def test_event_loop_lag_is_recorded(api):
+    before = scrape(api, "fluxia_event_loop_lag_seconds_count")
+
+    async def run_monitor():
+        monitor = asyncio.create_task(metrics.monitor_event_loop_lag(interval=0.001))
+        await asyncio.sleep(0.05)
+        monitor.cancel()
+
+    asyncio.run(run_monitor())
+    assert scrape(api, "fluxia_event_loop_lag_seconds_count") > before
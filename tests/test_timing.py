@@ -0,0 +1,19 @@
+import json
+
+from app.config import config
+
+
+def test_profiled_request_is_written_after_the_response(api, fake_redis, monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "PROFILE_ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(config, "PROFILE_SAMPLE_RATE", 0)
+
+    response = api.get("/ea/cache/stats")
+    assert "total;dur=" in response.headers["Server-Timing"]
+    assert list(tmp_path.iterdir()) == [] # Not sampled, no admin header
+
+    response = api.get("/ea/cache/stats", headers={"X-Fluxia-Profile": "secret"})
+    assert response.status_code == 200
+    [path] = tmp_path.iterdir() # The TestClient runs background tasks before returning
+    profile = json.loads(path.read_text())
+    assert profile["path"] == "/ea/cache/stats" and profile["status_code"] == 200
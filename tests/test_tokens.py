@@ -0,0 +1,53 @@
+from app.services import token_service as token_service_module
+
+
+class RenewResponse:
+    """Stand-in for the OlympTrade token renew response, echoing the refresh token it was sent."""
+    status_code = 200
+    text = ""
+
+    def __init__(self, refresh_token):
+        self.headers = {"Set-Cookie": f"access_token=access-{refresh_token}; Path=/, refresh_token={refresh_token}; Path=/"}
+
+    def json(self):
+        return {"expires_in": 172800}
+
+
+def renew(url, headers):
+    return RenewResponse(headers["Cookie"].split("=", 1)[1])
+
+
+def test_accounts_keep_their_own_tokens(api, token_redis, monkeypatch):
+    monkeypatch.setattr(token_service_module.requests, "post", renew)
+
+    for account in ("bob", "alice"):
+        response = api.post("/ea/token/initialize", params={"refresh_token": f"rt-{account}", "account": account})
+        assert response.status_code == 200 and response.json()["token_available"]
+
+    assert token_redis.get("olymptrade:account:alice:access_token") == b"access-rt-alice"
+    assert token_redis.get("olymptrade:account:bob:refresh_token") == b"rt-bob"
+    assert token_redis.get("olymptrade:access_token") is None # Default account untouched
+
+    assert api.get("/ea/token/status", params={"account": "alice"}).json() == {
+        "access_token_available": True, "refresh_token_available": True}
+    assert api.get("/ea/token/status").json() == {
+        "access_token_available": False, "refresh_token_available": False}
+
+    assert api.get("/ea/token/accounts").json()["accounts"] == [
+        {"account": "alice", "access_token_available": True},
+        {"account": "bob", "access_token_available": True},
+    ]
+
+
+def test_refresh_is_per_account(api, token_redis, monkeypatch):
+    monkeypatch.setattr(token_service_module.requests, "post", renew)
+    token_redis.set("olymptrade:account:alice:refresh_token", "rt-alice")
+
+    assert api.post("/ea/token/refresh", params={"account": "alice"}).status_code == 200
+    assert token_redis.get("olymptrade:account:alice:access_token") == b"access-rt-alice"
+
+    # No refresh token for the default account or for an unknown one
+    assert api.post("/ea/token/refresh").status_code == 500
+    assert api.post("/ea/token/refresh", params={"account": "carol"}).status_code == 500
+    # The rotated refresh token registers alice; failed refreshes list no one
+    assert api.get("/ea/token/accounts").json()["accounts"] == [{"account": "alice", "access_token_available": True}]